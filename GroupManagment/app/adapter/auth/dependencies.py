@@ -1,5 +1,12 @@
-from fastapi import Header, HTTPException
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy.orm import Session
 import jwt
+import uuid
+from typing import Dict
+from app.adapter.cache.membership_cache import membership_cache
+from app.adapter.db.database import get_db
+from app.adapter.db.group_repository_sql import SQLGroupRepository
+from app.adapter.db.models import Role
 
 def get_current_user_id(authorization: str = Header(...)) -> str:
     try:
@@ -19,4 +26,61 @@ def get_current_user_id(authorization: str = Header(...)) -> str:
         
     except Exception:
         # Cualquier error de formato (no es un JWT real, está mal formado, etc.)
-        raise HTTPException(status_code=401, detail="Token inválido")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+
+def get_user_roles(user_id: uuid.UUID, repository: SQLGroupRepository) -> Dict[uuid.UUID, Role]:
+    """Rol del usuario en cada uno de sus grupos; se carga completo y se guarda en caché."""
+    roles = membership_cache.get(user_id)
+    if roles is None:
+        roles = repository.find_roles_by_user_id(user_id)
+        membership_cache.set(user_id, roles)
+    return roles
+
+
+def check_group_role(group_id: uuid.UUID, user_id: uuid.UUID, repository: SQLGroupRepository) -> Role:
+    role = get_user_roles(user_id, repository).get(group_id)
+    if role is None:
+        raise HTTPException(status_code=403, detail="No eres miembro de este grupo")
+    return role
+
+
+def get_group_role(
+    group_id: uuid.UUID,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+) -> Role:
+    """Rol del usuario autenticado en el grupo de la ruta; 403 si no es miembro."""
+    return check_group_role(group_id, uuid.UUID(user_id), SQLGroupRepository(db))
+
+
+def get_group_admin(role: Role = Depends(get_group_role)) -> Role:
+    if role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Solo un administrador del grupo puede hacer esto")
+    return role
+
+
+def get_activity_role(
+    activity_id: uuid.UUID,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+) -> Role:
+    """Rol del usuario autenticado en el grupo de la actividad de la ruta."""
+    repo = SQLGroupRepository(db)
+    activity = repo.find_activity_by_id(activity_id)
+    if not activity:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return check_group_role(activity.group_id, uuid.UUID(user_id), repo)
+
+
+def get_recurring_activity_role(
+    rule_id: uuid.UUID,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+) -> Role:
+    """Rol del usuario autenticado en el grupo de la actividad recurrente de la ruta."""
+    repo = SQLGroupRepository(db)
+    rule = repo.find_recurring_activity_by_id(rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Recurring activity not found")
+    return check_group_role(rule.group_id, uuid.UUID(user_id), repo)
@@ -0,0 +1,54 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Tuple
+from app.domain.entities.group import Group
+from app.adapter.metrics import INVITE_CODE_LOOKUPS
+
+INVITE_CODE_CACHE_MAX_ENTRIES = int(os.getenv("INVITE_CODE_CACHE_MAX_ENTRIES", "10000"))
+# Renames and deletes made by other replicas are seen after at most this long
+INVITE_CODE_CACHE_TTL_SECONDS = float(os.getenv("INVITE_CODE_CACHE_TTL_SECONDS", "300"))
+
+
+class InviteCodeCache:
+    """Per-process LRU of invite code -> group, invalidated by this process's renames and deletes."""
+
+    def __init__(self, max_entries: int = INVITE_CODE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = INVITE_CODE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Group]]" = OrderedDict()
+
+    def get(self, code: str) -> Group | None:
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is None or time.monotonic() >= entry[0]:
+                self._entries.pop(code, None)
+                INVITE_CODE_LOOKUPS.labels(result="miss").inc()
+                return None
+            self._entries.move_to_end(code)
+            INVITE_CODE_LOOKUPS.labels(result="hit").inc()
+            return replace(entry[1])
+
+    def set(self, group: Group):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[group.invite_code] = (time.monotonic() + self.ttl_seconds, replace(group))
+            self._entries.move_to_end(group.invite_code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, code: str):
+        with self._lock:
+            self._entries.pop(code, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+invite_code_cache = InviteCodeCache()
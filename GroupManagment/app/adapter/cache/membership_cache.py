@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Tuple
+from app.adapter.db.models import Role
+from app.adapter.metrics import MEMBERSHIP_LOOKUPS
+
+MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.getenv("MEMBERSHIP_CACHE_MAX_ENTRIES", "10000"))
+# Joins, removals and role changes made through other replicas are seen after at most this long
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "30"))
+
+
+class MembershipCache:
+    """Per-process LRU of user -> {group_id: role} for every group the user belongs to.
+
+    A user is loaded as a whole, so "not a member" is answered from the cache too.
+    Entries are invalidated by this process's joins, removals, role changes and deletes.
+    """
+
+    def __init__(self, max_entries: int = MEMBERSHIP_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = MEMBERSHIP_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, Dict[uuid.UUID, Role]]]" = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> Dict[uuid.UUID, Role] | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() >= entry[0]:
+                self._entries.pop(user_id, None)
+                MEMBERSHIP_LOOKUPS.labels(result="miss").inc()
+                return None
+            self._entries.move_to_end(user_id)
+            MEMBERSHIP_LOOKUPS.labels(result="hit").inc()
+            return dict(entry[1])
+
+    def set(self, user_id: uuid.UUID, roles: Dict[uuid.UUID, Role]):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, dict(roles))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id: uuid.UUID):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def discard_group(self, group_id: uuid.UUID):
+        # Deletes are rare enough that scanning beats keeping a reverse index
+        with self._lock:
+            for user_id in [user_id for user_id, (_, roles) in self._entries.items() if group_id in roles]:
+                del self._entries[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+membership_cache = MembershipCache()
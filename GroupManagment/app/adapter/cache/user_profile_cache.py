@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, List, Tuple
+from app.domain.entities.user_profile import UserProfile
+from app.adapter.metrics import USER_PROFILE_LOOKUPS
+
+USER_PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("USER_PROFILE_CACHE_MAX_ENTRIES", "50000"))
+# Username changes in UserManagment show up in member lists after at most this long
+USER_PROFILE_CACHE_TTL_SECONDS = float(os.getenv("USER_PROFILE_CACHE_TTL_SECONDS", "300"))
+
+
+class UserProfileCache:
+    """Per-process LRU of user id -> profile fetched from UserManagment."""
+
+    def __init__(self, max_entries: int = USER_PROFILE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = USER_PROFILE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, UserProfile]]" = OrderedDict()
+
+    def get_many(self, user_ids: List[uuid.UUID]) -> Tuple[Dict[uuid.UUID, UserProfile], List[uuid.UUID]]:
+        """The cached profiles and the ids that still have to be fetched."""
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._entries.get(user_id)
+                if entry is None or now >= entry[0]:
+                    self._entries.pop(user_id, None)
+                    missing.append(user_id)
+                    continue
+                self._entries.move_to_end(user_id)
+                found[user_id] = replace(entry[1])
+        USER_PROFILE_LOOKUPS.labels(result="hit").inc(len(found))
+        USER_PROFILE_LOOKUPS.labels(result="miss").inc(len(missing))
+        return found, missing
+
+    def set_many(self, profiles: List[UserProfile]):
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for profile in profiles:
+                self._entries[profile.id] = (expires_at, replace(profile))
+                self._entries.move_to_end(profile.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_profile_cache = UserProfileCache()
@@ -1,16 +1,70 @@
-from sqlalchemy import text
+import hashlib
+from sqlalchemy import func, insert, literal, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.domain.repositories.group_repository import GroupRepository
 from app.domain.entities.group import Group
-from app.domain.entities.activity import Activity
+from app.domain.entities.activity import Activity, UserActivity
+from app.domain.entities.recurring_activity import RecurringActivity
 # Ajusta este import según dónde tengas models.py (ej: app.adapter.db.models)
 from app.adapter.db.models import Group as GroupModel, GroupMember, Activity as ActivityModel
-from app.adapter.db.models import ActivityStatus
+from app.adapter.db.models import RecurringActivity as RecurringActivityModel
+from app.adapter.db.models import ActivityStatus, Role
+from app.adapter.cache.invite_code_cache import InviteCodeCache, invite_code_cache
+from app.adapter.cache.membership_cache import MembershipCache, membership_cache
 import uuid
-from typing import List
+from datetime import datetime, timezone
+from typing import Dict, List, Set, Tuple
+
+_ACTIVITY_COLUMNS = (
+    ActivityModel.id, ActivityModel.group_id, ActivityModel.title, ActivityModel.description,
+    ActivityModel.start_date, ActivityModel.end_date, ActivityModel.xp_reward, ActivityModel.status,
+    ActivityModel.created_at,
+)
+
+_USER_ACTIVITY_COLUMNS = (
+    ActivityModel.id, ActivityModel.group_id, GroupModel.name.label("group_name"), ActivityModel.title,
+    ActivityModel.description, ActivityModel.start_date, ActivityModel.end_date, ActivityModel.xp_reward,
+    ActivityModel.status, ActivityModel.created_at,
+)
+
+def _to_user_activity(row) -> UserActivity:
+    return UserActivity(
+        id=row.id,
+        group_id=row.group_id,
+        group_name=row.group_name,
+        title=row.title,
+        description=row.description,
+        start_date=row.start_date,
+        end_date=row.end_date,
+        xp_reward=row.xp_reward,
+        status=row.status,
+        created_at=row.created_at
+    )
+
+def _to_recurring_activity(db_rule: RecurringActivityModel) -> RecurringActivity:
+    return RecurringActivity(
+        id=db_rule.id,
+        group_id=db_rule.group_id,
+        title=db_rule.title,
+        description=db_rule.description,
+        xp_reward=db_rule.xp_reward,
+        frequency=db_rule.frequency,
+        interval=db_rule.interval,
+        starts_at=db_rule.starts_at,
+        duration_minutes=db_rule.duration_minutes,
+        until=db_rule.until,
+        weekdays=[int(day) for day in db_rule.weekdays.split(",")] if db_rule.weekdays else [],
+        created_at=db_rule.created_at
+    )
+
 class SQLGroupRepository(GroupRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, invite_codes: InviteCodeCache = invite_code_cache,
+                 memberships: MembershipCache = membership_cache):
         self.db = db
+        self.invite_codes = invite_codes
+        self.memberships = memberships
 
     def save(self, group: Group) -> Group:
         db_group = GroupModel(
@@ -30,9 +84,14 @@ class SQLGroupRepository(GroupRepository):
         return None
 
     def find_by_invite_code(self, code: str) -> Group | None:
+        group = self.invite_codes.get(code)
+        if group:
+            return group
         db_group = self.db.query(GroupModel).filter(GroupModel.invite_code == code).first()
         if db_group:
-            return Group(id=db_group.id, name=db_group.name, invite_code=db_group.invite_code)
+            group = Group(id=db_group.id, name=db_group.name, invite_code=db_group.invite_code)
+            self.invite_codes.set(group)
+            return group
         return None
 
     def update_name(self, group_id: uuid.UUID, name: str) -> Group | None:
@@ -40,6 +99,7 @@ class SQLGroupRepository(GroupRepository):
         if db_group:
             db_group.name = name
             self.db.commit()
+            self.invite_codes.discard(db_group.invite_code)
             self.db.refresh(db_group)
             return Group(id=db_group.id, name=db_group.name, invite_code=db_group.invite_code)
         return None
@@ -49,6 +109,8 @@ class SQLGroupRepository(GroupRepository):
         if db_group:
             self.db.delete(db_group)
             self.db.commit()
+            self.invite_codes.discard(db_group.invite_code)
+            self.memberships.discard_group(group_id)
             return True
         return False
 
@@ -60,6 +122,34 @@ class SQLGroupRepository(GroupRepository):
         )
         self.db.add(member)
         self.db.commit()
+        self.memberships.discard_user(user_id)
+
+    def join_by_invite_code(self, code: str, user_id: uuid.UUID, role: str) -> uuid.UUID | None:
+        """Adds the user to the group with this invite code in a single statement.
+
+        Returns the group id when the user was newly added; None when the code is
+        unknown or the user is already a member, which the caller tells apart.
+        """
+        dialect = self.db.get_bind().dialect.name
+        candidate = select(
+            GroupModel.id, literal(user_id, GroupMember.user_id.type), literal(role, GroupMember.role.type),
+            literal(False), literal(False), literal(datetime.now(timezone.utc), GroupMember.joined_at.type),
+        ).where(GroupModel.invite_code == code)
+        insert_member = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(GroupMember)
+        group_id = self.db.execute(
+            insert_member.from_select(
+                ["group_id", "user_id", "role", "is_sharing_location_with_group",
+                 "has_notifications_enabled", "joined_at"],
+                candidate,
+            )
+            # A concurrent join of the same user lands here instead of on the primary key
+            .on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+            .returning(GroupMember.group_id)
+        ).scalar()
+        self.db.commit()
+        if group_id is not None:
+            self.memberships.discard_user(user_id)
+        return group_id
 
     def get_member(self, group_id: uuid.UUID, user_id: uuid.UUID):
         return self.db.query(GroupMember).filter(
@@ -70,6 +160,26 @@ class SQLGroupRepository(GroupRepository):
     def list_members(self, group_id: uuid.UUID):
         return self.db.query(GroupMember).filter(GroupMember.group_id == group_id).all()
 
+    def members_fingerprint(self, group_id: uuid.UUID):
+        """Digest of the member columns shown to clients plus the latest join time.
+
+        Reads a handful of narrow columns so conditional GETs can be answered
+        without building the member list.
+        """
+        rows = self.db.execute(
+            select(
+                GroupMember.user_id, GroupMember.role, GroupMember.is_sharing_location_with_group,
+                GroupMember.has_notifications_enabled, GroupMember.joined_at
+            )
+            .where(GroupMember.group_id == group_id)
+            .order_by(GroupMember.user_id)
+        ).all()
+        digest = hashlib.blake2b(digest_size=12)
+        for row in rows:
+            digest.update(repr(tuple(row)).encode())
+        last_joined = max((row.joined_at for row in rows if row.joined_at), default=None)
+        return digest.hexdigest(), last_joined
+
     def update_member(self, group_id: uuid.UUID, user_id: uuid.UUID, role=None, is_sharing_location_with_group=None, has_notifications_enabled=None):
         member = self.get_member(group_id, user_id)
         if member:
@@ -80,6 +190,7 @@ class SQLGroupRepository(GroupRepository):
             if has_notifications_enabled is not None:
                 member.has_notifications_enabled = has_notifications_enabled
             self.db.commit()
+            self.memberships.discard_user(user_id)
             self.db.refresh(member)
             return member
         return None
@@ -89,6 +200,7 @@ class SQLGroupRepository(GroupRepository):
         if member:
             self.db.delete(member)
             self.db.commit()
+            self.memberships.discard_user(user_id)
             return True
         return False
 
@@ -99,21 +211,38 @@ class SQLGroupRepository(GroupRepository):
         ).first()
         return member is not None
 
-    def save_activity(self, activity: Activity) -> Activity:
-        db_activity = ActivityModel(
-            id=activity.id,
-            group_id=activity.group_id,
-            title=activity.title,
-            description=activity.description,
-            start_date=activity.start_date,
-            end_date=activity.end_date,
-            xp_reward=activity.xp_reward,
-            status=activity.status
-        )
-        self.db.add(db_activity)
-        self.db.commit()
-        self.db.refresh(db_activity)
-        return activity
+    def save_activity(self, activity: Activity) -> Activity | None:
+        saved = self.save_activities([activity])
+        return saved[0] if saved else None
+
+    def save_activities(self, activities: List[Activity]) -> List[Activity] | None:
+        """Inserts the activities in one transaction and returns them as stored, in order.
+
+        A single INSERT ... RETURNING (batched into multi-row VALUES for many
+        activities); a missing group fails the foreign key and returns None.
+        """
+        try:
+            rows = self.db.execute(
+                insert(ActivityModel).returning(*_ACTIVITY_COLUMNS, sort_by_parameter_order=True),
+                [
+                    {
+                        "id": activity.id,
+                        "group_id": activity.group_id,
+                        "title": activity.title,
+                        "description": activity.description,
+                        "start_date": activity.start_date,
+                        "end_date": activity.end_date,
+                        "xp_reward": activity.xp_reward,
+                        "status": activity.status,
+                    }
+                    for activity in activities
+                ],
+            ).all()
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return None
+        return [Activity(**row._mapping) for row in rows]
 
     def find_activity_by_id(self, activity_id: uuid.UUID) -> Activity | None:
         db_activity = self.db.query(ActivityModel).filter(ActivityModel.id == activity_id).first()
@@ -131,8 +260,15 @@ class SQLGroupRepository(GroupRepository):
             )
         return None
 
-    def list_activities_by_group(self, group_id: uuid.UUID) -> List[Activity]:
-        db_activities = self.db.query(ActivityModel).filter(ActivityModel.group_id == group_id).all()
+    def list_activities_by_group(self, group_id: uuid.UUID, start: datetime | None = None,
+                                 end: datetime | None = None) -> List[Activity]:
+        query = self.db.query(ActivityModel).filter(ActivityModel.group_id == group_id)
+        # Activities overlapping the window, as in list_activities_by_user
+        if start is not None:
+            query = query.filter(ActivityModel.end_date >= start)
+        if end is not None:
+            query = query.filter(ActivityModel.start_date < end)
+        db_activities = query.all()
         return [
             Activity(
                 id=db_activity.id,
@@ -178,6 +314,28 @@ class SQLGroupRepository(GroupRepository):
             )
         return None
 
+    def expire_activities(self, now: datetime, limit: int) -> int:
+        """Moves up to `limit` ACTIVE activities ended by `now` to EXPIRED in one statement."""
+        overdue = (
+            select(ActivityModel.id)
+            .where(ActivityModel.status == ActivityStatus.ACTIVE, ActivityModel.end_date <= now)
+            .order_by(ActivityModel.end_date)
+            .limit(limit)
+        )
+        result = self.db.execute(
+            update(ActivityModel)
+            .where(ActivityModel.id.in_(overdue.scalar_subquery()))
+            .values(status=ActivityStatus.EXPIRED)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def next_activity_end(self) -> datetime | None:
+        return self.db.execute(
+            select(func.min(ActivityModel.end_date)).where(ActivityModel.status == ActivityStatus.ACTIVE)
+        ).scalar()
+
     def delete_activity(self, activity_id: uuid.UUID) -> bool:
         db_activity = self.db.query(ActivityModel).filter(ActivityModel.id == activity_id).first()
         if db_activity:
@@ -203,46 +361,84 @@ class SQLGroupRepository(GroupRepository):
                 invite_code=db_group.invite_code
             ))
         return groups
+
+    def find_roles_by_user_id(self, user_id: uuid.UUID) -> Dict[uuid.UUID, Role]:
+        # Same membership rows as find_groups_by_user_id, without joining the groups
+        rows = self.db.execute(
+            select(GroupMember.group_id, GroupMember.role).where(GroupMember.user_id == user_id)
+        ).all()
+        return {row.group_id: row.role for row in rows}
     
-    def list_activities_by_user(self, user_id: uuid.UUID) -> List[Activity]:
-        query = text("""
-            SELECT
-                a.id, a.group_id, g.name as group_name, a.title, a.description,
-                a.start_date, a.end_date, a.xp_reward, a.status, a.created_at
-            FROM activities a
-            JOIN groups g ON a.group_id = g.id
-            JOIN group_members gm ON g.id = gm.group_id
-            WHERE gm.user_id = :user_id
-        """)
-
-        result = self.db.execute(query, {"user_id": user_id})
-        rows = result.fetchall()
-
-        activities = []
-        for row in rows:
-            class ActivityWithGroup:
-                def __init__(self, row):
-                    self.id = row[0]
-                    self.group_id = row[1]
-                    self.group_name = row[2]
-                    self.title = row[3]
-                    self.description = row[4]
-                    self.start_date = row[5]
-                    self.end_date = row[6]
-                    self.xp_reward = row[7]
-                    
-                    status_str = str(row[8]).lower()
-                    if status_str == "active":
-                        self.status = ActivityStatus.ACTIVE
-                    elif status_str == "expired":
-                        self.status = ActivityStatus.EXPIRED
-                    elif status_str == "completed":
-                        self.status = ActivityStatus.COMPLETED
-                    else:
-                        self.status = ActivityStatus.ACTIVE  
-
-                    self.created_at = row[9]
-
-            activities.append(ActivityWithGroup(row))
-
-        return activities    
\ No newline at end of file
+    def list_activities_by_user(self, user_id: uuid.UUID, status: ActivityStatus | None = None,
+                                start: datetime | None = None, end: datetime | None = None,
+                                after: Tuple[datetime, uuid.UUID] | None = None,
+                                limit: int = 50) -> List[UserActivity]:
+        """Activities of the user's groups, newest start first, at most `limit` of them.
+
+        `start`/`end` keep the activities running at some point in [start, end);
+        `after` is the (start_date, id) of the last activity of the previous page.
+        """
+        query = (
+            select(*_USER_ACTIVITY_COLUMNS)
+            .join(GroupModel, GroupModel.id == ActivityModel.group_id)
+            .join(GroupMember, GroupMember.group_id == ActivityModel.group_id)
+            .where(GroupMember.user_id == user_id)
+        )
+        if status is not None:
+            query = query.where(ActivityModel.status == status)
+        if start is not None:
+            query = query.where(ActivityModel.end_date >= start)
+        if end is not None:
+            query = query.where(ActivityModel.start_date < end)
+        if after is not None:
+            query = query.where(tuple_(ActivityModel.start_date, ActivityModel.id) < tuple_(*after))
+        query = query.order_by(ActivityModel.start_date.desc(), ActivityModel.id.desc()).limit(limit)
+        return [_to_user_activity(row) for row in self.db.execute(query)]
+
+    def find_activity_ids(self, activity_ids: List[uuid.UUID]) -> Set[uuid.UUID]:
+        """Which of the ids belong to stored activities."""
+        if not activity_ids:
+            return set()
+        return set(self.db.execute(select(ActivityModel.id).where(ActivityModel.id.in_(activity_ids))).scalars())
+
+    def save_recurring_activity(self, rule: RecurringActivity) -> RecurringActivity | None:
+        db_rule = RecurringActivityModel(
+            id=rule.id,
+            group_id=rule.group_id,
+            title=rule.title,
+            description=rule.description,
+            xp_reward=rule.xp_reward,
+            frequency=rule.frequency,
+            interval=rule.interval,
+            weekdays=",".join(str(day) for day in sorted(set(rule.weekdays))) or None,
+            starts_at=rule.starts_at,
+            duration_minutes=rule.duration_minutes,
+            until=rule.until
+        )
+        self.db.add(db_rule)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return None
+        return _to_recurring_activity(db_rule)
+
+    def find_recurring_activity_by_id(self, rule_id: uuid.UUID) -> RecurringActivity | None:
+        db_rule = self.db.get(RecurringActivityModel, rule_id)
+        return _to_recurring_activity(db_rule) if db_rule else None
+
+    def list_recurring_activities_by_group(self, group_id: uuid.UUID,
+                                           before: datetime | None = None) -> List[RecurringActivity]:
+        query = self.db.query(RecurringActivityModel).filter(RecurringActivityModel.group_id == group_id)
+        # Rules starting later have no occurrence in a window ending at `before`
+        if before is not None:
+            query = query.filter(RecurringActivityModel.starts_at < before)
+        return [_to_recurring_activity(db_rule) for db_rule in query.order_by(RecurringActivityModel.starts_at).all()]
+
+    def delete_recurring_activity(self, rule_id: uuid.UUID) -> bool:
+        db_rule = self.db.get(RecurringActivityModel, rule_id)
+        if db_rule:
+            self.db.delete(db_rule)
+            self.db.commit()
+            return True
+        return False
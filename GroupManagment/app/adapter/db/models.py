@@ -2,7 +2,7 @@ from .database import Base
 import uuid
 import enum
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Text, Integer, Enum, Boolean
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Text, Integer, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -11,6 +11,10 @@ class ActivityStatus(str, enum.Enum):
     EXPIRED = "expired"
     COMPLETED = "completed"
 
+class Frequency(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
 class Role(str, enum.Enum):
     ADMIN = "admin"
     MEMBER = "member"
@@ -25,6 +29,7 @@ class Group(Base):
 
     members = relationship("GroupMember", back_populates="group", cascade="all, delete")
     activities = relationship("Activity", back_populates="group", cascade="all, delete")
+    recurring_activities = relationship("RecurringActivity", back_populates="group", cascade="all, delete")
 
 class Activity(Base):
     __tablename__ = "activities"
@@ -37,10 +42,40 @@ class Activity(Base):
     end_date = Column(TIMESTAMP, nullable=False)
     xp_reward = Column(Integer, nullable=False)
     status = Column(Enum(ActivityStatus), nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
+    # Evaluated per row; it is part of what inserts return
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     group = relationship("Group", back_populates="activities")
 
+    __table_args__ = (
+        # A group's activities newest first, the order of /my-activities pages
+        Index("ix_activities_group_start", "group_id", "start_date", "id"),
+        Index("ix_activities_group_status_start", "group_id", "status", "start_date", "id"),
+        # Overdue ACTIVE rows and the next end_date for the expiry job
+        Index("ix_activities_status_end", "status", "end_date"),
+    )
+
+class RecurringActivity(Base):
+    """A rule stored once; its occurrences are computed per requested window, and only
+    the ones that get completed or edited are stored, as activities rows."""
+    __tablename__ = "recurring_activities"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
+    group_id = Column(UUID(as_uuid=True), ForeignKey("groups.id"), nullable=False, index=True)
+    title = Column(String(50), nullable=False)
+    description = Column(Text, nullable=True)
+    xp_reward = Column(Integer, nullable=False)
+    frequency = Column(Enum(Frequency), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    # Comma-separated weekdays, 0 = Monday, for weekly rules
+    weekdays = Column(String(13), nullable=True)
+    starts_at = Column(TIMESTAMP, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    until = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    group = relationship("Group", back_populates="recurring_activities")
+
 class GroupMember(Base):
     __tablename__ = "group_members"
 
@@ -51,4 +86,7 @@ class GroupMember(Base):
     has_notifications_enabled = Column(Boolean, nullable=False, default=False)
     joined_at = Column(TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
 
-    group = relationship("Group", back_populates="members")
\ No newline at end of file
+    group = relationship("Group", back_populates="members")
+
+    # The primary key leads with group_id; this one finds a user's groups
+    __table_args__ = (Index("ix_group_members_user", "user_id", "group_id"),)
\ No newline at end of file
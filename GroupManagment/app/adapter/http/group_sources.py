@@ -0,0 +1,74 @@
+import asyncio
+import os
+import uuid
+from typing import Any
+import httpx
+from app.adapter.metrics import GROUP_SOURCE_REQUESTS
+from app.domain.repositories.group_source import GroupSource, GroupSourceUnavailable
+
+# Called on the compose network, bypassing Traefik; SharingService serves under its root_path
+PET_SERVICE_URL = os.getenv("PET_SERVICE_URL", "http://pet-managment")
+SHARING_SERVICE_URL = os.getenv("SHARING_SERVICE_URL", "http://sharing-service/sharing")
+# Whole-call deadlines; a source that misses it is left out of the dashboard
+PET_SERVICE_TIMEOUT_SECONDS = float(os.getenv("PET_SERVICE_TIMEOUT_SECONDS", "0.8"))
+SHARING_SERVICE_TIMEOUT_SECONDS = float(os.getenv("SHARING_SERVICE_TIMEOUT_SECONDS", "0.8"))
+
+
+class HTTPGroupSource(GroupSource):
+    """GET of one service's document for a group, over a keep-alive AsyncClient pool."""
+
+    def __init__(self, name: str, base_url: str, path: str, timeout: float):
+        self.name = name
+        self.base_url = base_url
+        self.path = path
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the loop that opened them; the server runs
+        # a single loop, so this only renews the pool under test clients
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30),
+            )
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    async def fetch(self, group_id: uuid.UUID, authorization: str | None = None) -> Any | None:
+        headers = {"Authorization": authorization} if authorization else None
+        try:
+            async with asyncio.timeout(self.timeout):
+                response = await self.client.get(self.path.format(group_id=group_id), headers=headers)
+            if response.status_code == 404:
+                GROUP_SOURCE_REQUESTS.labels(source=self.name, result="missing").inc()
+                return None
+            response.raise_for_status()
+            document = response.json()
+        except (TimeoutError, httpx.HTTPError, ValueError) as exc:
+            GROUP_SOURCE_REQUESTS.labels(source=self.name, result="unavailable").inc()
+            raise GroupSourceUnavailable(f"{self.name}: {exc!r}") from exc
+        GROUP_SOURCE_REQUESTS.labels(source=self.name, result="ok").inc()
+        return document
+
+
+pet_source = HTTPGroupSource("pet", PET_SERVICE_URL, "/pet/group/{group_id}", PET_SERVICE_TIMEOUT_SECONDS)
+mood_source = HTTPGroupSource("moods", SHARING_SERVICE_URL, "/mood/group/{group_id}", SHARING_SERVICE_TIMEOUT_SECONDS)
+
+
+def get_pet_source() -> GroupSource:
+    return pet_source
+
+
+def get_mood_source() -> GroupSource:
+    return mood_source
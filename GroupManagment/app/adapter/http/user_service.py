@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List
+import httpx
+from app.adapter.cache.user_profile_cache import UserProfileCache, user_profile_cache
+from app.adapter.metrics import USER_SERVICE_REQUESTS
+from app.domain.entities.user_profile import UserProfile
+from app.domain.repositories.user_directory import UserDirectory
+
+logger = logging.getLogger(__name__)
+
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-managment")
+USER_SERVICE_TIMEOUT_SECONDS = float(os.getenv("USER_SERVICE_TIMEOUT_SECONDS", "0.5"))
+# After a failed call, profiles come from the cache alone for this long
+USER_SERVICE_BACKOFF_SECONDS = float(os.getenv("USER_SERVICE_BACKOFF_SECONDS", "10"))
+# Ids per GET /users call, keeping the query string well under proxy limits
+USER_SERVICE_BATCH_SIZE = int(os.getenv("USER_SERVICE_BATCH_SIZE", "100"))
+
+
+class UserServiceClient(UserDirectory):
+    """Profiles from UserManagment's GET /users?ids=, over one keep-alive connection pool.
+
+    Missing profiles are fetched in batches; when the service errors or is slower
+    than the timeout, callers get whatever the cache holds instead of an error.
+    """
+
+    def __init__(self, base_url: str = USER_SERVICE_URL, timeout: float = USER_SERVICE_TIMEOUT_SECONDS,
+                 backoff_seconds: float = USER_SERVICE_BACKOFF_SECONDS, batch_size: int = USER_SERVICE_BATCH_SIZE,
+                 cache: UserProfileCache = user_profile_cache):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.backoff_seconds = backoff_seconds
+        self.batch_size = batch_size
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._retry_at = 0.0
+
+    @property
+    def client(self) -> httpx.Client:
+        # Created on first use so importing the app opens no sockets
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+                )
+            return self._client
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _fetch(self, user_ids: List[uuid.UUID]) -> List[UserProfile]:
+        response = self.client.get("/users", params={"ids": [str(user_id) for user_id in user_ids]})
+        response.raise_for_status()
+        return [
+            UserProfile(
+                id=uuid.UUID(user["id"]),
+                username=user["username"],
+                current_emotional_status=user.get("current_emotional_status"),
+            )
+            for user in response.json()
+        ]
+
+    def get_profiles(self, user_ids: List[uuid.UUID]) -> Dict[uuid.UUID, UserProfile]:
+        profiles, missing = self.cache.get_many(list(dict.fromkeys(user_ids)))
+        if not missing:
+            return profiles
+        if time.monotonic() < self._retry_at:
+            USER_SERVICE_REQUESTS.labels(result="skipped").inc()
+            return profiles
+
+        for start in range(0, len(missing), self.batch_size):
+            try:
+                fetched = self._fetch(missing[start:start + self.batch_size])
+            except (httpx.HTTPError, KeyError, TypeError, ValueError) as exc:
+                self._retry_at = time.monotonic() + self.backoff_seconds
+                USER_SERVICE_REQUESTS.labels(result="error").inc()
+                logger.warning("User service unavailable, returning members without profiles: %r", exc)
+                break
+            USER_SERVICE_REQUESTS.labels(result="ok").inc()
+            self.cache.set_many(fetched)
+            profiles.update((profile.id, profile) for profile in fetched)
+        return profiles
+
+
+user_service = UserServiceClient()
+
+
+def get_user_directory() -> UserDirectory:
+    return user_service
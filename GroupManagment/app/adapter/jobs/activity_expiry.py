@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from app.adapter.db.database import SessionLocal
+from app.adapter.db.group_repository_sql import SQLGroupRepository
+from app.adapter.metrics import ACTIVITIES_EXPIRED
+from app.application.usecases.expire_activities import ExpireActivitiesUseCase
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_EXPIRY_ENABLED = os.getenv("ACTIVITY_EXPIRY_ENABLED", "true").lower() != "false"
+ACTIVITY_EXPIRY_BATCH_SIZE = int(os.getenv("ACTIVITY_EXPIRY_BATCH_SIZE", "1000"))
+# Upper bound on a sleep, so end dates written by other replicas are not missed for long
+ACTIVITY_EXPIRY_MAX_SLEEP_SECONDS = float(os.getenv("ACTIVITY_EXPIRY_MAX_SLEEP_SECONDS", "900"))
+
+
+class ExpiryAlarm:
+    """When the expiry job wakes up next; writes of an earlier end_date bring it forward."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake_at: datetime | None = None
+        self.wakeup: asyncio.Event | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.wakeup = asyncio.Event()
+
+    def set(self, wake_at: datetime | None):
+        with self._lock:
+            self._wake_at = wake_at
+
+    def notify(self, end_date: datetime):
+        """Called after an activity is written with this end_date, from any thread."""
+        if end_date.tzinfo is not None:
+            end_date = end_date.astimezone(timezone.utc).replace(tzinfo=None)
+        with self._lock:
+            if self._loop is None or (self._wake_at is not None and self._wake_at <= end_date):
+                return
+            self._wake_at = end_date
+        self._loop.call_soon_threadsafe(self.wakeup.set)
+
+
+expiry_alarm = ExpiryAlarm()
+
+
+def expire_once(batch_size: int = ACTIVITY_EXPIRY_BATCH_SIZE) -> datetime | None:
+    """Expires the overdue activities and returns the next end_date to wake up for."""
+    db = SessionLocal()
+    try:
+        expired, next_end = ExpireActivitiesUseCase(SQLGroupRepository(db)).execute(batch_size)
+    finally:
+        db.close()
+    if expired:
+        ACTIVITIES_EXPIRED.inc(expired)
+        logger.info("Expired %d activities", expired)
+    return next_end
+
+
+async def run_activity_expiry(alarm: ExpiryAlarm = expiry_alarm):
+    """Sleeps until the next known end_date (or an earlier one is written), then expires."""
+    alarm.bind(asyncio.get_running_loop())
+    while True:
+        alarm.wakeup.clear()
+        try:
+            # The job uses the sync session, keep it off the event loop
+            next_end = await asyncio.to_thread(expire_once)
+            alarm.set(next_end)
+            wait = ACTIVITY_EXPIRY_MAX_SLEEP_SECONDS
+            if next_end is not None:
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                wait = min(wait, (next_end - now).total_seconds())
+        except Exception:
+            logger.exception("Activity expiry failed")
+            wait = 60.0
+
+        try:
+            await asyncio.wait_for(alarm.wakeup.wait(), timeout=max(wait, 0.0))
+        except asyncio.TimeoutError:
+            pass
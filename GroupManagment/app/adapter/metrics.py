@@ -0,0 +1,38 @@
+from prometheus_client import Counter
+
+# Exposed on /metrics through the default registry used by the Instrumentator
+
+ACTIVITIES_EXPIRED = Counter(
+    "group_activities_expired_total",
+    "Activities moved from ACTIVE to EXPIRED once past their end_date",
+)
+
+INVITE_CODE_LOOKUPS = Counter(
+    "group_invite_code_lookups_total",
+    "Invite code lookups answered from the in-process cache or the database",
+    ["result"],
+)
+
+MEMBERSHIP_LOOKUPS = Counter(
+    "group_membership_lookups_total",
+    "Group membership checks answered from the in-process cache or the database",
+    ["result"],
+)
+
+USER_PROFILE_LOOKUPS = Counter(
+    "group_user_profile_lookups_total",
+    "Member profiles answered from the in-process cache or fetched from UserManagment",
+    ["result"],
+)
+
+USER_SERVICE_REQUESTS = Counter(
+    "group_user_service_requests_total",
+    "Batched profile requests to UserManagment; skipped while backing off after a failure",
+    ["result"],
+)
+
+GROUP_SOURCE_REQUESTS = Counter(
+    "group_dashboard_source_requests_total",
+    "Dashboard calls to PetManagment and SharingService by outcome",
+    ["source", "result"],
+)
@@ -1,8 +1,8 @@
 from pydantic import BaseModel
 import uuid
 from datetime import datetime
-from typing import Optional
-from app.adapter.db.models import Role, ActivityStatus
+from typing import Any, Dict, List, Optional
+from app.adapter.db.models import Role, ActivityStatus, Frequency
 
 class GroupCreateDTO(BaseModel):
     name: str
@@ -18,6 +18,11 @@ class GroupResponseDTO(BaseModel):
 class GroupUpdateDTO(BaseModel):
     name: Optional[str] = None
 
+class UserProfileDTO(BaseModel):
+    id: uuid.UUID
+    username: str
+    current_emotional_status: Optional[str] = None
+
 class GroupMemberDTO(BaseModel):
     group_id: uuid.UUID
     user_id: uuid.UUID
@@ -25,6 +30,8 @@ class GroupMemberDTO(BaseModel):
     is_sharing_location_with_group: bool
     has_notifications_enabled: bool
     joined_at: datetime
+    # Only filled with ?expand=user, and left null if UserManagment could not answer in time
+    user: Optional[UserProfileDTO] = None
 
 class GroupMemberUpdateDTO(BaseModel):
     role: Optional[Role] = None
@@ -40,6 +47,17 @@ class ActivityCreateDTO(BaseModel):
     xp_reward: int
     status: ActivityStatus = ActivityStatus.ACTIVE
 
+class ActivityBulkItemDTO(BaseModel):
+    title: str
+    description: Optional[str] = None
+    start_date: datetime
+    end_date: datetime
+    xp_reward: int
+    status: ActivityStatus = ActivityStatus.ACTIVE
+
+class ActivityBulkCreateDTO(BaseModel):
+    activities: List[ActivityBulkItemDTO]
+
 class ActivityUpdateDTO(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -58,6 +76,35 @@ class ActivityResponseDTO(BaseModel):
     xp_reward: int
     status: ActivityStatus
     created_at: datetime
+    # Set on occurrences of a recurring activity that are not stored yet; storing one
+    # (PUT /recurring-activities/{id}/occurrences/{start_date}) keeps its id
+    recurrence_id: Optional[uuid.UUID] = None
+
+class RecurringActivityCreateDTO(BaseModel):
+    title: str
+    description: Optional[str] = None
+    xp_reward: int
+    frequency: Frequency
+    interval: int = 1
+    # 0 = Monday ... 6 = Sunday; weekly rules only
+    weekdays: List[int] = []
+    starts_at: datetime
+    duration_minutes: int
+    until: Optional[datetime] = None
+
+class RecurringActivityResponseDTO(BaseModel):
+    id: uuid.UUID
+    group_id: uuid.UUID
+    title: str
+    description: Optional[str]
+    xp_reward: int
+    frequency: Frequency
+    interval: int
+    weekdays: List[int]
+    starts_at: datetime
+    duration_minutes: int
+    until: Optional[datetime]
+    created_at: datetime
 
 class UserActivityResponseDTO(BaseModel):
     id: uuid.UUID
@@ -70,3 +117,13 @@ class UserActivityResponseDTO(BaseModel):
     xp_reward: int
     status: ActivityStatus
     created_at: datetime
+
+class GroupDashboardDTO(BaseModel):
+    group: GroupResponseDTO
+    members: List[GroupMemberDTO]
+    activities: List[ActivityResponseDTO]
+    # Documents of PetManagment's /pet/group/{id} and SharingService's /mood/group/{id}, as they return them
+    pet: Optional[Dict[str, Any]] = None
+    moods: Optional[List[Dict[str, Any]]] = None
+    # Sources that did not answer in time; their fields are null rather than empty
+    unavailable: List[str] = []
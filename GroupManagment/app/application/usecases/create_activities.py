@@ -0,0 +1,25 @@
+import uuid
+from fastapi import HTTPException
+from app.domain.repositories.group_repository import GroupRepository
+from app.application.dto.group_dto import ActivityBulkCreateDTO, ActivityResponseDTO
+from app.application.usecases.create_activity import _new_activity, _to_response
+from typing import List
+
+MAX_BULK_ACTIVITIES = 500
+
+class CreateActivitiesUseCase:
+    def __init__(self, repository: GroupRepository):
+        self.repository = repository
+
+    def execute(self, group_id: uuid.UUID, data: ActivityBulkCreateDTO) -> List[ActivityResponseDTO]:
+        """Creates all the activities in one transaction, or none of them."""
+        if not 1 <= len(data.activities) <= MAX_BULK_ACTIVITIES:
+            raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_BULK_ACTIVITIES} activities are required")
+
+        saved_activities = self.repository.save_activities(
+            [_new_activity(group_id, activity) for activity in data.activities]
+        )
+        if saved_activities is None:
+            raise HTTPException(status_code=404, detail="Group not found")
+
+        return [_to_response(activity) for activity in saved_activities]
@@ -0,0 +1,59 @@
+import uuid
+from fastapi import HTTPException
+from app.adapter.db.models import Frequency
+from app.domain.repositories.group_repository import GroupRepository
+from app.domain.entities.recurring_activity import RecurringActivity
+from app.application.dto.group_dto import RecurringActivityCreateDTO, RecurringActivityResponseDTO
+from app.application.usecases.list_user_activities import _naive_utc
+
+def _to_recurring_response(rule: RecurringActivity) -> RecurringActivityResponseDTO:
+    return RecurringActivityResponseDTO(
+        id=rule.id,
+        group_id=rule.group_id,
+        title=rule.title,
+        description=rule.description,
+        xp_reward=rule.xp_reward,
+        frequency=rule.frequency,
+        interval=rule.interval,
+        weekdays=rule.weekdays,
+        starts_at=rule.starts_at,
+        duration_minutes=rule.duration_minutes,
+        until=rule.until,
+        created_at=rule.created_at
+    )
+
+class CreateRecurringActivityUseCase:
+    def __init__(self, repository: GroupRepository):
+        self.repository = repository
+
+    def execute(self, group_id: uuid.UUID, data: RecurringActivityCreateDTO) -> RecurringActivityResponseDTO:
+        if data.interval < 1:
+            raise HTTPException(status_code=400, detail="interval must be at least 1")
+        if data.duration_minutes < 1:
+            raise HTTPException(status_code=400, detail="duration_minutes must be at least 1")
+        if data.frequency == Frequency.WEEKLY:
+            if not data.weekdays or not all(0 <= day <= 6 for day in data.weekdays):
+                raise HTTPException(status_code=400, detail="Weekly rules need weekdays between 0 (Monday) and 6 (Sunday)")
+        elif data.weekdays:
+            raise HTTPException(status_code=400, detail="weekdays only apply to weekly rules")
+        starts_at, until = _naive_utc(data.starts_at), _naive_utc(data.until)
+        if until is not None and until < starts_at:
+            raise HTTPException(status_code=400, detail="until must not be earlier than starts_at")
+
+        rule = self.repository.save_recurring_activity(RecurringActivity(
+            id=uuid.uuid4(),
+            group_id=group_id,
+            title=data.title,
+            description=data.description,
+            xp_reward=data.xp_reward,
+            frequency=data.frequency,
+            interval=data.interval,
+            starts_at=starts_at,
+            duration_minutes=data.duration_minutes,
+            until=until,
+            weekdays=sorted(set(data.weekdays))
+        ))
+        if not rule:
+            raise HTTPException(status_code=404, detail="Group not found")
+
+        return _to_recurring_response(rule)
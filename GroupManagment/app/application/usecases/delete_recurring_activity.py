@@ -0,0 +1,15 @@
+import uuid
+from fastapi import HTTPException
+from app.domain.repositories.group_repository import GroupRepository
+
+class DeleteRecurringActivityUseCase:
+    def __init__(self, repository: GroupRepository):
+        self.repository = repository
+
+    def execute(self, rule_id: uuid.UUID):
+        # Occurrences already stored stay, as completed ones count towards the group's history
+        success = self.repository.delete_recurring_activity(rule_id)
+        if not success:
+            raise HTTPException(status_code=404, detail="Recurring activity not found")
+
+        return {"message": "Recurring activity deleted successfully"}
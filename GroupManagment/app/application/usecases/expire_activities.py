@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from app.domain.repositories.group_repository import GroupRepository
+
+class ExpireActivitiesUseCase:
+    def __init__(self, repository: GroupRepository):
+        self.repository = repository
+
+    def execute(self, batch_size: int) -> tuple[int, datetime | None]:
+        """Expires every overdue ACTIVE activity in batches.
+
+        Returns how many were expired and the end_date of the next one to expire, if any.
+        """
+        # end_date is stored without a time zone, in UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        total = 0
+        while True:
+            expired = self.repository.expire_activities(now, batch_size)
+            total += expired
+            if expired < batch_size:
+                break
+        return total, self.repository.next_activity_end()
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import uuid
+from typing import Any, Tuple
+from app.domain.repositories.group_repository import GroupRepository
+from app.domain.repositories.group_source import GroupSource, GroupSourceUnavailable
+from app.domain.repositories.user_directory import UserDirectory
+from app.application.dto.group_dto import GroupDashboardDTO
+from app.application.usecases.get_group import GetGroupUseCase
+from app.application.usecases.list_activities import ListActivitiesUseCase
+from app.application.usecases.list_group_members import ListGroupMembersUseCase
+
+logger = logging.getLogger(__name__)
+
+class GetGroupDashboardUseCase:
+    def __init__(self, repository: GroupRepository, users: UserDirectory, pets: GroupSource, moods: GroupSource):
+        self.repository = repository
+        self.users = users
+        self.pets = pets
+        self.moods = moods
+
+    def _load_local(self, group_id: uuid.UUID):
+        # Runs in a worker thread on the request's session, one query after another
+        group = GetGroupUseCase(self.repository).execute(group_id)
+        members = ListGroupMembersUseCase(self.repository, self.users).execute(group_id, expand_user=True)
+        activities = ListActivitiesUseCase(self.repository).execute(group_id)
+        return group, members, activities
+
+    async def _fetch(self, name: str, source: GroupSource, group_id: uuid.UUID,
+                     authorization: str | None) -> Tuple[Any | None, bool]:
+        try:
+            return await source.fetch(group_id, authorization), True
+        except GroupSourceUnavailable as exc:
+            logger.warning("Dashboard of group %s served without %s: %s", group_id, name, exc)
+            return None, False
+
+    async def execute(self, group_id: uuid.UUID, authorization: str | None = None) -> GroupDashboardDTO:
+        """Local rows, the pet and the moodboard of the group, fetched concurrently."""
+        (group, members, activities), (pet, pet_ok), (moods, moods_ok) = await asyncio.gather(
+            asyncio.to_thread(self._load_local, group_id),
+            self._fetch("pet", self.pets, group_id, authorization),
+            self._fetch("moods", self.moods, group_id, authorization),
+        )
+        return GroupDashboardDTO(
+            group=group,
+            members=members,
+            activities=activities,
+            pet=pet,
+            moods=moods,
+            unavailable=[name for name, ok in (("pet", pet_ok), ("moods", moods_ok)) if not ok]
+        )
@@ -8,16 +8,14 @@ class JoinGroupUseCase:
         self.repository = repository
 
     def execute(self, invite_code: str, user_id: uuid.UUID):
-        # Buscar grupo por código
+        # Agregar como MIEMBRO en una sola sentencia; solo se busca el grupo para el mensaje
+        joined = self.repository.join_by_invite_code(invite_code, user_id, Role.MEMBER)
         group = self.repository.find_by_invite_code(invite_code)
         if not group:
             raise HTTPException(status_code=404, detail="Código de invitación inválido")
 
-        # Verificar si ya es miembro
-        if self.repository.is_member(group.id, user_id):
+        # Si no se insertó nada, el usuario ya era miembro
+        if joined is None:
             raise HTTPException(status_code=400, detail="Ya eres miembro de este grupo")
 
-        # Agregar como MIEMBRO
-        self.repository.add_member(group.id, user_id, Role.MEMBER)
-
-        return {"message": f"Te has unido exitosamente al grupo {group.name}", "group_id": f"{group.id}"}
\ No newline at end of file
+        return {"message": f"Te has unido exitosamente al grupo {group.name}", "group_id": f"{group.id}"}
@@ -1,31 +1,66 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
+from app.adapter.db.models import ActivityStatus
 from app.domain.repositories.group_repository import GroupRepository
 from app.application.dto.group_dto import ActivityResponseDTO
+from app.application.usecases.create_activity import _to_response
+from app.application.usecases.list_user_activities import _naive_utc
 from typing import List
 
+# Occurrences of recurring activities are only expanded within a window this long
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
 class ListActivitiesUseCase:
     def __init__(self, repository: GroupRepository):
         self.repository = repository
 
-    def execute(self, group_id: uuid.UUID) -> List[ActivityResponseDTO]:
+    def _occurrences(self, group_id: uuid.UUID, start: datetime, end: datetime) -> List[ActivityResponseDTO]:
+        # Occurrences in the window that are not stored, i.e. never completed nor edited
+        candidates = [
+            (rule, occurrence, rule.occurrence_id(occurrence))
+            for rule in self.repository.list_recurring_activities_by_group(group_id, before=end)
+            for occurrence in rule.occurrences(start, end)
+        ]
+        stored = self.repository.find_activity_ids([activity_id for _, _, activity_id in candidates])
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return [
+            ActivityResponseDTO(
+                id=activity_id,
+                group_id=rule.group_id,
+                title=rule.title,
+                description=rule.description,
+                start_date=occurrence,
+                end_date=occurrence + rule.duration,
+                xp_reward=rule.xp_reward,
+                # What the expiry job would have made of it
+                status=ActivityStatus.EXPIRED if occurrence + rule.duration <= now else ActivityStatus.ACTIVE,
+                created_at=rule.created_at,
+                recurrence_id=rule.id
+            )
+            for rule, occurrence, activity_id in candidates
+            if activity_id not in stored
+        ]
+
+    def execute(self, group_id: uuid.UUID, start: datetime | None = None,
+                end: datetime | None = None) -> List[ActivityResponseDTO]:
+        """The group's activities; given a window, those overlapping it plus the recurring ones' occurrences."""
+        if (start is None) != (end is None):
+            raise HTTPException(status_code=400, detail="from and to must be given together")
+        start, end = _naive_utc(start), _naive_utc(end)
+        if start is not None:
+            if start >= end:
+                raise HTTPException(status_code=400, detail="from must be earlier than to")
+            if end - start > MAX_OCCURRENCE_WINDOW:
+                raise HTTPException(status_code=400, detail=f"The window can span at most {MAX_OCCURRENCE_WINDOW.days} days")
+
         # Check if group exists
         group = self.repository.find_by_id(group_id)
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
 
-        activities = self.repository.list_activities_by_group(group_id)
-        return [
-            ActivityResponseDTO(
-                id=activity.id,
-                group_id=activity.group_id,
-                title=activity.title,
-                description=activity.description,
-                start_date=activity.start_date,
-                end_date=activity.end_date,
-                xp_reward=activity.xp_reward,
-                status=activity.status,
-                created_at=activity.created_at
-            )
-            for activity in activities
-        ]
+        activities = [_to_response(activity) for activity in self.repository.list_activities_by_group(group_id, start, end)]
+        if start is None:
+            return activities
+        activities += self._occurrences(group_id, start, end)
+        return sorted(activities, key=lambda activity: (activity.start_date, str(activity.id)))
@@ -1,20 +1,24 @@
 import uuid
 from fastapi import HTTPException
 from app.domain.repositories.group_repository import GroupRepository
-from app.application.dto.group_dto import GroupMemberDTO
+from app.domain.repositories.user_directory import UserDirectory
+from app.application.dto.group_dto import GroupMemberDTO, UserProfileDTO
 from typing import List
 
 class ListGroupMembersUseCase:
-    def __init__(self, repository: GroupRepository):
+    def __init__(self, repository: GroupRepository, users: UserDirectory | None = None):
         self.repository = repository
+        self.users = users
 
-    def execute(self, group_id: uuid.UUID) -> List[GroupMemberDTO]:
+    def execute(self, group_id: uuid.UUID, expand_user: bool = False) -> List[GroupMemberDTO]:
         # Check if group exists
         group = self.repository.find_by_id(group_id)
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
 
         members = self.repository.list_members(group_id)
+        # One batched lookup for the whole list instead of one per member
+        profiles = self.users.get_profiles([member.user_id for member in members]) if expand_user else {}
         return [
             GroupMemberDTO(
                 group_id=member.group_id,
@@ -22,7 +26,12 @@ class ListGroupMembersUseCase:
                 role=member.role,
                 is_sharing_location_with_group=member.is_sharing_location_with_group,
                 has_notifications_enabled=member.has_notifications_enabled,
-                joined_at=member.joined_at
+                joined_at=member.joined_at,
+                user=UserProfileDTO(
+                    id=profile.id,
+                    username=profile.username,
+                    current_emotional_status=profile.current_emotional_status
+                ) if (profile := profiles.get(member.user_id)) else None
             )
             for member in members
         ]
@@ -0,0 +1,12 @@
+import uuid
+from app.domain.repositories.group_repository import GroupRepository
+from app.application.dto.group_dto import RecurringActivityResponseDTO
+from app.application.usecases.create_recurring_activity import _to_recurring_response
+from typing import List
+
+class ListRecurringActivitiesUseCase:
+    def __init__(self, repository: GroupRepository):
+        self.repository = repository
+
+    def execute(self, group_id: uuid.UUID) -> List[RecurringActivityResponseDTO]:
+        return [_to_recurring_response(rule) for rule in self.repository.list_recurring_activities_by_group(group_id)]
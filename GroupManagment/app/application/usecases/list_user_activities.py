@@ -1,14 +1,53 @@
+import base64
+import binascii
+import json
 import uuid
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from app.adapter.db.models import ActivityStatus
 from app.domain.repositories.group_repository import GroupRepository
+from app.domain.entities.activity import UserActivity
 from app.application.dto.group_dto import UserActivityResponseDTO
-from typing import List
+from typing import List, Tuple
+
+DEFAULT_ACTIVITIES_LIMIT = 50
+MAX_ACTIVITIES_LIMIT = 200
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    # Activity dates are stored without a time zone
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _encode_cursor(activity: UserActivity) -> str:
+    raw = json.dumps([activity.start_date.isoformat(), str(activity.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        start_date, activity_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _naive_utc(datetime.fromisoformat(start_date)), uuid.UUID(activity_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 class ListUserActivitiesUseCase:
     def __init__(self, repository: GroupRepository):
         self.repository = repository
 
-    def execute(self, user_id: uuid.UUID) -> List[UserActivityResponseDTO]:
-        activities = self.repository.list_activities_by_user(user_id)
+    def execute(self, user_id: uuid.UUID, status: ActivityStatus | None = None, start: datetime | None = None,
+                end: datetime | None = None, limit: int = DEFAULT_ACTIVITIES_LIMIT,
+                cursor: str | None = None) -> Tuple[List[UserActivityResponseDTO], str | None]:
+        """Returns one page of the user's activities, newest start first, and the cursor of the next page."""
+        if not 1 <= limit <= MAX_ACTIVITIES_LIMIT:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_ACTIVITIES_LIMIT}")
+        start, end = _naive_utc(start), _naive_utc(end)
+        if start is not None and end is not None and start >= end:
+            raise HTTPException(status_code=400, detail="from must be earlier than to")
+        after = _decode_cursor(cursor) if cursor else None
+
+        # One extra row tells whether another page exists
+        activities = self.repository.list_activities_by_user(user_id, status, start, end, after, limit + 1)
+        next_cursor = _encode_cursor(activities[limit - 1]) if len(activities) > limit else None
 
         return [
             UserActivityResponseDTO(
@@ -23,5 +62,5 @@ class ListUserActivitiesUseCase:
                 status=activity.status,
                 created_at=activity.created_at
             )
-            for activity in activities
-        ]
\ No newline at end of file
+            for activity in activities[:limit]
+        ], next_cursor
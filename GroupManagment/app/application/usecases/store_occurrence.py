@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+from fastapi import HTTPException
+from app.adapter.db.models import ActivityStatus
+from app.domain.repositories.group_repository import GroupRepository
+from app.domain.entities.activity import Activity
+from app.application.dto.group_dto import ActivityUpdateDTO, ActivityResponseDTO
+from app.application.usecases.create_activity import _to_response
+from app.application.usecases.list_user_activities import _naive_utc
+from app.application.usecases.update_activity import UpdateActivityUseCase
+
+class StoreOccurrenceUseCase:
+    def __init__(self, repository: GroupRepository):
+        self.repository = repository
+
+    def execute(self, rule_id: uuid.UUID, occurrence_start: datetime, data: ActivityUpdateDTO) -> ActivityResponseDTO:
+        """Stores one occurrence of a rule as an activity with the changes applied, e.g. to complete it."""
+        rule = self.repository.find_recurring_activity_by_id(rule_id)
+        if not rule:
+            raise HTTPException(status_code=404, detail="Recurring activity not found")
+        occurrence_start = _naive_utc(occurrence_start)
+        if not rule.is_occurrence(occurrence_start):
+            raise HTTPException(status_code=404, detail="Occurrence not found")
+
+        activity_id = rule.occurrence_id(occurrence_start)
+        saved_activity = self.repository.save_activity(Activity(
+            id=activity_id,
+            group_id=rule.group_id,
+            title=data.title if data.title is not None else rule.title,
+            description=data.description if data.description is not None else rule.description,
+            start_date=data.start_date if data.start_date is not None else occurrence_start,
+            end_date=data.end_date if data.end_date is not None else occurrence_start + rule.duration,
+            xp_reward=data.xp_reward if data.xp_reward is not None else rule.xp_reward,
+            status=data.status if data.status is not None else ActivityStatus.ACTIVE,
+            created_at=None  # Will be set by database
+        ))
+        if not saved_activity:
+            # Stored already, by an earlier edit or a concurrent one
+            return UpdateActivityUseCase(self.repository).execute(activity_id, data)
+
+        return _to_response(saved_activity)
@@ -14,3 +14,8 @@ class Activity:
     xp_reward: int
     status: ActivityStatus
     created_at: datetime
+
+@dataclass
+class UserActivity(Activity):
+    """An activity of one of the user's groups, with the group's name."""
+    group_name: str
@@ -0,0 +1,63 @@
+import itertools
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator, List
+from app.adapter.db.models import Frequency
+
+@dataclass
+class RecurringActivity:
+    """An activity repeated daily or on given weekdays every `interval` days or weeks.
+
+    Dates are naive UTC, like the activities' own.
+    """
+    id: uuid.UUID
+    group_id: uuid.UUID
+    title: str
+    description: str | None
+    xp_reward: int
+    frequency: Frequency
+    interval: int
+    starts_at: datetime
+    duration_minutes: int
+    until: datetime | None = None
+    weekdays: List[int] = field(default_factory=list)
+    created_at: datetime | None = None
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(minutes=self.duration_minutes)
+
+    def occurrences(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """Start times of the occurrences overlapping [start, end), in order.
+
+        Jumps straight to the period holding `start` and stops at `end`, so the
+        cost depends on the window, not on how long ago the rule began.
+        """
+        if self.frequency == Frequency.WEEKLY:
+            # Periods are weeks counted from the Monday of the first one
+            anchor = self.starts_at - timedelta(days=self.starts_at.weekday())
+            period = timedelta(weeks=self.interval)
+            offsets = [timedelta(days=weekday) for weekday in sorted(set(self.weekdays))]
+        else:
+            anchor = self.starts_at
+            period = timedelta(days=self.interval)
+            offsets = [timedelta(0)]
+
+        # Offsets are shorter than a period, so the period before this one is the
+        # earliest that can still reach `start`
+        first_period = max(0, (start - self.duration - anchor) // period - 1)
+        for index in itertools.count(first_period):
+            for offset in offsets:
+                occurrence = anchor + index * period + offset
+                if occurrence >= end or (self.until is not None and occurrence > self.until):
+                    return
+                if occurrence >= self.starts_at and occurrence + self.duration >= start:
+                    yield occurrence
+
+    def is_occurrence(self, at: datetime) -> bool:
+        return any(occurrence == at for occurrence in self.occurrences(at, at + timedelta(microseconds=1)))
+
+    def occurrence_id(self, at: datetime) -> uuid.UUID:
+        """Id of the occurrence, the same before and after it is stored as an activity."""
+        return uuid.uuid5(self.id, at.isoformat())
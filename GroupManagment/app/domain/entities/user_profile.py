@@ -0,0 +1,8 @@
+import uuid
+from dataclasses import dataclass
+
+@dataclass
+class UserProfile:
+    id: uuid.UUID
+    username: str
+    current_emotional_status: str | None = None
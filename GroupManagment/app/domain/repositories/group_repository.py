@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
+from app.adapter.db.models import Role
 from app.domain.entities.group import Group
-from app.domain.entities.activity import Activity
+from app.domain.entities.activity import Activity, ActivityStatus, UserActivity
+from app.domain.entities.recurring_activity import RecurringActivity
 import uuid
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
 
 class GroupRepository(ABC):
     @abstractmethod
@@ -29,6 +32,14 @@ class GroupRepository(ABC):
     def add_member(self, group_id: uuid.UUID, user_id: uuid.UUID, role: str):
         pass
 
+    @abstractmethod
+    def join_by_invite_code(self, code: str, user_id: uuid.UUID, role: str) -> uuid.UUID | None:
+        """Adds the user to the group with this invite code unless already a member.
+
+        Returns the group id if the user was newly added, else None.
+        """
+        pass
+
     @abstractmethod
     def get_member(self, group_id: uuid.UUID, user_id: uuid.UUID):
         pass
@@ -37,6 +48,10 @@ class GroupRepository(ABC):
     def list_members(self, group_id: uuid.UUID):
         pass
 
+    @abstractmethod
+    def members_fingerprint(self, group_id: uuid.UUID):
+        pass
+
     @abstractmethod
     def update_member(self, group_id: uuid.UUID, user_id: uuid.UUID, role=None, is_sharing_location_with_group=None, has_notifications_enabled=None):
         pass
@@ -54,7 +69,18 @@ class GroupRepository(ABC):
         pass
 
     @abstractmethod
-    def save_activity(self, activity: Activity) -> Activity:
+    def find_roles_by_user_id(self, user_id: uuid.UUID) -> Dict[uuid.UUID, Role]:
+        """Role of the user in each group they belong to, keyed by group id."""
+        pass
+
+    @abstractmethod
+    def save_activity(self, activity: Activity) -> Activity | None:
+        """The activity as stored, or None if its group does not exist."""
+        pass
+
+    @abstractmethod
+    def save_activities(self, activities: List[Activity]) -> List[Activity] | None:
+        """Inserts all the activities or none; None if their group does not exist."""
         pass
 
     @abstractmethod
@@ -62,11 +88,15 @@ class GroupRepository(ABC):
         pass
 
     @abstractmethod
-    def list_activities_by_group(self, group_id: uuid.UUID) -> List[Activity]:
+    def list_activities_by_group(self, group_id: uuid.UUID, start: datetime | None = None,
+                                 end: datetime | None = None) -> List[Activity]:
         pass
 
     @abstractmethod
-    def list_activities_by_user(self, user_id: uuid.UUID) -> List[Activity]:
+    def list_activities_by_user(self, user_id: uuid.UUID, status: ActivityStatus | None = None,
+                                start: datetime | None = None, end: datetime | None = None,
+                                after: Tuple[datetime, uuid.UUID] | None = None,
+                                limit: int = 50) -> List[UserActivity]:
         pass
 
     @abstractmethod
@@ -75,4 +105,36 @@ class GroupRepository(ABC):
 
     @abstractmethod
     def delete_activity(self, activity_id: uuid.UUID) -> bool:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def expire_activities(self, now: datetime, limit: int) -> int:
+        """Marks up to `limit` ACTIVE activities whose end_date has passed as EXPIRED; returns how many."""
+        pass
+
+    @abstractmethod
+    def next_activity_end(self) -> datetime | None:
+        """The earliest end_date among ACTIVE activities."""
+        pass
+
+    @abstractmethod
+    def find_activity_ids(self, activity_ids: List[uuid.UUID]) -> Set[uuid.UUID]:
+        pass
+
+    @abstractmethod
+    def save_recurring_activity(self, rule: RecurringActivity) -> RecurringActivity | None:
+        """The rule as stored, or None if its group does not exist."""
+        pass
+
+    @abstractmethod
+    def find_recurring_activity_by_id(self, rule_id: uuid.UUID) -> RecurringActivity | None:
+        pass
+
+    @abstractmethod
+    def list_recurring_activities_by_group(self, group_id: uuid.UUID,
+                                           before: datetime | None = None) -> List[RecurringActivity]:
+        pass
+
+    @abstractmethod
+    def delete_recurring_activity(self, rule_id: uuid.UUID) -> bool:
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+import uuid
+from typing import Any
+
+class GroupSourceUnavailable(Exception):
+    """The service that owns the data did not answer in time, or answered with an error."""
+
+class GroupSource(ABC):
+    @abstractmethod
+    async def fetch(self, group_id: uuid.UUID, authorization: str | None = None) -> Any | None:
+        """The owning service's document for the group, or None if it has none.
+
+        `authorization` is the caller's credential, forwarded to services that
+        check membership themselves.
+
+        Raises GroupSourceUnavailable when the service cannot answer.
+        """
+        pass
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from app.domain.entities.user_profile import UserProfile
+import uuid
+from typing import Dict, List
+
+class UserDirectory(ABC):
+    @abstractmethod
+    def get_profiles(self, user_ids: List[uuid.UUID]) -> Dict[uuid.UUID, UserProfile]:
+        """Profiles of the given users, keyed by id; users that could not be resolved are left out."""
+        pass
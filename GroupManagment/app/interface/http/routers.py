@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+import time
 import uuid
+from datetime import datetime
+from app.adapter.cache.user_profile_cache import USER_PROFILE_CACHE_TTL_SECONDS
 from app.adapter.db.database import get_db
+from app.adapter.db.models import ActivityStatus, Role
 from app.adapter.db.group_repository_sql import SQLGroupRepository
+from app.adapter.http.conditional import not_modified, set_validators, weak_etag
+from app.adapter.http.singleflight import SingleFlight
+from app.adapter.http.user_service import get_user_directory
+from app.adapter.http.group_sources import get_mood_source, get_pet_source
+from app.adapter.jobs.activity_expiry import expiry_alarm
 from app.application.dto.group_dto import (
     GroupCreateDTO, JoinGroupDTO, GroupResponseDTO, GroupUpdateDTO, GroupMemberDTO, 
-    GroupMemberUpdateDTO, ActivityCreateDTO, ActivityUpdateDTO, ActivityResponseDTO, UserActivityResponseDTO
+    GroupMemberUpdateDTO, ActivityCreateDTO, ActivityUpdateDTO, ActivityResponseDTO, UserActivityResponseDTO,
+    GroupDashboardDTO, ActivityBulkCreateDTO, RecurringActivityCreateDTO, RecurringActivityResponseDTO
 )
 from app.application.usecases.create_group import CreateGroupUseCase
 from app.application.usecases.join_group import JoinGroupUseCase
@@ -16,17 +26,35 @@ from app.application.usecases.list_group_members import ListGroupMembersUseCase
 from app.application.usecases.update_group_member import UpdateGroupMemberUseCase
 from app.application.usecases.remove_group_member import RemoveGroupMemberUseCase
 from app.application.usecases.create_activity import CreateActivityUseCase
+from app.application.usecases.create_activities import CreateActivitiesUseCase
+from app.application.usecases.create_recurring_activity import CreateRecurringActivityUseCase
+from app.application.usecases.list_recurring_activities import ListRecurringActivitiesUseCase
+from app.application.usecases.delete_recurring_activity import DeleteRecurringActivityUseCase
+from app.application.usecases.store_occurrence import StoreOccurrenceUseCase
 from app.application.usecases.get_activity import GetActivityUseCase
 from app.application.usecases.list_activities import ListActivitiesUseCase
 from app.application.usecases.update_activity import UpdateActivityUseCase
 from app.application.usecases.delete_activity import DeleteActivityUseCase
 from app.application.usecases.list_user_groups import ListUserGroupsUseCase
-from app.application.usecases.list_user_activities import ListUserActivitiesUseCase
-from app.adapter.auth.dependencies import get_current_user_id
-from typing import List
+from app.application.usecases.get_group_dashboard import GetGroupDashboardUseCase
+from app.application.usecases.list_user_activities import DEFAULT_ACTIVITIES_LIMIT, ListUserActivitiesUseCase
+from app.domain.repositories.user_directory import UserDirectory
+from app.domain.repositories.group_source import GroupSource
+from app.adapter.auth.dependencies import (
+    get_activity_role, get_current_user_id, get_group_admin, get_group_role, get_recurring_activity_role
+)
+from typing import List, Literal
 
 router = APIRouter()
 
+# Everyone in an active group asks for the member list at the same moment
+member_reads = SingleFlight("group_members")
+
+def _require_admin_or_self(role: Role, user_id: str, member_user_id: uuid.UUID):
+    # Members may manage their own membership; anyone else's needs an admin
+    if role != Role.ADMIN and member_user_id != uuid.UUID(user_id):
+        raise HTTPException(status_code=403, detail="Solo un administrador del grupo puede hacer esto")
+
 # List user groups endpoint (must come before dynamic routes)
 @router.get("/my-groups", response_model=List[GroupResponseDTO])
 def list_user_groups(
@@ -37,15 +65,24 @@ def list_user_groups(
     use_case = ListUserGroupsUseCase(repo)
     return use_case.execute(uuid.UUID(user_id))
 
-# List user activities endpoint
+# List user activities endpoint, one page at a time; the next page's cursor comes in X-Next-Cursor
 @router.get("/my-activities", response_model=List[UserActivityResponseDTO])
 def list_user_activities(
+    response: Response,
+    status: ActivityStatus | None = Query(None),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    limit: int = Query(DEFAULT_ACTIVITIES_LIMIT),
+    cursor: str | None = Query(None),
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = ListUserActivitiesUseCase(repo)
-    return use_case.execute(uuid.UUID(user_id))
+    activities, next_cursor = use_case.execute(uuid.UUID(user_id), status, start, end, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return activities
 
 # Group CRUD endpoints
 @router.post("/", response_model=GroupResponseDTO)
@@ -61,17 +98,26 @@ def create_group(
 @router.get("/{group_id}", response_model=GroupResponseDTO)
 def get_group(
     group_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    role: Role = Depends(get_group_role),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = GetGroupUseCase(repo)
-    return use_case.execute(group_id)
+    # The row is small, so the validator comes from the one lookup that builds the body
+    group = use_case.execute(group_id)
+    etag = weak_etag(group.id, group.name, group.invite_code)
+    if cached := not_modified(request, etag):
+        return cached
+    set_validators(response, etag)
+    return group
 
 @router.put("/{group_id}", response_model=GroupResponseDTO)
 def update_group(
     group_id: uuid.UUID,
     group_data: GroupUpdateDTO,
-    user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_group_admin),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
@@ -81,13 +127,29 @@ def update_group(
 @router.delete("/{group_id}")
 def delete_group(
     group_id: uuid.UUID,
-    user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_group_admin),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = DeleteGroupUseCase(repo)
     return use_case.execute(group_id)
 
+# Everything the group screen shows, in one round trip
+@router.get("/{group_id}/dashboard", response_model=GroupDashboardDTO)
+async def get_group_dashboard(
+    group_id: uuid.UUID,
+    authorization: str = Header(...),
+    role: Role = Depends(get_group_role),
+    users: UserDirectory = Depends(get_user_directory),
+    pets: GroupSource = Depends(get_pet_source),
+    moods: GroupSource = Depends(get_mood_source),
+    db: Session = Depends(get_db)
+):
+    repo = SQLGroupRepository(db)
+    use_case = GetGroupDashboardUseCase(repo, users, pets, moods)
+    # The sibling services check membership themselves, on behalf of the same caller
+    return await use_case.execute(group_id, authorization)
+
 # Group join endpoint
 @router.post("/join")
 def join_group(
@@ -103,12 +165,37 @@ def join_group(
 @router.get("/{group_id}/members", response_model=List[GroupMemberDTO])
 def list_group_members(
     group_id: uuid.UUID,
-    user_id: str = Depends(get_current_user_id),
+    request: Request,
+    response: Response,
+    expand: Literal["user"] | None = Query(None, description="user: include each member's profile from UserManagment"),
+    role: Role = Depends(get_group_role),
+    users: UserDirectory = Depends(get_user_directory),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
-    use_case = ListGroupMembersUseCase(repo)
-    return use_case.execute(group_id)
+    use_case = ListGroupMembersUseCase(repo, users)
+    fingerprint, last_joined = repo.members_fingerprint(group_id)
+    if expand == "user":
+        # Validated before UserManagment is called, so the ETag cannot cover the profiles.
+        # It rolls over every profile cache TTL instead: the staleness the cache already
+        # allows. Last-Modified is not sent, as profile changes do not move it.
+        etag = weak_etag(group_id, fingerprint, expand, int(time.time() // USER_PROFILE_CACHE_TTL_SECONDS))
+        if cached := not_modified(request, etag):
+            return cached
+        members = member_reads.do((group_id, expand, etag), lambda: use_case.execute(group_id, expand_user=True))
+        # A body missing profiles (UserManagment slow or down) is not worth caching
+        if all(member.user is not None for member in members):
+            set_validators(response, etag)
+        return members
+
+    etag = weak_etag(group_id, fingerprint)
+    if cached := not_modified(request, etag, last_joined):
+        return cached
+    # Keyed on the ETag too, so a load that started before a write is never served
+    # under the validator computed after it
+    members = member_reads.do((group_id, etag), lambda: use_case.execute(group_id))
+    set_validators(response, etag, last_joined)
+    return members
 
 @router.put("/{group_id}/members/{member_user_id}", response_model=GroupMemberDTO)
 def update_group_member(
@@ -116,8 +203,12 @@ def update_group_member(
     member_user_id: uuid.UUID,
     member_data: GroupMemberUpdateDTO,
     user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_group_role),
     db: Session = Depends(get_db)
 ):
+    if member_data.role is not None and role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Solo un administrador del grupo puede cambiar roles")
+    _require_admin_or_self(role, user_id, member_user_id)
     repo = SQLGroupRepository(db)
     use_case = UpdateGroupMemberUseCase(repo)
     return use_case.execute(group_id, member_user_id, member_data)
@@ -127,8 +218,10 @@ def remove_group_member(
     group_id: uuid.UUID,
     member_user_id: uuid.UUID,
     user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_group_role),
     db: Session = Depends(get_db)
 ):
+    _require_admin_or_self(role, user_id, member_user_id)
     repo = SQLGroupRepository(db)
     use_case = RemoveGroupMemberUseCase(repo)
     return use_case.execute(group_id, member_user_id)
@@ -138,52 +231,125 @@ def remove_group_member(
 def create_activity(
     group_id: uuid.UUID,
     activity_data: ActivityCreateDTO,
-    user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_group_role),
     db: Session = Depends(get_db)
 ):
     # Override group_id from URL
     activity_data.group_id = group_id
     repo = SQLGroupRepository(db)
     use_case = CreateActivityUseCase(repo)
-    return use_case.execute(activity_data)
+    activity = use_case.execute(activity_data)
+    if activity.status == ActivityStatus.ACTIVE:
+        expiry_alarm.notify(activity.end_date)
+    return activity
+
+# Many activities at once, e.g. a generated weekly schedule; all are created or none
+@router.post("/{group_id}/activities/bulk", response_model=List[ActivityResponseDTO])
+def create_activities(
+    group_id: uuid.UUID,
+    data: ActivityBulkCreateDTO,
+    role: Role = Depends(get_group_role),
+    db: Session = Depends(get_db)
+):
+    repo = SQLGroupRepository(db)
+    use_case = CreateActivitiesUseCase(repo)
+    activities = use_case.execute(group_id, data)
+    active_end_dates = [activity.end_date for activity in activities if activity.status == ActivityStatus.ACTIVE]
+    if active_end_dates:
+        expiry_alarm.notify(min(active_end_dates))
+    return activities
 
 @router.get("/activities/{activity_id}", response_model=ActivityResponseDTO)
 def get_activity(
     activity_id: uuid.UUID,
-    user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_activity_role),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = GetActivityUseCase(repo)
     return use_case.execute(activity_id)
 
+# With from and to, only activities overlapping the window, plus the occurrences of recurring ones
 @router.get("/{group_id}/activities", response_model=List[ActivityResponseDTO])
 def list_activities(
     group_id: uuid.UUID,
-    user_id: str = Depends(get_current_user_id),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    role: Role = Depends(get_group_role),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = ListActivitiesUseCase(repo)
-    return use_case.execute(group_id)
+    return use_case.execute(group_id, start, end)
 
 @router.put("/activities/{activity_id}", response_model=ActivityResponseDTO)
 def update_activity(
     activity_id: uuid.UUID,
     activity_data: ActivityUpdateDTO,
-    user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_activity_role),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = UpdateActivityUseCase(repo)
-    return use_case.execute(activity_id, activity_data)
+    activity = use_case.execute(activity_id, activity_data)
+    if activity.status == ActivityStatus.ACTIVE:
+        expiry_alarm.notify(activity.end_date)
+    return activity
 
 @router.delete("/activities/{activity_id}")
 def delete_activity(
     activity_id: uuid.UUID,
-    user_id: str = Depends(get_current_user_id),
+    role: Role = Depends(get_activity_role),
     db: Session = Depends(get_db)
 ):
     repo = SQLGroupRepository(db)
     use_case = DeleteActivityUseCase(repo)
-    return use_case.execute(activity_id)
\ No newline at end of file
+    return use_case.execute(activity_id)
+
+# Recurring activity endpoints
+@router.post("/{group_id}/recurring-activities", response_model=RecurringActivityResponseDTO)
+def create_recurring_activity(
+    group_id: uuid.UUID,
+    rule_data: RecurringActivityCreateDTO,
+    role: Role = Depends(get_group_role),
+    db: Session = Depends(get_db)
+):
+    repo = SQLGroupRepository(db)
+    use_case = CreateRecurringActivityUseCase(repo)
+    return use_case.execute(group_id, rule_data)
+
+@router.get("/{group_id}/recurring-activities", response_model=List[RecurringActivityResponseDTO])
+def list_recurring_activities(
+    group_id: uuid.UUID,
+    role: Role = Depends(get_group_role),
+    db: Session = Depends(get_db)
+):
+    repo = SQLGroupRepository(db)
+    use_case = ListRecurringActivitiesUseCase(repo)
+    return use_case.execute(group_id)
+
+@router.delete("/recurring-activities/{rule_id}")
+def delete_recurring_activity(
+    rule_id: uuid.UUID,
+    role: Role = Depends(get_recurring_activity_role),
+    db: Session = Depends(get_db)
+):
+    repo = SQLGroupRepository(db)
+    use_case = DeleteRecurringActivityUseCase(repo)
+    return use_case.execute(rule_id)
+
+# Completing or editing an occurrence stores it as an activity with the same id
+@router.put("/recurring-activities/{rule_id}/occurrences/{occurrence_start}", response_model=ActivityResponseDTO)
+def store_occurrence(
+    rule_id: uuid.UUID,
+    occurrence_start: datetime,
+    activity_data: ActivityUpdateDTO,
+    role: Role = Depends(get_recurring_activity_role),
+    db: Session = Depends(get_db)
+):
+    repo = SQLGroupRepository(db)
+    use_case = StoreOccurrenceUseCase(repo)
+    activity = use_case.execute(rule_id, occurrence_start, activity_data)
+    if activity.status == ActivityStatus.ACTIVE:
+        expiry_alarm.notify(activity.end_date)
+    return activity
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -5,10 +7,25 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from app.interface.http.routers import router
 from app.adapter.db.database import engine
 from app.adapter.db import models
+from app.adapter.jobs.activity_expiry import ACTIVITY_EXPIRY_ENABLED, run_activity_expiry
+from app.adapter.http.user_service import user_service
+from app.adapter.http.group_sources import mood_source, pet_source
 
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(root_path="/groups", docs_url=None, redoc_url="/docs")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if ACTIVITY_EXPIRY_ENABLED:
+        tasks.append(asyncio.create_task(run_activity_expiry()))
+    yield
+    for task in tasks:
+        task.cancel()
+    user_service.close()
+    await pet_source.aclose()
+    await mood_source.aclose()
+
+app = FastAPI(root_path="/groups", docs_url=None, redoc_url="/docs", lifespan=lifespan)
 
 # CORS middleware MUST be added first (will be evaluated last in the chain)
 app.add_middleware(
@@ -17,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.add_middleware(
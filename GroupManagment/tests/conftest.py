@@ -0,0 +1,6 @@
+import os
+
+# Set the DATABASE_URL to use an in-memory SQLite database for testing
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+# The lifespan is not run by the tests, but keep the expiry job out of any that do
+os.environ["ACTIVITY_EXPIRY_ENABLED"] = "false"
@@ -0,0 +1,626 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.adapter.db.database import get_db, Base
+from app.adapter.cache.invite_code_cache import invite_code_cache
+from app.adapter.cache.membership_cache import membership_cache
+from app.adapter.cache.user_profile_cache import UserProfileCache
+from app.adapter.db.group_repository_sql import SQLGroupRepository
+from app.adapter.db.models import GroupMember, Role
+from app.adapter.http.user_service import UserServiceClient, get_user_directory
+from app.adapter.http.group_sources import HTTPGroupSource, get_mood_source, get_pet_source
+from app.application.usecases.expire_activities import ExpireActivitiesUseCase
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'groups.db')}"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+# Reset root_path for testing to avoid 404s if it's set in main.py
+app.root_path = ""
+
+
+class StubServer:
+    """A sibling service on a local port answering GETs from `documents`, with a knob for slowness."""
+
+    def __init__(self):
+        self.documents = {}
+        self.requests = []
+        self.authorizations = []
+        self.delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                stub.requests.append((url.path, query.get("ids", []), self.client_address[1]))
+                stub.authorizations.append(self.headers.get("Authorization"))
+                time.sleep(stub.delay)
+                status, document = stub.respond(url.path, query)
+                body = json.dumps(document).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting, as the slow-service tests intend
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def respond(self, path: str, query: dict):
+        if path in self.documents:
+            return 200, self.documents[path]
+        return 404, {"detail": "Not Found"}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubUserService(StubServer):
+    """UserManagment's GET /users?ids=."""
+
+    def __init__(self):
+        super().__init__()
+        self.users = {}
+
+    def respond(self, path: str, query: dict):
+        return 200, [self.users[user_id] for user_id in query.get("ids", []) if user_id in self.users]
+
+    def add_user(self, user_id: uuid.UUID, username: str):
+        self.users[str(user_id)] = {
+            "id": str(user_id), "username": username, "email": f"{username}@example.com",
+            "birth_date": "2000-01-01", "current_emotional_status": "happy", "its_sharing_location": False,
+        }
+
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    invite_code_cache.clear()
+    membership_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def user_service():
+    stub = StubUserService()
+    yield stub
+    stub.close()
+
+@pytest.fixture
+def users_client(user_service):
+    directory = UserServiceClient(base_url=user_service.url, timeout=0.3, backoff_seconds=60,
+                                  batch_size=2, cache=UserProfileCache())
+    app.dependency_overrides[get_user_directory] = lambda: directory
+    yield directory
+    del app.dependency_overrides[get_user_directory]
+    directory.close()
+
+@pytest.fixture
+def sibling_services():
+    """PetManagment and SharingService stubs, wired into the dashboard with 2 s deadlines."""
+    pet_service, sharing_service = StubServer(), StubServer()
+    app.dependency_overrides[get_pet_source] = lambda: HTTPGroupSource(
+        "pet", pet_service.url, "/pet/group/{group_id}", 2)
+    app.dependency_overrides[get_mood_source] = lambda: HTTPGroupSource(
+        "moods", sharing_service.url, "/mood/group/{group_id}", 2)
+    yield pet_service, sharing_service
+    del app.dependency_overrides[get_pet_source]
+    del app.dependency_overrides[get_mood_source]
+    pet_service.close()
+    sharing_service.close()
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+def auth(user_id: uuid.UUID) -> dict:
+    return {"Authorization": f"Bearer {jwt.encode({'sub': str(user_id)}, 'test-secret-key-of-32-bytes-long!')}"}
+
+def create_group_with_members(client, count: int):
+    """Group created by the first of `count` users, the rest joining by invite code."""
+    user_ids = [uuid.uuid4() for _ in range(count)]
+    group = client.post("/", json={"name": "Familia"}, headers=auth(user_ids[0])).json()
+    for user_id in user_ids[1:]:
+        assert client.post("/join", json={"invite_code": group["invite_code"]}, headers=auth(user_id)).status_code == 200
+    return group["id"], user_ids
+
+def test_list_members_requires_membership(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+
+    assert client.get(f"/{group_id}/members", headers=auth(admin)).status_code == 200
+    assert client.get(f"/{group_id}/members", headers=auth(uuid.uuid4())).status_code == 403
+
+def test_my_activities_pages_through_a_stable_order(client):
+    group_id, (admin, member) = create_group_with_members(client, 2)
+    other_group, (other_admin,) = create_group_with_members(client, 1)
+    foreign_group, (stranger,) = create_group_with_members(client, 1)
+    assert client.post("/join", json={"invite_code": client.get(f"/{other_group}", headers=auth(other_admin)).json()["invite_code"]},
+                       headers=auth(member)).status_code == 200
+    days = ["2030-01-05", "2030-01-03", "2030-01-03", "2030-01-03", "2030-01-01"]
+    ids = {}
+    for i, day in enumerate(days):
+        target, owner = (group_id, admin) if i % 2 == 0 else (other_group, other_admin)
+        activity = client.post(f"/{target}/activities", headers=auth(owner), json={
+            "group_id": target, "title": f"A{i}", "start_date": f"{day}T08:00:00",
+            "end_date": f"{day}T09:00:00", "xp_reward": 1}).json()
+        ids[activity["id"]] = day
+    # Not one of the member's groups
+    assert client.post(f"/{foreign_group}/activities", headers=auth(stranger), json={
+        "group_id": foreign_group, "title": "Ajena", "start_date": "2030-01-04T08:00:00",
+        "end_date": "2030-01-04T09:00:00", "xp_reward": 1}).status_code == 200
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/my-activities", params=params, headers=auth(member))
+        assert response.status_code == 200
+        pages.append([activity["id"] for activity in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    # Newest start first; activities starting together come by id, descending
+    expected = sorted(ids, key=lambda activity_id: (ids[activity_id], uuid.UUID(activity_id)), reverse=True)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [activity_id for page in pages for activity_id in page] == expected
+
+def test_my_activities_filters(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    created = [
+        client.post(f"/{group_id}/activities", headers=auth(admin), json={
+            "group_id": group_id, "title": f"A{day}", "start_date": f"2030-01-0{day}T08:00:00",
+            "end_date": f"2030-01-0{day}T20:00:00", "xp_reward": 1}).json()
+        for day in (1, 2, 3)
+    ]
+    assert client.put(f"/activities/{created[1]['id']}", headers=auth(admin),
+                      json={"status": "completed"}).status_code == 200
+
+    def titles(**params):
+        response = client.get("/my-activities", params=params, headers=auth(admin))
+        assert response.status_code == 200
+        return [activity["title"] for activity in response.json()]
+
+    assert titles() == ["A3", "A2", "A1"]
+    assert titles(status="completed") == ["A2"]
+    assert titles(status="active") == ["A3", "A1"]
+    # Activities running at some point in [from, to)
+    assert titles(**{"from": "2030-01-02T12:00:00", "to": "2030-01-03T08:00:00"}) == ["A2"]
+    assert titles(**{"from": "2030-01-02T21:00:00"}) == ["A3"]
+    assert titles(**{"to": "2030-01-02T08:00:00"}) == ["A1"]
+
+def test_my_activities_rejects_invalid_paging(client):
+    _, (admin,) = create_group_with_members(client, 1)
+
+    assert client.get("/my-activities", params={"cursor": "not-a-cursor"}, headers=auth(admin)).status_code == 400
+    assert client.get("/my-activities", params={"limit": 0}, headers=auth(admin)).status_code == 400
+    assert client.get("/my-activities", headers=auth(admin),
+                      params={"from": "2030-01-02T00:00:00", "to": "2030-01-01T00:00:00"}).status_code == 400
+
+def test_expiry_job_expires_only_overdue_active_activities(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def item(title, end, status="active"):
+        return {"title": title, "start_date": (end - timedelta(hours=1)).isoformat(),
+                "end_date": end.isoformat(), "xp_reward": 1, "status": status}
+
+    created = client.post(f"/{group_id}/activities/bulk", headers=auth(admin), json={"activities": [
+        item("overdue-1", now - timedelta(days=2)),
+        item("overdue-2", now - timedelta(hours=3)),
+        item("overdue-3", now - timedelta(minutes=1)),
+        item("done", now - timedelta(days=1), status="completed"),
+        item("later", now + timedelta(days=2)),
+        item("soon", now + timedelta(hours=1)),
+    ]}).json()
+
+    db = TestingSessionLocal()
+    try:
+        # Batches of two, so the three overdue rows take more than one UPDATE
+        expired, next_end = ExpireActivitiesUseCase(SQLGroupRepository(db)).execute(batch_size=2)
+    finally:
+        db.close()
+
+    assert expired == 3
+    assert next_end == now + timedelta(hours=1)
+    statuses = {activity["title"]: client.get(f"/activities/{activity['id']}", headers=auth(admin)).json()["status"]
+                for activity in created}
+    assert statuses == {"overdue-1": "expired", "overdue-2": "expired", "overdue-3": "expired",
+                        "done": "completed", "later": "active", "soon": "active"}
+
+def test_next_activity_end_is_none_without_active_activities(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    client.post(f"/{group_id}/activities", headers=auth(admin), json={
+        "group_id": group_id, "title": "Hecha", "start_date": "2030-01-01T00:00:00",
+        "end_date": "2030-01-02T00:00:00", "xp_reward": 1, "status": "completed"})
+
+    db = TestingSessionLocal()
+    try:
+        assert ExpireActivitiesUseCase(SQLGroupRepository(db)).execute(batch_size=10) == (0, None)
+    finally:
+        db.close()
+
+def test_get_group_revalidates_with_a_single_lookup(client):
+    from sqlalchemy import event
+
+    group_id, (admin,) = create_group_with_members(client, 1)
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        first = client.get(f"/{group_id}", headers=auth(admin))
+        again = client.get(f"/{group_id}", headers={**auth(admin), "If-None-Match": first.headers["etag"]})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert first.status_code == 200 and again.status_code == 304
+    assert len([statement for statement in statements if "FROM groups" in statement]) == 2
+    assert client.get(f"/{uuid.uuid4()}", headers=auth(admin)).status_code == 403
+
+def test_get_group_requires_membership(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+
+    assert client.get(f"/{group_id}", headers=auth(admin)).json()["invite_code"]
+    response = client.get(f"/{group_id}", headers=auth(uuid.uuid4()))
+    assert response.status_code == 403
+    assert "invite_code" not in response.json()
+    assert client.get(f"/{group_id}").status_code == 422
+
+def test_join_by_invite_code(client):
+    group = client.post("/", json={"name": "Familia"}, headers=auth(uuid.uuid4())).json()
+    user_id = uuid.uuid4()
+
+    response = client.post("/join", json={"invite_code": group["invite_code"]}, headers=auth(user_id))
+
+    assert response.status_code == 200
+    assert response.json()["group_id"] == group["id"]
+    members = client.get(f"/{group['id']}/members", headers=auth(user_id)).json()
+    assert {member["user_id"]: member["role"] for member in members}[str(user_id)] == "member"
+
+def test_list_members_never_serves_a_stale_shared_body_under_a_new_etag(client, monkeypatch):
+    from app.interface.http.routers import member_reads
+
+    # Keep every shared result alive, as if the next read joined a load still in flight
+    monkeypatch.setattr(member_reads, "window_seconds", 60)
+    group_id, user_ids = create_group_with_members(client, 1)
+    before = client.get(f"/{group_id}/members", headers=auth(user_ids[0]))
+
+    invite_code = client.get(f"/{group_id}", headers=auth(user_ids[0])).json()["invite_code"]
+    newcomer = str(uuid.uuid4())
+    assert client.post("/join", json={"invite_code": invite_code}, headers=auth(newcomer)).status_code == 200
+    after = client.get(f"/{group_id}/members", headers=auth(user_ids[0]))
+
+    assert after.headers["etag"] != before.headers["etag"]
+    assert newcomer in {member["user_id"] for member in after.json()}
+
+def test_join_with_unknown_invite_code_returns_404(client):
+    response = client.post("/join", json={"invite_code": "NOPE1234"}, headers=auth(uuid.uuid4()))
+    assert response.status_code == 404
+
+def test_repeated_join_is_refused_without_duplicating_the_member(client):
+    group_id, (admin, member) = create_group_with_members(client, 2)
+    invite_code = client.get(f"/{group_id}", headers=auth(admin)).json()["invite_code"]
+
+    for user_id in (member, member, admin):
+        response = client.post("/join", json={"invite_code": invite_code}, headers=auth(user_id))
+        assert response.status_code == 400
+
+    db = TestingSessionLocal()
+    try:
+        # Straight to the repository: the conflicting insert is skipped, not raised
+        assert SQLGroupRepository(db).join_by_invite_code(invite_code, member, Role.MEMBER) is None
+        rows = db.query(GroupMember).filter(GroupMember.group_id == uuid.UUID(group_id)).all()
+        assert sorted((row.user_id, row.role) for row in rows) == sorted([(admin, Role.ADMIN), (member, Role.MEMBER)])
+    finally:
+        db.close()
+
+def test_non_member_is_refused_on_group_routes(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    activity = client.post(f"/{group_id}/activities", headers=auth(admin), json={
+        "group_id": group_id, "title": "Pasear", "start_date": "2030-01-01T00:00:00",
+        "end_date": "2030-01-02T00:00:00", "xp_reward": 5}).json()
+    stranger = auth(uuid.uuid4())
+
+    assert client.get(f"/{group_id}/activities", headers=stranger).status_code == 403
+    assert client.post(f"/{group_id}/activities", headers=stranger, json={
+        "group_id": group_id, "title": "Intruso", "start_date": "2030-01-01T00:00:00",
+        "end_date": "2030-01-02T00:00:00", "xp_reward": 5}).status_code == 403
+    assert client.get(f"/activities/{activity['id']}", headers=stranger).status_code == 403
+    assert client.put(f"/activities/{activity['id']}", headers=stranger, json={"title": "x"}).status_code == 403
+    assert client.delete(f"/activities/{activity['id']}", headers=stranger).status_code == 403
+    assert client.put(f"/{group_id}", headers=stranger, json={"name": "Mío"}).status_code == 403
+    assert client.delete(f"/{group_id}", headers=stranger).status_code == 403
+    assert client.get(f"/activities/{activity['id']}", headers=auth(admin)).json()["title"] == "Pasear"
+
+def test_member_is_refused_on_admin_routes(client):
+    group_id, (admin, member, other) = create_group_with_members(client, 3)
+
+    assert client.put(f"/{group_id}", headers=auth(member), json={"name": "Mío"}).status_code == 403
+    assert client.delete(f"/{group_id}", headers=auth(member)).status_code == 403
+    assert client.put(f"/{group_id}/members/{other}", headers=auth(member),
+                      json={"has_notifications_enabled": False}).status_code == 403
+    assert client.delete(f"/{group_id}/members/{other}", headers=auth(member)).status_code == 403
+    # Members manage their own membership, but not their role
+    assert client.put(f"/{group_id}/members/{member}", headers=auth(member),
+                      json={"role": "admin"}).status_code == 403
+    assert client.put(f"/{group_id}/members/{member}", headers=auth(member),
+                      json={"has_notifications_enabled": False}).status_code == 200
+
+    assert client.put(f"/{group_id}", headers=auth(admin), json={"name": "Nuevo"}).status_code == 200
+    assert client.delete(f"/{group_id}/members/{other}", headers=auth(admin)).status_code == 200
+    # The membership cache is invalidated, so the removed member is refused right away
+    assert client.get(f"/{group_id}/members", headers=auth(other)).status_code == 403
+
+def test_unknown_activity_returns_404(client):
+    _, (admin,) = create_group_with_members(client, 1)
+    unknown = uuid.uuid4()
+
+    assert client.get(f"/activities/{unknown}", headers=auth(admin)).status_code == 404
+    assert client.put(f"/activities/{unknown}", headers=auth(admin), json={"title": "x"}).status_code == 404
+    assert client.delete(f"/activities/{unknown}", headers=auth(admin)).status_code == 404
+
+def test_list_members_without_expand_does_not_call_user_service(client, user_service, users_client):
+    group_id, user_ids = create_group_with_members(client, 2)
+
+    response = client.get(f"/{group_id}/members", headers=auth(user_ids[0]))
+    assert response.status_code == 200
+    assert [member["user"] for member in response.json()] == [None, None]
+    assert user_service.requests == []
+
+def test_list_members_expand_user_batches_and_caches_profiles(client, user_service, users_client):
+    group_id, user_ids = create_group_with_members(client, 3)
+    for i, user_id in enumerate(user_ids):
+        user_service.add_user(user_id, f"user{i}")
+
+    response = client.get(f"/{group_id}/members?expand=user", headers=auth(user_ids[0]))
+    assert response.status_code == 200
+    usernames = {member["user_id"]: member["user"]["username"] for member in response.json()}
+    assert usernames == {str(user_id): f"user{i}" for i, user_id in enumerate(user_ids)}
+    assert "email" not in response.json()[0]["user"]
+
+    # Three members in batches of two, over the same keep-alive connection
+    assert [len(ids) for _, ids, _ in user_service.requests] == [2, 1]
+    assert {path for path, _, _ in user_service.requests} == {"/users"}
+    assert len({port for _, _, port in user_service.requests}) == 1
+
+    # Profiles are cached
+    assert client.get(f"/{group_id}/members?expand=user", headers=auth(user_ids[1])).status_code == 200
+    assert len(user_service.requests) == 2
+
+    # A revalidation of unchanged members is answered before any profile is looked up
+    users_client.cache = UserProfileCache()
+    etag = response.headers["etag"]
+    again = client.get(f"/{group_id}/members?expand=user", headers={**auth(user_ids[0]), "If-None-Match": etag})
+    assert again.status_code == 304
+    assert len(user_service.requests) == 2
+
+    # A new member changes the ETag
+    newcomer = uuid.uuid4()
+    user_service.add_user(newcomer, "newcomer")
+    group = client.get(f"/{group_id}", headers=auth(user_ids[0])).json()
+    assert client.post("/join", json={"invite_code": group["invite_code"]}, headers=auth(newcomer)).status_code == 200
+    changed = client.get(f"/{group_id}/members?expand=user", headers={**auth(user_ids[0]), "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+def test_list_members_expand_user_degrades_when_user_service_is_slow(client, user_service, users_client):
+    group_id, user_ids = create_group_with_members(client, 2)
+    for i, user_id in enumerate(user_ids):
+        user_service.add_user(user_id, f"user{i}")
+    user_service.delay = 1
+
+    started = time.monotonic()
+    response = client.get(f"/{group_id}/members?expand=user", headers=auth(user_ids[0]))
+    assert response.status_code == 200
+    assert [member["user"] for member in response.json()] == [None, None]
+    assert time.monotonic() - started < 0.9
+    # The degraded body gets no validators, so clients do not revalidate against it
+    assert "etag" not in response.headers
+
+    # While backing off, the slow service is not called again
+    response = client.get(f"/{group_id}/members?expand=user", headers=auth(user_ids[1]))
+    assert response.status_code == 200
+    assert len(user_service.requests) == 1
+
+def test_list_members_rejects_unknown_expand(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+
+    assert client.get(f"/{group_id}/members?expand=pets", headers=auth(admin)).status_code == 422
+
+def test_dashboard_combines_local_rows_and_sibling_services(client, user_service, users_client, sibling_services):
+    pet_service, sharing_service = sibling_services
+    group_id, user_ids = create_group_with_members(client, 2)
+    user_service.add_user(user_ids[0], "ana")
+    pet = {"id": str(uuid.uuid4()), "name": "Firulais", "type": "dog", "health_level": 100,
+           "happiness_level": 90, "hunger_level": 80, "hygiene_level": 70, "level": 2, "xp": 15}
+    moods = [{"id": str(uuid.uuid4()), "user_id": str(user_ids[0]), "group_id": group_id,
+              "emotion": "happy", "created_at": "2030-01-01T00:00:00"}]
+    pet_service.documents[f"/pet/group/{group_id}"] = pet
+    sharing_service.documents[f"/mood/group/{group_id}"] = moods
+    client.post(f"/{group_id}/activities", headers=auth(user_ids[0]), json={
+        "group_id": group_id, "title": "Pasear", "start_date": "2030-01-01T00:00:00",
+        "end_date": "2030-01-02T00:00:00", "xp_reward": 5})
+    # Well inside the deadline, so only the overlap of the two calls is measured
+    pet_service.delay = sharing_service.delay = 0.25
+
+    started = time.monotonic()
+    response = client.get(f"/{group_id}/dashboard", headers=auth(user_ids[1]))
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["group"]["id"] == group_id
+    profiles = {member["user_id"]: member["user"] for member in dashboard["members"]}
+    assert profiles[str(user_ids[0])]["username"] == "ana"
+    assert profiles[str(user_ids[1])] is None
+    assert [activity["title"] for activity in dashboard["activities"]] == ["Pasear"]
+    assert dashboard["pet"] == pet
+    assert dashboard["moods"] == moods
+    assert dashboard["unavailable"] == []
+    assert elapsed < pet_service.delay + sharing_service.delay
+    # SharingService checks membership itself, so the caller's token goes along
+    assert sharing_service.authorizations == [auth(user_ids[1])["Authorization"]]
+
+def test_dashboard_returns_partial_results_when_a_service_is_slow(client, sibling_services):
+    pet_service, sharing_service = sibling_services
+    group_id, (admin,) = create_group_with_members(client, 1)
+    sharing_service.documents[f"/mood/group/{group_id}"] = []
+    app.dependency_overrides[get_pet_source] = lambda: HTTPGroupSource(
+        "pet", pet_service.url, "/pet/group/{group_id}", 0.2)
+    pet_service.delay = 1
+
+    started = time.monotonic()
+    response = client.get(f"/{group_id}/dashboard", headers=auth(admin))
+
+    assert response.status_code == 200
+    assert response.json()["pet"] is None
+    assert response.json()["moods"] == []
+    assert response.json()["unavailable"] == ["pet"]
+    assert time.monotonic() - started < 0.9
+
+def test_dashboard_of_a_group_without_pet_is_not_partial(client, sibling_services):
+    group_id, (admin,) = create_group_with_members(client, 1)
+
+    response = client.get(f"/{group_id}/dashboard", headers=auth(admin))
+
+    assert response.status_code == 200
+    assert response.json()["pet"] is None
+    assert response.json()["moods"] is None
+    assert response.json()["unavailable"] == []
+
+def test_dashboard_requires_membership(client, sibling_services):
+    pet_service, _ = sibling_services
+    group_id, _ = create_group_with_members(client, 1)
+
+    assert client.get(f"/{group_id}/dashboard", headers=auth(uuid.uuid4())).status_code == 403
+    assert pet_service.requests == []
+
+def test_create_activity_returns_the_stored_row(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+
+    response = client.post(f"/{group_id}/activities", headers=auth(admin), json={
+        "group_id": group_id, "title": "Pasear", "start_date": "2030-01-01T00:00:00",
+        "end_date": "2030-01-02T00:00:00", "xp_reward": 5})
+
+    assert response.status_code == 200
+    activity = response.json()
+    assert activity["title"] == "Pasear" and activity["status"] == "active"
+    assert activity["created_at"] is not None
+    assert client.get(f"/activities/{activity['id']}", headers=auth(admin)).json() == activity
+
+def test_bulk_create_activities(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    week = [
+        {"title": f"Día {day}", "start_date": f"2030-01-0{day}T08:00:00", "end_date": f"2030-01-0{day}T09:00:00",
+         "xp_reward": day}
+        for day in range(1, 8)
+    ]
+
+    response = client.post(f"/{group_id}/activities/bulk", headers=auth(admin), json={"activities": week})
+
+    assert response.status_code == 200
+    created = response.json()
+    assert [activity["title"] for activity in created] == [item["title"] for item in week]
+    assert {activity["group_id"] for activity in created} == {group_id}
+    listed = client.get(f"/{group_id}/activities", headers=auth(admin)).json()
+    assert sorted(activity["id"] for activity in listed) == sorted(activity["id"] for activity in created)
+
+def test_bulk_create_activities_validation(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+
+    assert client.post(f"/{group_id}/activities/bulk", headers=auth(admin), json={"activities": []}).status_code == 400
+    assert client.post(f"/{uuid.uuid4()}/activities/bulk", headers=auth(admin), json={"activities": [
+        {"title": "x", "start_date": "2030-01-01T00:00:00", "end_date": "2030-01-02T00:00:00", "xp_reward": 1}
+    ]}).status_code == 403
+
+def test_recurring_activity_occurrences_are_expanded_per_window(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    # Mondays and Wednesdays at 18:00, from Wednesday 2 January 2030
+    rule = client.post(f"/{group_id}/recurring-activities", headers=auth(admin), json={
+        "title": "Pasear al perro", "xp_reward": 10, "frequency": "weekly", "weekdays": [0, 2],
+        "starts_at": "2030-01-02T18:00:00", "duration_minutes": 60}).json()
+
+    window = {"from": "2030-01-01T00:00:00", "to": "2030-01-15T00:00:00"}
+    occurrences = client.get(f"/{group_id}/activities", params=window, headers=auth(admin)).json()
+    assert [activity["start_date"] for activity in occurrences] == [
+        "2030-01-02T18:00:00", "2030-01-07T18:00:00", "2030-01-09T18:00:00", "2030-01-14T18:00:00"]
+    assert {activity["recurrence_id"] for activity in occurrences} == {rule["id"]}
+    # Nothing is stored until an occurrence is completed or edited
+    assert client.get(f"/{group_id}/activities", headers=auth(admin)).json() == []
+
+    completed = client.put(f"/recurring-activities/{rule['id']}/occurrences/2030-01-07T18:00:00",
+                           headers=auth(admin), json={"status": "completed"}).json()
+    assert completed["id"] == occurrences[1]["id"]
+    assert completed["status"] == "completed" and completed["title"] == "Pasear al perro"
+    moved = client.put(f"/recurring-activities/{rule['id']}/occurrences/2030-01-09T18:00:00", headers=auth(admin),
+                       json={"start_date": "2030-02-01T18:00:00", "end_date": "2030-02-01T19:00:00"}).json()
+
+    listed = client.get(f"/{group_id}/activities", params=window, headers=auth(admin)).json()
+    assert [(activity["id"], activity["status"], activity["recurrence_id"]) for activity in listed] == [
+        (occurrences[0]["id"], "active", rule["id"]),
+        (completed["id"], "completed", None),
+        (occurrences[3]["id"], "active", rule["id"]),
+    ]
+    assert [activity["id"] for activity in client.get(f"/{group_id}/activities", headers=auth(admin)).json()] \
+        == [completed["id"], moved["id"]]
+
+    # Editing a stored occurrence again updates it
+    again = client.put(f"/recurring-activities/{rule['id']}/occurrences/2030-01-07T18:00:00",
+                       headers=auth(admin), json={"title": "Paseo largo"}).json()
+    assert again["id"] == completed["id"] and again["status"] == "completed" and again["title"] == "Paseo largo"
+
+    assert client.put(f"/recurring-activities/{rule['id']}/occurrences/2030-01-08T18:00:00",
+                      headers=auth(admin), json={"status": "completed"}).status_code == 404
+    assert client.delete(f"/recurring-activities/{rule['id']}", headers=auth(admin)).status_code == 200
+    assert [activity["id"] for activity in client.get(f"/{group_id}/activities", params=window, headers=auth(admin)).json()] \
+        == [completed["id"]]
+
+def test_recurring_activity_validation(client):
+    group_id, (admin,) = create_group_with_members(client, 1)
+    rule = {"title": "Regar", "xp_reward": 1, "frequency": "weekly", "weekdays": [7],
+            "starts_at": "2030-01-01T08:00:00", "duration_minutes": 15}
+
+    assert client.post(f"/{group_id}/recurring-activities", headers=auth(admin), json=rule).status_code == 400
+    assert client.post(f"/{group_id}/recurring-activities", headers=auth(admin),
+                       json={**rule, "frequency": "daily"}).status_code == 400
+    assert client.post(f"/{group_id}/recurring-activities", headers=auth(admin),
+                       json={**rule, "frequency": "daily", "weekdays": []}).status_code == 200
+    assert client.get(f"/{group_id}/activities", params={"from": "2030-01-01T00:00:00"}, headers=auth(admin)).status_code == 400
+    assert client.get(f"/{group_id}/activities", headers=auth(admin),
+                      params={"from": "2030-01-01T00:00:00", "to": "2032-01-01T00:00:00"}).status_code == 400
+    assert client.get(f"/{uuid.uuid4()}/recurring-activities", headers=auth(admin)).status_code == 403
@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.adapter.db.models import Frequency
+from app.domain.entities.recurring_activity import RecurringActivity
+
+def _rule(frequency, interval, starts_at, weekdays=(), until=None, duration_minutes=60):
+    return RecurringActivity(
+        id=uuid.uuid4(), group_id=uuid.uuid4(), title="Pasear", description=None, xp_reward=5,
+        frequency=frequency, interval=interval, starts_at=starts_at, duration_minutes=duration_minutes,
+        until=until, weekdays=list(weekdays)
+    )
+
+def _every_occurrence(rule, horizon):
+    """Reference expansion: walk day by day from the start."""
+    first_monday = rule.starts_at - timedelta(days=rule.starts_at.weekday())
+    day = rule.starts_at
+    while day < horizon and (rule.until is None or day <= rule.until):
+        if rule.frequency == Frequency.DAILY:
+            if (day - rule.starts_at).days % rule.interval == 0:
+                yield day
+        elif day.weekday() in rule.weekdays and ((day - first_monday).days // 7) % rule.interval == 0:
+            yield day
+        day += timedelta(days=1)
+
+def test_occurrences_match_a_day_by_day_expansion():
+    horizon = datetime(2033, 1, 1)
+    rules = [
+        _rule(Frequency.WEEKLY, 2, datetime(2030, 1, 2, 18), weekdays=[0, 2]),
+        _rule(Frequency.WEEKLY, 1, datetime(2030, 1, 6, 9), weekdays=[6], duration_minutes=60 * 30),
+        _rule(Frequency.DAILY, 3, datetime(2030, 1, 1, 7, 30), until=datetime(2031, 6, 1)),
+    ]
+    windows = [(datetime(2030, 1, 1) + timedelta(hours=17 * i), timedelta(hours=5 + 97 * i)) for i in range(60)]
+    for rule in rules:
+        reference = list(_every_occurrence(rule, horizon))
+        for start, length in windows:
+            end = start + length
+            expected = [at for at in reference if at + rule.duration >= start and at < end]
+            assert list(rule.occurrences(start, end)) == expected
+
+def test_occurrences_are_lazy_and_start_at_the_window():
+    rule = _rule(Frequency.DAILY, 1, datetime(2000, 1, 1, 8))
+    occurrences = rule.occurrences(datetime(2090, 1, 1), datetime(2090, 1, 4))
+    assert next(occurrences) == datetime(2090, 1, 1, 8)
+    assert list(occurrences) == [datetime(2090, 1, 2, 8), datetime(2090, 1, 3, 8)]
+
+def test_occurrence_identity():
+    rule = _rule(Frequency.WEEKLY, 1, datetime(2030, 1, 7, 18), weekdays=[0])
+
+    assert rule.is_occurrence(datetime(2030, 1, 14, 18))
+    assert not rule.is_occurrence(datetime(2030, 1, 14, 19))
+    assert not rule.is_occurrence(datetime(2029, 12, 31, 18))
+    assert rule.occurrence_id(datetime(2030, 1, 14, 18)) == rule.occurrence_id(datetime(2030, 1, 14, 18))
+    assert rule.occurrence_id(datetime(2030, 1, 14, 18)) != rule.occurrence_id(datetime(2030, 1, 21, 18))
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Tuple
+from app.domain.entities.pet import Pet
+from app.adapter.metrics import PET_CACHE_EVICTIONS
+
+PET_CACHE_MAX_ENTRIES = int(os.getenv("PET_CACHE_MAX_ENTRIES", "10000"))
+# Bounds how long writes made by other replicas can go unseen; 0 disables the cache
+PET_CACHE_TTL_SECONDS = float(os.getenv("PET_CACHE_TTL_SECONDS", "30"))
+
+
+class PetCacheBackend(ABC):
+    """Pet rows as stored (decay not projected), keyed by group id.
+
+    Implementations hand out copies, so callers are free to mutate what they get.
+    """
+
+    @abstractmethod
+    def get(self, group_id: uuid.UUID) -> Pet | None:
+        pass
+
+    @abstractmethod
+    def set(self, pet: Pet):
+        pass
+
+    @abstractmethod
+    def delete(self, group_id: uuid.UUID):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class InMemoryPetCache(PetCacheBackend):
+    """Per-process LRU with a size bound and a TTL counted from the last write."""
+
+    def __init__(self, max_entries: int = PET_CACHE_MAX_ENTRIES, ttl_seconds: float = PET_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, Pet]]" = OrderedDict()
+
+    def get(self, group_id: uuid.UUID) -> Pet | None:
+        with self._lock:
+            entry = self._entries.get(group_id)
+            if entry is None:
+                return None
+            expires_at, pet = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[group_id]
+                PET_CACHE_EVICTIONS.labels(reason="ttl").inc()
+                return None
+            self._entries.move_to_end(group_id)
+            return replace(pet)
+
+    def set(self, pet: Pet):
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[pet.group_id] = (time.monotonic() + self.ttl_seconds, replace(pet))
+            self._entries.move_to_end(pet.group_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                PET_CACHE_EVICTIONS.labels(reason="size").inc()
+
+    def delete(self, group_id: uuid.UUID):
+        with self._lock:
+            self._entries.pop(group_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+pet_cache = InMemoryPetCache()
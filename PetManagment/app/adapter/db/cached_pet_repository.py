@@ -0,0 +1,88 @@
+from sqlalchemy.orm import Session
+from app.adapter.cache.pet_cache import PetCacheBackend, pet_cache
+from app.adapter.db.leaderboard_cache import LeaderboardCache, leaderboard_cache
+from app.adapter.db.pet_repository_sql import SQLPetRepository
+from app.adapter.metrics import PET_CACHE_HITS, PET_CACHE_MISSES
+from app.domain.entities.pet import Pet
+from app.domain.entities.xp_grant import XpGrant
+from app.domain.repositories.pet_repository import PetVersionConflictError
+from datetime import datetime
+import uuid
+from typing import Dict, List, Set, Tuple
+
+
+class CachedSQLPetRepository(SQLPetRepository):
+    """SQLPetRepository that answers reads by group id from a cache and writes through to it.
+
+    The cache holds rows as stored, decay is still projected on every read. A version
+    conflict drops the entry, so the retry re-reads the row from the database.
+    """
+
+    def __init__(self, db: Session, cache: PetCacheBackend = pet_cache,
+                 leaderboard: LeaderboardCache = leaderboard_cache):
+        super().__init__(db, leaderboard)
+        self.cache = cache
+
+    def _find_stored(self, group_id: uuid.UUID) -> Pet | None:
+        pet = self.cache.get(group_id)
+        if pet is not None:
+            PET_CACHE_HITS.inc()
+            return pet
+        PET_CACHE_MISSES.inc()
+        pet = super()._find_stored(group_id)
+        if pet is not None:
+            self.cache.set(pet)
+        return pet
+
+    def _find_stored_many(self, group_ids: Set[uuid.UUID]) -> Dict[uuid.UUID, Pet]:
+        pets = {}
+        for group_id in group_ids:
+            pet = self.cache.get(group_id)
+            if pet is not None:
+                pets[group_id] = pet
+        PET_CACHE_HITS.inc(len(pets))
+        PET_CACHE_MISSES.inc(len(group_ids) - len(pets))
+        if len(pets) < len(group_ids):
+            loaded = super()._find_stored_many(group_ids - pets.keys())
+            for pet in loaded.values():
+                self.cache.set(pet)
+            pets.update(loaded)
+        return pets
+
+    def find_version_by_group_id(self, group_id: uuid.UUID) -> Tuple[int, datetime | None] | None:
+        pet = self._find_stored(group_id)
+        return (pet.version, pet.last_updated) if pet else None
+
+    def save(self, pet: Pet) -> Pet:
+        saved = super().save(pet)
+        self.cache.set(saved)
+        return saved
+
+    def update(self, pet: Pet) -> Pet:
+        try:
+            updated = super().update(pet)
+        except PetVersionConflictError:
+            self.cache.delete(pet.group_id)
+            raise
+        self.cache.set(updated)
+        return updated
+
+    def apply_action(self, group_id: uuid.UUID, action: str) -> Pet | None:
+        updated = super().apply_action(group_id, action)
+        if updated is not None:
+            self.cache.set(updated)
+        return updated
+
+    def grant_xp(self, grants: List[XpGrant]) -> Tuple[Set[str], Dict[uuid.UUID, Pet]]:
+        accepted, pets = super().grant_xp(grants)
+        for pet in pets.values():
+            self.cache.set(pet)
+        return accepted, pets
+
+    def sweep_decay(self, after_id: uuid.UUID | None, limit: int, idle_before: datetime,
+                    now: datetime) -> Tuple[int, uuid.UUID | None]:
+        swept, next_id = super().sweep_decay(after_id, limit, idle_before, now)
+        # The sweep works by pet id in bulk; dropping everything is simpler than mapping back
+        if swept:
+            self.cache.clear()
+        return swept, next_id
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from dataclasses import replace
+from typing import Callable, List
+from app.domain.entities.pet import Pet
+
+LEADERBOARD_CACHE_SIZE = int(os.getenv("PET_LEADERBOARD_CACHE_SIZE", "100"))
+# Writes made by other replicas only show up after a reload
+LEADERBOARD_CACHE_TTL_SECONDS = float(os.getenv("PET_LEADERBOARD_CACHE_TTL_SECONDS", "30"))
+
+
+def leaderboard_key(pet: Pet):
+    # Leaderboard order, best first when sorted in reverse
+    return (pet.level, pet.xp, pet.id)
+
+
+class LeaderboardCache:
+    """The top `size` pets by (level, xp), patched in place by the repository's writes.
+
+    Loaded from the database on first use or once the TTL expires. A write that moves
+    a pet into the top is inserted directly; one that pushes a cached pet out of it
+    drops the cache, since its replacement is not known in memory.
+    """
+
+    def __init__(self, size: int = LEADERBOARD_CACHE_SIZE, ttl_seconds: float = LEADERBOARD_CACHE_TTL_SECONDS):
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loading = threading.Lock()
+        self._writes = 0
+        self._entries: List[Pet] | None = None
+        self._loaded_at = 0.0
+
+    def _fresh(self) -> bool:
+        return self._entries is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def top(self, limit: int, loader: Callable[[int], List[Pet]]) -> List[Pet]:
+        with self._lock:
+            if self._fresh():
+                return self._entries[:limit]
+            writes = self._writes
+        # A single caller reloads. Concurrent misses read their page directly instead of
+        # waiting on it, which would block the event loop under the async routes.
+        if not self._loading.acquire(blocking=False):
+            return loader(limit)
+        try:
+            entries = loader(self.size)
+            with self._lock:
+                # A write seen during the load may not be in it; reload next time instead
+                if self._writes == writes:
+                    self._entries = entries
+                    self._loaded_at = time.monotonic()
+        finally:
+            self._loading.release()
+        return entries[:limit]
+
+    def rank_of(self, pet: Pet) -> int | None:
+        """Competition rank of a cached pet, None when the cache can't tell."""
+        with self._lock:
+            if not self._fresh() or all(entry.id != pet.id for entry in self._entries):
+                return None
+            return 1 + sum(1 for entry in self._entries if (entry.level, entry.xp) > (pet.level, pet.xp))
+
+    def observe(self, pet: Pet):
+        with self._lock:
+            self._writes += 1
+            if self._entries is None:
+                return
+            entries = [entry for entry in self._entries if entry.id != pet.id]
+            was_cached = len(entries) < len(self._entries)
+            if len(self._entries) >= self.size and entries and leaderboard_key(pet) < leaderboard_key(entries[-1]):
+                if was_cached:
+                    self._entries = None
+                return
+            entries.append(replace(pet))
+            entries.sort(key=leaderboard_key, reverse=True)
+            self._entries = entries[:self.size]
+
+    def clear(self):
+        with self._lock:
+            self._entries = None
+
+
+leaderboard_cache = LeaderboardCache()
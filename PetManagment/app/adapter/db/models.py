@@ -1,7 +1,7 @@
 import enum
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, TIMESTAMP, Uuid
+from sqlalchemy import BigInteger, Column, Float, ForeignKey, Index, Integer, String, TIMESTAMP, Uuid
 from sqlalchemy import Enum
 # from sqlalchemy.dialects.postgresql import UUID
 from .database import Base
@@ -18,7 +18,7 @@ class Pet(Base):
     __tablename__ = "pets"
 
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
-    group_id = Column(Uuid(as_uuid=True), nullable=False)
+    group_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
     name = Column(String(50), nullable=False)
     type = Column(Enum(PetType), nullable=False)
     hunger_level = Column(Integer, nullable=False, default=100)
@@ -27,4 +27,70 @@ class Pet(Base):
     happiness_level = Column(Integer, nullable=False, default=100)
     level = Column(Integer, nullable=False, default=1)
     xp = Column(Integer, nullable=False, default=0)
-    last_updated = Column(TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
\ No newline at end of file
+    # Bumped on every write; updates compare-and-swap on it
+    version = Column(Integer, nullable=False, default=0)
+    # Epoch seconds at which a stat decays to the care reminder threshold, set on every write
+    care_due = Column(Float, index=True)
+    last_updated = Column(TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # Leaderboard order: pages and rank counts are range scans on it
+        Index("ix_pets_leaderboard", "level", "xp", "id"),
+    )
+
+
+class PetXpGrant(Base):
+    """Accepted XP grants; the key makes retried grant requests a no-op."""
+    __tablename__ = "pet_xp_grants"
+
+    idempotency_key = Column(String(128), primary_key=True)
+    group_id = Column(Uuid(as_uuid=True), nullable=False)
+    amount = Column(Integer, nullable=False)
+    granted_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class PetStatSnapshot(Base):
+    """Append-only: one row per write to a pet, rolled up and pruned by the compactor."""
+    __tablename__ = "pet_stat_snapshots"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    pet_id = Column(Uuid(as_uuid=True), ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
+    recorded_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    hunger_level = Column(Integer, nullable=False)
+    hygiene_level = Column(Integer, nullable=False)
+    health_level = Column(Integer, nullable=False)
+    happiness_level = Column(Integer, nullable=False)
+    level = Column(Integer, nullable=False)
+    xp = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_pet_stat_snapshots_pet_recorded", "pet_id", "recorded_at"),
+        Index("ix_pet_stat_snapshots_recorded", "recorded_at"),
+    )
+
+
+class PetStatRollup(Base):
+    """Hourly and daily min/max/sum per stat; the average is sum / samples."""
+    __tablename__ = "pet_stat_rollups"
+
+    pet_id = Column(Uuid(as_uuid=True), ForeignKey("pets.id", ondelete="CASCADE"), primary_key=True)
+    resolution = Column(String(8), primary_key=True)
+    bucket_start = Column(TIMESTAMP(timezone=True), primary_key=True)
+    samples = Column(Integer, nullable=False)
+    hunger_level_min = Column(Integer, nullable=False)
+    hunger_level_max = Column(Integer, nullable=False)
+    hunger_level_sum = Column(BigInteger, nullable=False)
+    hygiene_level_min = Column(Integer, nullable=False)
+    hygiene_level_max = Column(Integer, nullable=False)
+    hygiene_level_sum = Column(BigInteger, nullable=False)
+    health_level_min = Column(Integer, nullable=False)
+    health_level_max = Column(Integer, nullable=False)
+    health_level_sum = Column(BigInteger, nullable=False)
+    happiness_level_min = Column(Integer, nullable=False)
+    happiness_level_max = Column(Integer, nullable=False)
+    happiness_level_sum = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        # The compactor's watermark is the newest bucket of each tier
+        Index("ix_pet_stat_rollups_resolution_bucket", "resolution", "bucket_start"),
+    )
@@ -0,0 +1,185 @@
+from sqlalchemy import DateTime, and_, delete, func, insert, literal, literal_column, select, type_coerce
+from sqlalchemy.orm import Session
+from app.domain.repositories.pet_history_repository import PetHistoryRepository
+from app.domain.entities.pet_history import BUCKET_WIDTHS, HISTORY_STATS, PetStatBucket, StatSummary, bucket_start
+from app.adapter.db.models import Pet as PetModel, PetStatRollup, PetStatSnapshot
+from datetime import datetime, timezone
+import uuid
+from typing import Dict, List
+
+_SNAPSHOT_COLUMNS = ("pet_id", "recorded_at", *HISTORY_STATS, "level", "xp")
+_ROLLUP_COLUMNS = (
+    "pet_id", "resolution", "bucket_start", "samples",
+    *[f"{stat}_{part}" for stat in HISTORY_STATS for part in ("min", "max", "sum")],
+)
+
+# SQLite stores timestamps as text in this layout, so buckets compare correctly with bound values
+_SQLITE_BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00:00.000000", "day": "%Y-%m-%d 00:00:00.000000"}
+
+
+def record_snapshots(db: Session, condition):
+    """Copies the current stats of the pets matching `condition` into the snapshot table.
+
+    Runs as INSERT ... SELECT inside the caller's transaction, right after its write.
+    """
+    db.execute(
+        insert(PetStatSnapshot).from_select(
+            list(_SNAPSHOT_COLUMNS),
+            select(PetModel.id, PetModel.last_updated, *[getattr(PetModel, stat) for stat in HISTORY_STATS],
+                   PetModel.level, PetModel.xp).where(condition),
+        )
+    )
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    # SQLite hands timestamps back without tzinfo; they are stored as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _sql_bucket(dialect: str, resolution: str, column):
+    if dialect == "postgresql":
+        # Inlined rather than bound so the SELECT and GROUP BY expressions are identical
+        return func.date_trunc(literal_column(f"'{resolution}'"), column, literal_column("'UTC'"))
+    return type_coerce(func.strftime(_SQLITE_BUCKET_FORMATS[resolution], column), DateTime())
+
+
+def _raw_buckets(dialect: str, resolution: str, *conditions):
+    """Rollup rows for `resolution` aggregated straight from the snapshots."""
+    bucket = _sql_bucket(dialect, resolution, PetStatSnapshot.recorded_at)
+    aggregates = []
+    for stat in HISTORY_STATS:
+        column = getattr(PetStatSnapshot, stat)
+        aggregates += [func.min(column), func.max(column), func.sum(column)]
+    return (
+        select(PetStatSnapshot.pet_id, literal(resolution), bucket, func.count(), *aggregates)
+        .where(*conditions)
+        .group_by(PetStatSnapshot.pet_id, bucket)
+    )
+
+
+def _daily_from_hourly(dialect: str, *conditions):
+    """Daily rollup rows merged from the hourly ones, which are much fewer than the snapshots."""
+    bucket = _sql_bucket(dialect, "day", PetStatRollup.bucket_start)
+    aggregates = []
+    for stat in HISTORY_STATS:
+        aggregates += [
+            func.min(getattr(PetStatRollup, f"{stat}_min")),
+            func.max(getattr(PetStatRollup, f"{stat}_max")),
+            func.sum(getattr(PetStatRollup, f"{stat}_sum")),
+        ]
+    return (
+        select(PetStatRollup.pet_id, literal("day"), bucket, func.sum(PetStatRollup.samples), *aggregates)
+        .where(PetStatRollup.resolution == "hour", *conditions)
+        .group_by(PetStatRollup.pet_id, bucket)
+    )
+
+
+def _to_bucket(row) -> PetStatBucket:
+    _, _, start, samples, *values = row
+    stats = {}
+    for index, stat in enumerate(HISTORY_STATS):
+        minimum, maximum, total = values[index * 3:index * 3 + 3]
+        stats[stat] = StatSummary(minimum=minimum, average=round(total / samples, 2), maximum=maximum)
+    return PetStatBucket(start=_as_utc(start), samples=samples, stats=stats)
+
+
+class SQLPetHistoryRepository(PetHistoryRepository):
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _next_bucket(self, resolution: str) -> datetime | None:
+        """Start of the first bucket of `resolution` not rolled up yet, None if nothing was."""
+        latest = self.db.execute(
+            select(func.max(PetStatRollup.bucket_start)).where(PetStatRollup.resolution == resolution)
+        ).scalar()
+        return _as_utc(latest) + BUCKET_WIDTHS[resolution] if latest else None
+
+    def find_buckets(self, pet_id: uuid.UUID, resolution: str, start: datetime, end: datetime,
+                     limit: int) -> List[PetStatBucket]:
+        if resolution == "raw":
+            rows = self.db.execute(
+                select(PetStatSnapshot.recorded_at, *[getattr(PetStatSnapshot, stat) for stat in HISTORY_STATS])
+                .where(PetStatSnapshot.pet_id == pet_id,
+                       PetStatSnapshot.recorded_at >= start, PetStatSnapshot.recorded_at < end)
+                .order_by(PetStatSnapshot.recorded_at)
+                .limit(limit)
+            ).all()
+            return [
+                PetStatBucket(
+                    start=_as_utc(row.recorded_at),
+                    samples=1,
+                    stats={stat: StatSummary(getattr(row, stat), getattr(row, stat), getattr(row, stat))
+                           for stat in HISTORY_STATS},
+                )
+                for row in rows
+            ]
+
+        start = bucket_start(start, resolution)
+        stored = self.db.execute(
+            select(*[getattr(PetStatRollup, column) for column in _ROLLUP_COLUMNS])
+            .where(PetStatRollup.pet_id == pet_id, PetStatRollup.resolution == resolution,
+                   PetStatRollup.bucket_start >= start, PetStatRollup.bucket_start < end)
+            .order_by(PetStatRollup.bucket_start)
+            .limit(limit)
+        ).all()
+        buckets = [_to_bucket(row) for row in stored]
+
+        # Buckets the compactor has not reached yet are aggregated from the snapshots on the fly
+        tail_start = max(start, self._next_bucket(resolution) or start)
+        if len(buckets) < limit and tail_start < end:
+            tail = _raw_buckets(
+                self._dialect(), resolution,
+                PetStatSnapshot.pet_id == pet_id,
+                PetStatSnapshot.recorded_at >= tail_start, PetStatSnapshot.recorded_at < end,
+            )
+            rows = self.db.execute(tail.order_by(tail.selected_columns[2]).limit(limit - len(buckets))).all()
+            buckets += [_to_bucket(row) for row in rows]
+        return buckets
+
+    def compact(self, now: datetime) -> Dict[str, int]:
+        dialect = self._dialect()
+        written = {}
+
+        # Only finished buckets are rolled up, so a bucket is written exactly once
+        hour_end = bucket_start(now, "hour")
+        conditions = [PetStatSnapshot.recorded_at < hour_end]
+        hour_start = self._next_bucket("hour")
+        if hour_start is not None:
+            conditions.append(PetStatSnapshot.recorded_at >= hour_start)
+        result = self.db.execute(
+            insert(PetStatRollup).from_select(list(_ROLLUP_COLUMNS), _raw_buckets(dialect, "hour", *conditions))
+        )
+        written["hour"] = max(result.rowcount, 0)
+
+        day_end = bucket_start(now, "day")
+        conditions = [PetStatRollup.bucket_start < day_end]
+        day_start = self._next_bucket("day")
+        if day_start is not None:
+            conditions.append(PetStatRollup.bucket_start >= day_start)
+        result = self.db.execute(
+            insert(PetStatRollup).from_select(list(_ROLLUP_COLUMNS), _daily_from_hourly(dialect, *conditions))
+        )
+        written["day"] = max(result.rowcount, 0)
+
+        self.db.commit()
+        return written
+
+    def prune(self, raw_before: datetime, hourly_before: datetime) -> int:
+        # Never drop rows the next tier has not absorbed yet
+        raw_before = min(raw_before, self._next_bucket("hour") or datetime.min.replace(tzinfo=timezone.utc))
+        hourly_before = min(hourly_before, self._next_bucket("day") or datetime.min.replace(tzinfo=timezone.utc))
+        deleted = self.db.execute(
+            delete(PetStatSnapshot).where(PetStatSnapshot.recorded_at < raw_before)
+        ).rowcount
+        deleted += self.db.execute(
+            delete(PetStatRollup).where(
+                and_(PetStatRollup.resolution == "hour", PetStatRollup.bucket_start < hourly_before)
+            )
+        ).rowcount
+        self.db.commit()
+        return deleted
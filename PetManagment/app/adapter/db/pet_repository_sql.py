@@ -1,12 +1,135 @@
+from sqlalchemy import DateTime, Integer, bindparam, case, cast, func, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from app.domain.repositories.pet_repository import PetRepository
-from app.domain.entities.pet import Pet
-from app.adapter.db.models import Pet as PetModel
+from app.domain.repositories.pet_repository import PetRepository, PetVersionConflictError
+from app.domain.entities.pet import Pet, PetType, XP_PER_LEVEL
+from app.domain.entities.xp_grant import XpGrant
+from app.domain.entities.pet_policy import (
+    ACTIONS, CARE_REMINDER_THRESHOLD, DECAYING_STATS, PET_POLICIES, hours_until_care, policy_for
+)
+from app.adapter.db.models import Pet as PetModel, PetType as PetTypeModel, PetXpGrant as PetXpGrantModel
+from app.adapter.db.pet_history_repository_sql import record_snapshots
+from app.adapter.db.leaderboard_cache import LeaderboardCache, leaderboard_cache
+from app.adapter.events.care_schedule import CareSchedule, Reminder, care_schedule
+from datetime import datetime, timezone
 import uuid
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy only speeds up the SQLite sweep
+    np = None
+
+def hours_since(last_updated: datetime | None, now: datetime) -> float:
+    if last_updated is None:
+        return 0.0
+    # SQLite hands timestamps back without tzinfo; they are stored as UTC
+    if last_updated.tzinfo is None:
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - last_updated).total_seconds() / 3600.0)
+
+
+def _decayed(level: int, rate: float, hours: float) -> int:
+    return max(0, min(100, round(level - rate * hours)))
+
+
+def _sql_hours_since(dialect: str, column, now: datetime):
+    """SQL expression for the hours elapsed between `column` and `now`, never negative."""
+    if dialect == "postgresql":
+        hours = func.extract("epoch", literal(now, DateTime(timezone=True)) - column) / 3600.0
+    else:
+        hours = (func.julianday(literal(now, DateTime())) - func.julianday(column)) * 24.0
+    hours = func.coalesce(hours, 0.0)
+    return case((hours < 0, 0.0), else_=hours)
+
+
+def _sql_clamp(dialect: str, expr):
+    if dialect == "postgresql":
+        return func.greatest(0, func.least(100, expr))
+    return func.max(0, func.min(100, expr))
+
+
+def _sql_decayed(dialect: str, column, rate: float, hours):
+    return _sql_clamp(dialect, cast(func.round(column - rate * hours), Integer))
+
+
+def _sql_by_type(values: Dict[PetType, float]):
+    """Per-row policy value: a plain constant when every type agrees, else a CASE on pets.type."""
+    distinct = set(values.values())
+    if len(distinct) == 1:
+        return distinct.pop()
+    return case(*[(PetModel.type == PetTypeModel(pet_type.value), value) for pet_type, value in values.items()])
+
+
+# The policy table rendered as SQL once, so statements only have to splice it in
+_SQL_DECAY_RATES = {
+    stat: _sql_by_type({pet_type: policy.decay_per_hour[index] for pet_type, policy in PET_POLICIES.items()})
+    for index, stat in enumerate(DECAYING_STATS)
+}
+_SQL_ACTION_EFFECTS = {
+    action: {
+        stat: _sql_by_type({pet_type: dict(policy.action_effects[action]).get(stat, 0) for pet_type, policy in PET_POLICIES.items()})
+        for stat in {stat for policy in PET_POLICIES.values() for stat, _ in policy.action_effects[action]}
+    }
+    for action in ACTIONS
+}
+_SQL_ACTION_XP = _sql_by_type({pet_type: policy.action_xp for pet_type, policy in PET_POLICIES.items()})
+
+
+def _sql_decayed_stats(dialect: str, now: datetime) -> dict:
+    """SET clauses that persist the decay accumulated since `last_updated`."""
+    hours = _sql_hours_since(dialect, PetModel.last_updated, now)
+    return {
+        stat: _sql_decayed(dialect, getattr(PetModel, stat), rate, hours)
+        for stat, rate in _SQL_DECAY_RATES.items()
+    }
+
+
+def _care_due(pet_type, levels: Dict[str, int], at: datetime) -> float | None:
+    hours = hours_until_care(pet_type, levels)
+    return at.timestamp() + hours * 3600 if hours is not None else None
+
+
+def _sql_least(dialect: str, *exprs):
+    if len(exprs) == 1:
+        return exprs[0]
+    return func.least(*exprs) if dialect == "postgresql" else func.min(*exprs)
+
+
+def _sql_care_due(dialect: str, stats: dict, now: datetime):
+    """SQL twin of `_care_due` for the stat expressions a statement is about to write."""
+    hours = []
+    for stat, rate in _SQL_DECAY_RATES.items():
+        if isinstance(rate, (int, float)):
+            if rate > 0:
+                hours.append((stats[stat] - CARE_REMINDER_THRESHOLD) / float(rate))
+        else:
+            # A type whose rate is 0 never reaches the threshold through this stat
+            hours.append(func.coalesce((stats[stat] - CARE_REMINDER_THRESHOLD) / func.nullif(rate, 0), 1e9))
+    if not hours:
+        return None
+    soonest = _sql_least(dialect, *hours)
+    soonest = case((soonest < 0, 0.0), else_=soonest)
+    return now.timestamp() + soonest * 3600.0
+
+
+def _sql_level_and_xp(extra_xp):
+    """SET clauses for level and xp after adding `extra_xp`, any number of levels at once.
+
+    Mirrors `level_for_total_xp`: the level comes from the cumulative XP in closed form.
+    """
+    total = XP_PER_LEVEL * PetModel.level * (PetModel.level - 1) // 2 + PetModel.xp + extra_xp
+    level = cast(func.floor((func.sqrt(4 * (2 * total // XP_PER_LEVEL) + 1) + 1) / 2), Integer)
+    return {"level": level, "xp": total - XP_PER_LEVEL * level * (level - 1) // 2}
+
 
 class SQLPetRepository(PetRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, leaderboard: LeaderboardCache = leaderboard_cache,
+                 care_reminders: CareSchedule = care_schedule):
         self.db = db
+        self.leaderboard = leaderboard
+        self.care_reminders = care_reminders
 
     def _to_entity(self, model: PetModel) -> Pet:
         return Pet(
@@ -19,10 +142,28 @@ class SQLPetRepository(PetRepository):
             hunger_level=model.hunger_level,
             hygiene_level=model.hygiene_level,
             health_level=model.health_level,
-            happiness_level=model.happiness_level
+            happiness_level=model.happiness_level,
+            last_updated=model.last_updated,
+            version=model.version,
+            care_due=model.care_due
         )
 
+    def _project_decay(self, pet: Pet, now: datetime | None = None) -> Pet:
+        """Returns the pet with hunger/hygiene/health decayed up to `now`.
+
+        The stored row is left untouched; `last_updated` is moved to `now` so that
+        persisting the projected entity through `update` saves the decay as well.
+        """
+        now = now or datetime.now(timezone.utc)
+        hours_passed = hours_since(pet.last_updated, now)
+        if hours_passed > 0:
+            for stat, rate in zip(DECAYING_STATS, policy_for(pet.type).decay_per_hour):
+                setattr(pet, stat, _decayed(getattr(pet, stat), rate, hours_passed))
+        pet.last_updated = now
+        return pet
+
     def save(self, pet: Pet) -> Pet:
+        now = datetime.now(timezone.utc)
         db_pet = PetModel(
             id=pet.id,
             group_id=pet.group_id,
@@ -33,64 +174,274 @@ class SQLPetRepository(PetRepository):
             hunger_level=pet.hunger_level,
             hygiene_level=pet.hygiene_level,
             health_level=pet.health_level,
-            happiness_level=pet.happiness_level
+            happiness_level=pet.happiness_level,
+            last_updated=now,
+            version=0,
+            care_due=_care_due(pet.type, {stat: getattr(pet, stat) for stat in DECAYING_STATS}, now)
         )
         self.db.add(db_pet)
+        self.db.flush()
+        record_snapshots(self.db, PetModel.id == db_pet.id)
         self.db.commit()
         self.db.refresh(db_pet)
-        return self._to_entity(db_pet)
+        saved = self._to_entity(db_pet)
+        self._observe(saved)
+        return saved
+
+    def _observe(self, pet: Pet):
+        self.leaderboard.observe(pet)
+        self.care_reminders.observe(pet)
 
     def update(self, pet: Pet) -> Pet:
-        from datetime import datetime, timezone
-        model = self.db.query(PetModel).filter(PetModel.id == pet.id).first()
-        if model:
-            model.name = pet.name
-            model.hunger_level = pet.hunger_level
-            model.hygiene_level = pet.hygiene_level
-            model.level = pet.level
-            model.xp = pet.xp
-            model.health_level = pet.health_level
-            model.happiness_level = pet.happiness_level
-            model.last_updated = datetime.now(timezone.utc)
-            
+        last_updated = pet.last_updated or datetime.now(timezone.utc)
+        stmt = (
+            update(PetModel)
+            .where(PetModel.id == pet.id, PetModel.version == pet.version)
+            .values(
+                name=pet.name,
+                hunger_level=pet.hunger_level,
+                hygiene_level=pet.hygiene_level,
+                health_level=pet.health_level,
+                happiness_level=pet.happiness_level,
+                level=pet.level,
+                xp=pet.xp,
+                last_updated=last_updated,
+                version=PetModel.version + 1,
+                care_due=_care_due(pet.type, {stat: getattr(pet, stat) for stat in DECAYING_STATS}, last_updated),
+            )
+            .returning(*PetModel.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(stmt).first()
+        if row is None:
+            self.db.rollback()
+            raise PetVersionConflictError(pet.id)
+        record_snapshots(self.db, PetModel.id == row.id)
+        self.db.commit()
+        updated = self._to_entity(row)
+        self._observe(updated)
+        return updated
+
+    def apply_action(self, group_id: uuid.UUID, action: str) -> Pet | None:
+        # Decay, the action's increments and the level-up all happen in a single
+        # UPDATE ... RETURNING, so concurrent taps never overwrite each other.
+        dialect = self.db.get_bind().dialect.name
+        now = datetime.now(timezone.utc)
+        stats = _sql_decayed_stats(dialect, now)
+        stats["happiness_level"] = PetModel.happiness_level
+        for stat, amount in _SQL_ACTION_EFFECTS[action].items():
+            stats[stat] = _sql_clamp(dialect, stats[stat] + amount)
+
+        stmt = (
+            update(PetModel)
+            .where(PetModel.group_id == group_id)
+            .values(
+                **stats,
+                **_sql_level_and_xp(_SQL_ACTION_XP),
+                care_due=_sql_care_due(dialect, stats, now),
+                last_updated=now,
+                version=PetModel.version + 1,
+            )
+            .returning(*PetModel.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(stmt).first()
+        if row is None:
             self.db.commit()
-            self.db.refresh(model)
-            return self._to_entity(model)
-        return pet
+            return None
+        record_snapshots(self.db, PetModel.id == row.id)
+        self.db.commit()
+        updated = self._to_entity(row)
+        self._observe(updated)
+        return updated
 
-    def find_by_group_id(self, group_id: uuid.UUID) -> Pet | None:
+    def grant_xp(self, grants: List[XpGrant]) -> Tuple[Set[str], Dict[uuid.UUID, Pet]]:
+        dialect = self.db.get_bind().dialect.name
+        now = datetime.now(timezone.utc)
+        known = set(self.db.execute(
+            select(PetModel.group_id).where(PetModel.group_id.in_({grant.group_id for grant in grants}))
+        ).scalars())
+        grants = [grant for grant in grants if grant.group_id in known]
+        if not grants:
+            return set(), {}
+
+        # Keys seen before are skipped by the insert, which makes retries a no-op
+        insert_grants = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(PetXpGrantModel)
+        accepted = set(self.db.execute(
+            insert_grants.values([
+                {"idempotency_key": grant.idempotency_key, "group_id": grant.group_id,
+                 "amount": grant.amount, "granted_at": now}
+                for grant in grants
+            ])
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+            .returning(PetXpGrantModel.idempotency_key)
+        ).scalars())
+
+        totals = defaultdict(int)
+        for grant in grants:
+            if grant.idempotency_key in accepted:
+                totals[grant.group_id] += grant.amount
+        if totals:
+            # One statement executed for every pet; decay is persisted on the way as on any write
+            decayed = _sql_decayed_stats(dialect, now)
+            stmt = (
+                update(PetModel)
+                .where(PetModel.group_id == bindparam("target_group"))
+                .values(
+                    **decayed,
+                    care_due=_sql_care_due(dialect, decayed, now),
+                    **_sql_level_and_xp(bindparam("amount", type_=Integer)),
+                    last_updated=now,
+                    version=PetModel.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.db.connection().execute(stmt, [
+                {"target_group": group_id, "amount": amount} for group_id, amount in totals.items()
+            ])
+            record_snapshots(self.db, PetModel.group_id.in_(totals))
+        self.db.commit()
+
+        models = self.db.execute(select(PetModel).where(PetModel.group_id.in_(known))).scalars()
+        pets = {model.group_id: self._to_entity(model) for model in models}
+        for group_id in totals:
+            self._observe(pets[group_id])
+        return accepted, pets
+
+    def sweep_decay(self, after_id: uuid.UUID | None, limit: int, idle_before: datetime,
+                    now: datetime) -> Tuple[int, uuid.UUID | None]:
+        """Persists decay for the next `limit` pets (by id) not written since `idle_before`.
+
+        Returns how many pets were swept and the id to continue from, or None at the end.
+        """
+        chunk = select(PetModel.id).where(PetModel.last_updated < idle_before)
+        if after_id is not None:
+            chunk = chunk.where(PetModel.id > after_id)
+        chunk = chunk.order_by(PetModel.id).limit(limit)
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite" and np is not None:
+            swept, last_id = self._sweep_decay_numpy(chunk, now)
+        else:
+            decayed = _sql_decayed_stats(dialect, now)
+            stmt = (
+                update(PetModel)
+                .where(PetModel.id.in_(chunk.scalar_subquery()))
+                .values(**decayed, care_due=_sql_care_due(dialect, decayed, now),
+                        last_updated=now, version=PetModel.version + 1)
+                .returning(PetModel.id)
+                .execution_options(synchronize_session=False)
+            )
+            ids = self.db.execute(stmt).scalars().all()
+            swept, last_id = len(ids), max(ids, default=None)
+            if ids:
+                record_snapshots(self.db, PetModel.id.in_(ids))
+        self.db.commit()
+        return swept, (last_id if swept == limit else None)
+
+    def _sweep_decay_numpy(self, chunk, now: datetime) -> Tuple[int, uuid.UUID | None]:
+        # SQLite has no server to push the arithmetic to, so decay the whole chunk
+        # in one vectorised pass and write it back with a single executemany.
+        rows = self.db.execute(
+            select(
+                PetModel.id, PetModel.type, PetModel.version, PetModel.last_updated,
+                PetModel.hunger_level, PetModel.hygiene_level, PetModel.health_level,
+            ).where(PetModel.id.in_(chunk.scalar_subquery())).order_by(PetModel.id)
+        ).all()
+        if not rows:
+            return 0, None
+
+        hours = np.fromiter((hours_since(row.last_updated, now) for row in rows), dtype=float, count=len(rows))
+        levels = np.array([(row.hunger_level, row.hygiene_level, row.health_level) for row in rows], dtype=float)
+        rates = np.array([policy_for(row.type).decay_per_hour for row in rows], dtype=float)
+        decayed = np.clip(np.round(levels - hours[:, None] * rates), 0, 100).astype(int)
+
+        stmt = (
+            update(PetModel)
+            .where(PetModel.id == bindparam("pet_id"), PetModel.version == bindparam("expected_version"))
+            .values(
+                hunger_level=bindparam("hunger"),
+                hygiene_level=bindparam("hygiene"),
+                health_level=bindparam("health"),
+                care_due=bindparam("care_due"),
+                last_updated=now,
+                version=PetModel.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Rows written concurrently since the select keep their fresher state
+        self.db.connection().execute(stmt, [
+            {
+                "pet_id": row.id,
+                "expected_version": row.version,
+                "hunger": int(hunger),
+                "hygiene": int(hygiene),
+                "health": int(health),
+                "care_due": _care_due(
+                    row.type, dict(zip(DECAYING_STATS, (int(hunger), int(hygiene), int(health)))), now
+                ),
+            }
+            for row, (hunger, hygiene, health) in zip(rows, decayed)
+        ])
+        # Rows skipped by the version check were not stamped with `now`
+        record_snapshots(self.db, PetModel.id.in_([row.id for row in rows]) & (PetModel.last_updated == now))
+        return len(rows), rows[-1].id
+
+    def _find_stored(self, group_id: uuid.UUID) -> Pet | None:
         model = self.db.query(PetModel).filter(PetModel.group_id == group_id).first()
-        if not model:
-            return None
-        
-        # Calculate decay based on last_updated
-        from datetime import datetime, timezone
-        if model.last_updated:
-            now = datetime.now(timezone.utc)
-            time_diff = now - model.last_updated
-            hours_passed = time_diff.total_seconds() / 3600.0
-            
-            # Only apply decay if more than 1 minute has passed (to avoid rounding issues)
-            if hours_passed > (1.0 / 60.0):  # More than 1 minute
-                # Decay rates per hour
-                decay_per_hour = {
-                    'hunger': 8,
-                    'hygiene': 6,
-                    'health': 4,
-                }
-                
-                # Apply decay
-                model.hunger_level = max(0, min(100, model.hunger_level - (decay_per_hour['hunger'] * hours_passed)))
-                model.hygiene_level = max(0, min(100, model.hygiene_level - (decay_per_hour['hygiene'] * hours_passed)))
-                model.health_level = max(0, min(100, model.health_level - (decay_per_hour['health'] * hours_passed)))
-                
-                # Update last_updated to now only if we applied decay
-                model.last_updated = now
-                self.db.commit()
-            # If less than 1 minute, don't apply decay and don't update last_updated
-            # This ensures that recent actions (feed/clean/play) are preserved
-        
-        return self._to_entity(model)
+        return self._to_entity(model) if model else None
+
+    def _find_stored_many(self, group_ids: Set[uuid.UUID]) -> Dict[uuid.UUID, Pet]:
+        models = self.db.query(PetModel).filter(PetModel.group_id.in_(group_ids)).all()
+        return {model.group_id: self._to_entity(model) for model in models}
+
+    def find_by_group_id(self, group_id: uuid.UUID) -> Pet | None:
+        pet = self._find_stored(group_id)
+        # Decay is projected in memory; it is only persisted by the next mutation
+        return self._project_decay(pet) if pet else None
+
+    def find_version_by_group_id(self, group_id: uuid.UUID) -> Tuple[int, datetime | None] | None:
+        """Only the columns needed to validate a cached copy of the pet."""
+        row = self.db.execute(
+            select(PetModel.version, PetModel.last_updated).where(PetModel.group_id == group_id)
+        ).first()
+        return (row.version, row.last_updated) if row else None
+
+    def find_by_group_ids(self, group_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Pet]:
+        if not group_ids:
+            return {}
+        now = datetime.now(timezone.utc)
+        return {group_id: self._project_decay(pet, now) for group_id, pet in self._find_stored_many(set(group_ids)).items()}
+
+    def _query_leaderboard(self, after: Tuple[int, int, uuid.UUID] | None, limit: int) -> List[Pet]:
+        # Served by ix_pets_leaderboard; the row-value comparison keeps deep pages cheap
+        query = select(PetModel).order_by(PetModel.level.desc(), PetModel.xp.desc(), PetModel.id.desc())
+        if after is not None:
+            query = query.where(tuple_(PetModel.level, PetModel.xp, PetModel.id) < tuple_(*after))
+        return [self._to_entity(model) for model in self.db.execute(query.limit(limit)).scalars()]
+
+    def find_leaderboard(self, after: Tuple[int, int, uuid.UUID] | None, limit: int) -> List[Pet]:
+        if after is None and limit <= self.leaderboard.size:
+            return self.leaderboard.top(limit, lambda size: self._query_leaderboard(None, size))
+        return self._query_leaderboard(after, limit)
+
+    def find_rank(self, pet: Pet) -> int:
+        rank = self.leaderboard.rank_of(pet)
+        if rank is None:
+            ahead = self.db.execute(
+                select(func.count()).select_from(PetModel)
+                .where(tuple_(PetModel.level, PetModel.xp) > tuple_(pet.level, pet.xp))
+            ).scalar()
+            rank = 1 + ahead
+        return rank
+
+    def find_care_due(self, after: float, until: float) -> List[Reminder]:
+        """Reminders due in (after, until], read through the index on care_due."""
+        rows = self.db.execute(
+            select(PetModel.care_due, PetModel.id, PetModel.group_id)
+            .where(PetModel.care_due > after, PetModel.care_due <= until)
+        ).all()
+        return [tuple(row) for row in rows]
 
     def find_one(self) -> Pet | None:
         model = self.db.query(PetModel).first()
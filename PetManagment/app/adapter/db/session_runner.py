@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Callable, TypeVar
+from app.adapter.db.database import AsyncSessionLocal, SessionLocal
+
+T = TypeVar("T")
+
+# The routes are async and the use cases and repositories sync. A SessionRunner is
+# the only piece that differs between the two database stacks (DATABASE_ASYNC): it
+# runs one unit of repository work on a session of its own without blocking the
+# event loop, and closes the session as soon as the work returns.
+
+
+class SessionRunner(ABC):
+    @abstractmethod
+    async def run(self, work: Callable[[Session], T]) -> T:
+        """Returns `work(session)`, run on a new session that is closed afterwards."""
+        pass
+
+
+def _run_in_session(work: Callable[[Session], T]) -> T:
+    db = SessionLocal()
+    try:
+        return work(db)
+    finally:
+        db.close()
+
+
+class ThreadpoolSessionRunner(SessionRunner):
+    """Sync engine: the work runs on a threadpool thread, as `def` routes do."""
+
+    async def run(self, work: Callable[[Session], T]) -> T:
+        return await run_in_threadpool(_run_in_session, work)
+
+
+class AsyncSessionRunner(SessionRunner):
+    """Async engine: `run_sync` executes the work in a greenlet whose driver calls are
+    awaited on the event loop, so a request waiting on the database holds no thread.
+    """
+
+    async def run(self, work: Callable[[Session], T]) -> T:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(work)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class PetEventBroker:
+    """In-process publisher of pet snapshots, one channel per group.
+
+    Writers publish once per commit and every open stream of the group gets the
+    message, so N watching members cost one broadcast. While a group has
+    subscribers a single ticker task also pushes a fresh snapshot every
+    `tick_seconds`, so clients see decay without polling.
+    """
+
+    def __init__(self, snapshot_loader: Callable[[uuid.UUID], dict | None], tick_seconds: float = 60.0,
+                 queue_size: int = 16):
+        self._load_snapshot = snapshot_loader
+        self._tick_seconds = tick_seconds
+        self._queue_size = queue_size
+        self._subscribers: Dict[uuid.UUID, Set[asyncio.Queue]] = defaultdict(set)
+        self._tickers: Dict[uuid.UUID, asyncio.Task] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, group_id: uuid.UUID) -> asyncio.Queue:
+        """Must be called from the event loop serving the streams."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers[group_id].add(queue)
+            if group_id not in self._tickers and self._tick_seconds > 0:
+                self._tickers[group_id] = asyncio.create_task(self._tick(group_id))
+        return queue
+
+    def unsubscribe(self, group_id: uuid.UUID, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(group_id)
+            if subscribers is None:
+                return
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[group_id]
+                ticker = self._tickers.pop(group_id, None)
+                if ticker:
+                    ticker.cancel()
+
+    def subscriber_count(self, group_id: uuid.UUID) -> int:
+        return len(self._subscribers.get(group_id, ()))
+
+    def publish(self, group_id: uuid.UUID, data: dict, event: str = "pet"):
+        """Thread-safe; sync route handlers call it from the threadpool."""
+        if group_id not in self._subscribers or self._loop is None:
+            return
+        message = format_sse(event, data)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._fan_out(group_id, message)
+        else:
+            self._loop.call_soon_threadsafe(self._fan_out, group_id, message)
+
+    def _fan_out(self, group_id: uuid.UUID, message: str):
+        for queue in list(self._subscribers.get(group_id, ())):
+            if queue.full():
+                # A slow client only needs the latest state, drop its oldest snapshot
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _tick(self, group_id: uuid.UUID):
+        while True:
+            await asyncio.sleep(self._tick_seconds)
+            try:
+                snapshot = await asyncio.to_thread(self._load_snapshot, group_id)
+            except Exception:
+                logger.exception("Could not load pet snapshot for group %s", group_id)
+                continue
+            if snapshot is not None:
+                self._fan_out(group_id, format_sse("pet", snapshot))
@@ -0,0 +1,96 @@
+import asyncio
+import heapq
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Tuple
+from app.domain.entities.pet import Pet
+
+# Only reminders due within this many seconds are held in memory; the rest are
+# loaded from the indexed pets.care_due column as the horizon moves forward
+CARE_SCHEDULE_HORIZON_SECONDS = float(os.getenv("PET_CARE_SCHEDULE_HORIZON_SECONDS", "21600"))
+
+Reminder = Tuple[float, uuid.UUID, uuid.UUID]  # (due, pet_id, group_id)
+
+
+class CareSchedule:
+    """Priority queue of upcoming care reminders, fed by pet writes and horizon loads.
+
+    A pet has at most one live entry: rescheduling supersedes the heap entry lazily,
+    stale ones are skipped when popped. Due times already in the past are ignored,
+    so a pet is reminded once per neglect, not on every write while it stays low.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: List[Reminder] = []
+        self._due: Dict[uuid.UUID, float] = {}
+        self._loaded_until = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.wakeup: asyncio.Event | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Lets writes from worker threads wake the reminder loop up early."""
+        self._loop = loop
+        self.wakeup = asyncio.Event()
+
+    @property
+    def loaded_until(self) -> float:
+        return self._loaded_until
+
+    def _push(self, due: float, pet_id: uuid.UUID, group_id: uuid.UUID) -> bool:
+        if self._due.get(pet_id) == due:
+            return False
+        self._due[pet_id] = due
+        heapq.heappush(self._heap, (due, pet_id, group_id))
+        return self._heap[0][1] == pet_id and self._heap[0][0] == due
+
+    def observe(self, pet: Pet):
+        """Called after every write with the stored pet."""
+        now = time.time()
+        with self._lock:
+            if pet.care_due is None or pet.care_due <= now:
+                self._due.pop(pet.id, None)
+                return
+            if pet.care_due > self._loaded_until:
+                # Beyond the horizon: the next load picks it up from the index
+                self._due.pop(pet.id, None)
+                return
+            earliest = self._push(pet.care_due, pet.id, pet.group_id)
+        if earliest and self._loop is not None:
+            self._loop.call_soon_threadsafe(self.wakeup.set)
+
+    def load(self, reminders: List[Reminder], until: float):
+        """Adds the reminders read from the database for the window ending at `until`."""
+        with self._lock:
+            for due, pet_id, group_id in reminders:
+                # A write seen since the query already scheduled a fresher time
+                if pet_id not in self._due:
+                    self._push(due, pet_id, group_id)
+            self._loaded_until = max(self._loaded_until, until)
+
+    def seconds_until_next(self, now: float) -> float | None:
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return max(0.0, self._heap[0][0] - now) if self._heap else None
+
+    def pop_due(self, now: float) -> List[Reminder]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                reminder = heapq.heappop(self._heap)
+                if self._due.get(reminder[1]) == reminder[0]:
+                    del self._due[reminder[1]]
+                    due.append(reminder)
+        return due
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._due.clear()
+            self._loaded_until = 0.0
+
+
+care_schedule = CareSchedule()
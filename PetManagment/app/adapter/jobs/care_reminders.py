@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Callable
+from app.adapter.db.database import SessionLocal
+from app.adapter.db.pet_repository_sql import SQLPetRepository
+from app.adapter.events.care_schedule import CARE_SCHEDULE_HORIZON_SECONDS, CareSchedule, care_schedule
+from app.adapter.metrics import PET_CARE_REMINDERS
+from app.domain.entities.pet_policy import CARE_REMINDER_THRESHOLD, DECAYING_STATS
+
+logger = logging.getLogger(__name__)
+
+CARE_REMINDERS_ENABLED = os.getenv("PET_CARE_REMINDERS_ENABLED", "true").lower() != "false"
+
+# Due times are re-checked against this much clock skew between replicas
+_DUE_SLACK_SECONDS = 1.0
+
+
+def load_horizon(schedule: CareSchedule = care_schedule, now: float | None = None):
+    """Reads the reminders entering the horizon since the last load from the care_due index."""
+    now = now or time.time()
+    until = now + CARE_SCHEDULE_HORIZON_SECONDS
+    db = SessionLocal()
+    try:
+        reminders = SQLPetRepository(db).find_care_due(max(now, schedule.loaded_until), until)
+    finally:
+        db.close()
+    schedule.load(reminders, until)
+
+
+def check_reminder(group_id: uuid.UUID, schedule: CareSchedule = care_schedule) -> dict | None:
+    """Re-reads the pet and returns the reminder payload if it is really due now.
+
+    Bypasses the pet cache: the row may have been written by another replica.
+    """
+    db = SessionLocal()
+    try:
+        pet = SQLPetRepository(db).find_by_group_id(group_id)
+    finally:
+        db.close()
+    if pet is None or pet.care_due is None:
+        return None
+    if pet.care_due > time.time() + _DUE_SLACK_SECONDS:
+        # Cared for since it was scheduled; follow the new due time instead
+        schedule.observe(pet)
+        return None
+    return {
+        "pet_id": str(pet.id),
+        "name": pet.name,
+        "threshold": CARE_REMINDER_THRESHOLD,
+        "stats": {stat: getattr(pet, stat) for stat in DECAYING_STATS},
+    }
+
+
+async def run_care_reminders(notify: Callable[[uuid.UUID, dict], None], schedule: CareSchedule = care_schedule):
+    """Sleeps until the next due reminder, a write scheduling an earlier one, or the next horizon load."""
+    schedule.bind(asyncio.get_running_loop())
+    refresh_every = CARE_SCHEDULE_HORIZON_SECONDS / 2
+    next_refresh = 0.0
+    while True:
+        schedule.wakeup.clear()
+        try:
+            now = time.time()
+            if now >= next_refresh:
+                await asyncio.to_thread(load_horizon, schedule, now)
+                next_refresh = now + refresh_every
+
+            for _, _, group_id in schedule.pop_due(time.time()):
+                payload = await asyncio.to_thread(check_reminder, group_id, schedule)
+                if payload is None:
+                    continue
+                PET_CARE_REMINDERS.inc()
+                logger.info("Care reminder for group %s: %s", group_id, payload["stats"])
+                notify(group_id, payload)
+
+            now = time.time()
+            wait = next_refresh - now
+            until_next = schedule.seconds_until_next(now)
+            if until_next is not None:
+                wait = min(wait, until_next)
+        except Exception:
+            logger.exception("Care reminder pass failed")
+            wait = 60.0
+
+        try:
+            await asyncio.wait_for(schedule.wakeup.wait(), timeout=max(wait, 0.0))
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from app.adapter.db.database import SessionLocal
+from app.adapter.db.cached_pet_repository import CachedSQLPetRepository
+from app.adapter.metrics import DECAY_SWEEP_PETS, DECAY_SWEEP_PETS_PER_SECOND
+from app.application.usecases.sweep_pet_decay import SweepPetDecayUseCase
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps; 0 disables the job
+SWEEP_INTERVAL_SECONDS = float(os.getenv("PET_DECAY_SWEEP_INTERVAL_SECONDS", "300"))
+SWEEP_CHUNK_SIZE = int(os.getenv("PET_DECAY_SWEEP_CHUNK_SIZE", "1000"))
+SWEEP_MIN_IDLE_SECONDS = float(os.getenv("PET_DECAY_SWEEP_MIN_IDLE_SECONDS", "3600"))
+
+
+def sweep_once(chunk_size: int = SWEEP_CHUNK_SIZE, min_idle_seconds: float = SWEEP_MIN_IDLE_SECONDS) -> int:
+    db = SessionLocal()
+    try:
+        use_case = SweepPetDecayUseCase(CachedSQLPetRepository(db))
+        swept, elapsed = use_case.execute(chunk_size, timedelta(seconds=min_idle_seconds))
+    finally:
+        db.close()
+
+    rate = swept / elapsed if elapsed > 0 else 0.0
+    DECAY_SWEEP_PETS.inc(swept)
+    DECAY_SWEEP_PETS_PER_SECOND.set(rate)
+    logger.info("Decay sweep persisted %d pets in %.3fs (%.0f pets/s)", swept, elapsed, rate)
+    return swept
+
+
+async def run_decay_sweep(interval_seconds: float = SWEEP_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            # The sweep uses the sync session, keep it off the event loop
+            await asyncio.to_thread(sweep_once)
+        except Exception:
+            logger.exception("Decay sweep failed")
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+import os
+from app.adapter.db.database import SessionLocal
+from app.adapter.db.pet_history_repository_sql import SQLPetHistoryRepository
+from app.adapter.metrics import HISTORY_PRUNED_ROWS, HISTORY_ROLLUP_BUCKETS
+from app.application.usecases.compact_pet_history import CompactPetHistoryUseCase
+
+logger = logging.getLogger(__name__)
+
+# Seconds between compactions; 0 disables the job
+COMPACT_INTERVAL_SECONDS = float(os.getenv("PET_HISTORY_COMPACT_INTERVAL_SECONDS", "600"))
+
+
+def compact_once() -> dict:
+    db = SessionLocal()
+    try:
+        written = CompactPetHistoryUseCase(SQLPetHistoryRepository(db)).execute()
+    finally:
+        db.close()
+
+    HISTORY_ROLLUP_BUCKETS.labels(resolution="hour").inc(written["hour"])
+    HISTORY_ROLLUP_BUCKETS.labels(resolution="day").inc(written["day"])
+    HISTORY_PRUNED_ROWS.inc(written["pruned"])
+    logger.info(
+        "History compaction wrote %d hourly and %d daily buckets, pruned %d rows",
+        written["hour"], written["day"], written["pruned"],
+    )
+    return written
+
+
+async def run_history_compactor(interval_seconds: float = COMPACT_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(compact_once)
+        except Exception:
+            logger.exception("History compaction failed")
@@ -0,0 +1,50 @@
+from prometheus_client import Counter, Gauge
+
+# Exposed on /metrics through the default registry used by the Instrumentator
+
+PET_UPDATE_CONFLICTS = Counter(
+    "pet_update_conflicts_total",
+    "Pet writes rejected because the row version changed since it was read",
+)
+PET_UPDATE_RETRIES = Counter(
+    "pet_update_retries_total",
+    "Pet use case attempts repeated after a version conflict",
+)
+
+DECAY_SWEEP_PETS = Counter(
+    "pet_decay_sweep_pets_total",
+    "Pets whose decay was persisted by the background sweep",
+)
+DECAY_SWEEP_PETS_PER_SECOND = Gauge(
+    "pet_decay_sweep_pets_per_second",
+    "Throughput of the last background decay sweep",
+)
+
+HISTORY_ROLLUP_BUCKETS = Counter(
+    "pet_history_rollup_buckets_total",
+    "Stat history buckets written by the compactor",
+    ["resolution"],
+)
+HISTORY_PRUNED_ROWS = Counter(
+    "pet_history_pruned_rows_total",
+    "Stat history rows deleted once past their retention",
+)
+
+PET_CACHE_HITS = Counter(
+    "pet_cache_hits_total",
+    "Pet reads by group id answered from the cache",
+)
+PET_CACHE_MISSES = Counter(
+    "pet_cache_misses_total",
+    "Pet reads by group id that went to the database",
+)
+PET_CACHE_EVICTIONS = Counter(
+    "pet_cache_evictions_total",
+    "Pets dropped from the cache, by reason (size or ttl)",
+    ["reason"],
+)
+
+PET_CARE_REMINDERS = Counter(
+    "pet_care_reminders_total",
+    "Care reminders emitted because a pet stat decayed to the threshold",
+)
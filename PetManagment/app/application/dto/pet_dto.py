@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from app.domain.entities.pet import PetType
 import uuid
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 
 class PetCreateDTO(BaseModel):
     group_id: uuid.UUID
@@ -18,6 +20,9 @@ class PetResponseDTO(BaseModel):
     level: int
     xp: int
 
+class PetGroupsQueryDTO(BaseModel):
+    group_ids: List[uuid.UUID]
+
 class PetNameUpdateDTO(BaseModel):
     name: str
 
@@ -25,4 +30,72 @@ class PetStatsUpdateDTO(BaseModel):
     hunger_level: int = None
     hygiene_level: int = None
     health_level: int = None
-    happiness_level: int = None
\ No newline at end of file
+    happiness_level: int = None
+
+class PetActionDTO(BaseModel):
+    type: Literal["feed", "clean", "play", "rename", "stats"]
+    name: Optional[str] = None
+    stats: Optional[PetStatsUpdateDTO] = None
+
+class PetActionsDTO(BaseModel):
+    actions: List[PetActionDTO]
+
+class PetActionResultDTO(BaseModel):
+    type: str
+    xp_gained: int
+    levels_gained: int
+
+class PetActionsResponseDTO(BaseModel):
+    pet: PetResponseDTO
+    results: List[PetActionResultDTO]
+
+class StatSummaryDTO(BaseModel):
+    min: int
+    avg: float
+    max: int
+
+class PetHistoryPointDTO(BaseModel):
+    start: datetime
+    samples: int
+    stats: Dict[str, StatSummaryDTO]
+
+class PetHistoryDTO(BaseModel):
+    resolution: str
+    points: List[PetHistoryPointDTO]
+
+class LeaderboardEntryDTO(BaseModel):
+    rank: int
+    group_id: uuid.UUID
+    pet_id: uuid.UUID
+    name: str
+    type: PetType
+    level: int
+    xp: int
+
+class LeaderboardPageDTO(BaseModel):
+    entries: List[LeaderboardEntryDTO]
+    next_cursor: Optional[str] = None
+
+class XpGrantDTO(BaseModel):
+    group_id: uuid.UUID
+    amount: int
+    idempotency_key: str
+
+class XpGrantBatchDTO(BaseModel):
+    grants: List[XpGrantDTO]
+
+class XpGrantResultDTO(BaseModel):
+    idempotency_key: str
+    group_id: uuid.UUID
+    status: Literal["applied", "duplicate", "not_found"]
+    level: Optional[int] = None
+    xp: Optional[int] = None
+
+class XpGrantBatchResponseDTO(BaseModel):
+    results: List[XpGrantResultDTO]
+
+class PetPolicyDTO(BaseModel):
+    decay_per_hour: Dict[str, float]
+    actions: Dict[str, Dict[str, int]]
+    action_xp: int
+    xp_per_level: int
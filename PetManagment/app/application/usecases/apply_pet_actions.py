@@ -0,0 +1,52 @@
+from app.domain.repositories.pet_repository import PetRepository
+from app.domain.entities.pet import Pet
+from app.application.dto.pet_dto import PetActionDTO, PetActionResultDTO
+from app.application.usecases.retry import retry_on_conflict
+from fastapi import HTTPException
+from typing import List, Tuple
+import uuid
+
+MAX_ACTIONS_PER_REQUEST = 50
+
+class ApplyPetActionsUseCase:
+    def __init__(self, repository: PetRepository):
+        self.repository = repository
+
+    def execute(self, group_id: uuid.UUID, actions: List[PetActionDTO]) -> Tuple[Pet, List[PetActionResultDTO]]:
+        if not actions:
+            raise HTTPException(status_code=400, detail="At least one action is required")
+        if len(actions) > MAX_ACTIONS_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_ACTIONS_PER_REQUEST} actions can be applied at once"
+            )
+        for action in actions:
+            if action.type == "rename" and not action.name:
+                raise HTTPException(status_code=400, detail="A rename action needs a name")
+            if action.type == "stats" and action.stats is None:
+                raise HTTPException(status_code=400, detail="A stats action needs stats")
+
+        def apply_all() -> Tuple[Pet, List[PetActionResultDTO]]:
+            # The pet is loaded (with decay projected) once, every action runs on the
+            # entity and a single versioned update persists the result
+            pet = self.repository.find_by_group_id(group_id)
+            if not pet:
+                raise HTTPException(status_code=404, detail="Pet not found for this group")
+
+            results = []
+            for action in actions:
+                xp_before, level_before = pet.total_xp, pet.level
+                if action.type == "rename":
+                    pet.update_name(action.name)
+                elif action.type == "stats":
+                    pet.set_stats(**action.stats.model_dump())
+                else:
+                    pet.apply_action(action.type)
+                results.append(PetActionResultDTO(
+                    type=action.type,
+                    xp_gained=pet.total_xp - xp_before,
+                    levels_gained=pet.level - level_before,
+                ))
+            return self.repository.update(pet), results
+
+        return retry_on_conflict(apply_all)
@@ -8,9 +8,7 @@ class CleanPetUseCase:
         self.repository = repository
 
     def execute(self, group_id: uuid.UUID) -> Pet:
-        pet = self.repository.find_by_group_id(group_id)
+        pet = self.repository.apply_action(group_id, "clean")
         if not pet:
             raise HTTPException(status_code=404, detail="Pet not found for this group")
-        
-        pet.clean()
-        return self.repository.update(pet)
+        return pet
@@ -0,0 +1,18 @@
+from app.domain.repositories.pet_history_repository import PetHistoryRepository
+from app.domain.entities.pet_history import HOURLY_RETENTION, RAW_RETENTION
+from datetime import datetime, timezone
+from typing import Dict
+
+class CompactPetHistoryUseCase:
+    def __init__(self, repository: PetHistoryRepository):
+        self.repository = repository
+
+    def execute(self, now: datetime | None = None) -> Dict[str, int]:
+        """Rolls finished hours and days up, then drops rows past their tier's retention.
+
+        Returns the buckets written per tier and the number of rows pruned.
+        """
+        now = now or datetime.now(timezone.utc)
+        written = self.repository.compact(now)
+        written["pruned"] = self.repository.prune(now - RAW_RETENTION, now - HOURLY_RETENTION)
+        return written
@@ -0,0 +1,20 @@
+from app.domain.repositories.pet_repository import PetRepository
+from app.domain.entities.pet import Pet
+from fastapi import HTTPException
+from typing import Dict, List
+import uuid
+
+MAX_GROUPS_PER_REQUEST = 200
+
+class GetGroupPetsUseCase:
+    def __init__(self, repository: PetRepository):
+        self.repository = repository
+
+    def execute(self, group_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Pet]:
+        if len(group_ids) > MAX_GROUPS_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_GROUPS_PER_REQUEST} groups can be requested at once"
+            )
+        # Groups without a pet are simply left out of the result
+        return self.repository.find_by_group_ids(group_ids)
@@ -0,0 +1,53 @@
+from app.domain.repositories.pet_repository import PetRepository
+from app.domain.entities.pet import Pet
+from fastapi import HTTPException
+from typing import List, Tuple
+import base64
+import binascii
+import json
+import uuid
+
+MAX_LEADERBOARD_LIMIT = 100
+
+def _encode_cursor(pet: Pet, position: int, rank: int) -> str:
+    raw = json.dumps([pet.level, pet.xp, str(pet.id), position, rank])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[Tuple[int, int, uuid.UUID], int, int]:
+    try:
+        level, xp, pet_id, position, rank = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (int(level), int(xp), uuid.UUID(pet_id)), int(position), int(rank)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+class GetLeaderboardUseCase:
+    def __init__(self, repository: PetRepository):
+        self.repository = repository
+
+    def execute(self, limit: int, cursor: str | None = None) -> Tuple[List[Tuple[int, Pet]], str | None]:
+        """Returns one page of (rank, pet) and the cursor of the next page, if any.
+
+        Pets with the same level and XP share a rank. The cursor carries the position
+        and rank of the last pet served, so later pages need no counting.
+        """
+        if not 1 <= limit <= MAX_LEADERBOARD_LIMIT:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_LEADERBOARD_LIMIT}")
+
+        after, position, rank = None, 0, 0
+        previous = None
+        if cursor:
+            after, position, rank = _decode_cursor(cursor)
+            previous = after[:2]
+
+        # One extra row tells whether another page exists
+        pets = self.repository.find_leaderboard(after, limit + 1)
+        entries = []
+        for pet in pets[:limit]:
+            position += 1
+            if (pet.level, pet.xp) != previous:
+                rank = position
+                previous = (pet.level, pet.xp)
+            entries.append((rank, pet))
+
+        next_cursor = _encode_cursor(entries[-1][1], position, rank) if len(pets) > limit else None
+        return entries, next_cursor
@@ -0,0 +1,63 @@
+from app.domain.repositories.pet_repository import PetRepository
+from app.domain.repositories.pet_history_repository import PetHistoryRepository
+from app.domain.entities.pet_history import HOURLY_RETENTION, RAW_RETENTION, RESOLUTIONS, PetStatBucket
+from fastapi import HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+import uuid
+
+MAX_HISTORY_POINTS = 1000
+# Longest range served from each tier when no resolution is asked for
+RAW_MAX_SPAN = timedelta(days=1)
+HOURLY_MAX_SPAN = timedelta(days=31)
+
+class GetPetHistoryUseCase:
+    def __init__(self, pet_repository: PetRepository, history_repository: PetHistoryRepository):
+        self.pet_repository = pet_repository
+        self.history_repository = history_repository
+
+    def _pick_resolution(self, start: datetime, end: datetime, now: datetime) -> str:
+        # The finest tier that still holds `start` and keeps the point count bounded
+        span = end - start
+        if span <= RAW_MAX_SPAN and start >= now - RAW_RETENTION:
+            return "raw"
+        if span <= HOURLY_MAX_SPAN and start >= now - HOURLY_RETENTION:
+            return "hour"
+        return "day"
+
+    def execute(self, group_id: uuid.UUID, start: datetime | None = None, end: datetime | None = None,
+                resolution: str | None = None) -> Tuple[str, List[PetStatBucket]]:
+        if resolution is not None and resolution not in RESOLUTIONS:
+            raise HTTPException(status_code=400, detail=f"resolution must be one of {', '.join(RESOLUTIONS)}")
+
+        now = datetime.now(timezone.utc)
+        end = end or now
+        start = start or end - RAW_MAX_SPAN
+        # Naive query values are read as UTC
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        if start >= end:
+            raise HTTPException(status_code=400, detail="from must be earlier than to")
+
+        pet = self.pet_repository.find_by_group_id(group_id)
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found for this group")
+
+        requested = resolution
+        resolution = resolution or self._pick_resolution(start, end, now)
+        while True:
+            # One point past the limit tells a full range from one that was cut short
+            buckets = self.history_repository.find_buckets(pet.id, resolution, start, end, MAX_HISTORY_POINTS + 1)
+            if len(buckets) <= MAX_HISTORY_POINTS:
+                return resolution, buckets
+            coarser = RESOLUTIONS.index(resolution) + 1
+            if requested is not None or coarser == len(RESOLUTIONS):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"The range holds more than {MAX_HISTORY_POINTS} {resolution} points; "
+                           "narrow it or ask for a coarser resolution",
+                )
+            # A busy pet can outgrow the tier its span picked; every coarser tier keeps at least as much
+            resolution = RESOLUTIONS[coarser]
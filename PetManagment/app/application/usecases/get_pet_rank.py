@@ -0,0 +1,15 @@
+from app.domain.repositories.pet_repository import PetRepository
+from app.domain.entities.pet import Pet
+from fastapi import HTTPException
+from typing import Tuple
+import uuid
+
+class GetPetRankUseCase:
+    def __init__(self, repository: PetRepository):
+        self.repository = repository
+
+    def execute(self, group_id: uuid.UUID) -> Tuple[int, Pet]:
+        pet = self.repository.find_by_group_id(group_id)
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found for this group")
+        return self.repository.find_rank(pet), pet
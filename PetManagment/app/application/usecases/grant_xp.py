@@ -0,0 +1,42 @@
+from app.domain.repositories.pet_repository import PetRepository
+from app.domain.entities.pet import Pet
+from app.domain.entities.xp_grant import XpGrant
+from fastapi import HTTPException
+from typing import Dict, List, Tuple
+import uuid
+
+MAX_GRANTS_PER_REQUEST = 500
+MAX_GRANT_AMOUNT = 1_000_000
+
+class GrantXpUseCase:
+    def __init__(self, repository: PetRepository):
+        self.repository = repository
+
+    def execute(self, grants: List[XpGrant]) -> Tuple[List[Tuple[XpGrant, str]], Dict[uuid.UUID, Pet]]:
+        """Returns each grant with its outcome ("applied", "duplicate" or "not_found") and the pets by group."""
+        if len(grants) > MAX_GRANTS_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_GRANTS_PER_REQUEST} grants can be applied at once"
+            )
+        for grant in grants:
+            if not 0 < grant.amount <= MAX_GRANT_AMOUNT:
+                raise HTTPException(status_code=400, detail=f"amount must be between 1 and {MAX_GRANT_AMOUNT}")
+            if not 0 < len(grant.idempotency_key) <= 128:
+                raise HTTPException(status_code=400, detail="idempotency_key must be 1 to 128 characters")
+
+        # A key repeated inside the batch only counts once
+        unique: Dict[str, XpGrant] = {}
+        for grant in grants:
+            unique.setdefault(grant.idempotency_key, grant)
+        accepted, pets = self.repository.grant_xp(list(unique.values()))
+
+        outcomes = []
+        for grant in grants:
+            if unique[grant.idempotency_key] is grant and grant.idempotency_key in accepted:
+                outcomes.append((grant, "applied"))
+            elif grant.group_id in pets:
+                outcomes.append((grant, "duplicate"))
+            else:
+                outcomes.append((grant, "not_found"))
+        return outcomes, pets
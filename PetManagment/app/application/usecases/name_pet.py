@@ -1,5 +1,6 @@
 from app.domain.repositories.pet_repository import PetRepository
 from app.domain.entities.pet import Pet
+from app.application.usecases.retry import retry_on_conflict
 from fastapi import HTTPException
 import uuid
 
@@ -8,9 +9,12 @@ class NamePetUseCase:
         self.repository = repository
 
     def execute(self, group_id: uuid.UUID, name: str) -> Pet:
-        pet = self.repository.find_by_group_id(group_id)
-        if not pet:
-            raise HTTPException(status_code=404, detail="Pet not found for this group")
-        
-        pet.update_name(name)
-        return self.repository.update(pet)
+        def rename() -> Pet:
+            pet = self.repository.find_by_group_id(group_id)
+            if not pet:
+                raise HTTPException(status_code=404, detail="Pet not found for this group")
+
+            pet.update_name(name)
+            return self.repository.update(pet)
+
+        return retry_on_conflict(rename)
@@ -8,10 +8,8 @@ class PlayPetUseCase:
         self.repository = repository
 
     def execute(self, group_id: uuid.UUID) -> Pet:
-        pet = self.repository.find_by_group_id(group_id)
+        pet = self.repository.apply_action(group_id, "play")
         if not pet:
             raise HTTPException(status_code=404, detail="Pet not found for this group")
-        
-        pet.play()
-        return self.repository.update(pet)
+        return pet
 
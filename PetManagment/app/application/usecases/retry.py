@@ -0,0 +1,20 @@
+from typing import Callable, TypeVar
+from fastapi import HTTPException
+from app.adapter.metrics import PET_UPDATE_CONFLICTS, PET_UPDATE_RETRIES
+from app.domain.repositories.pet_repository import PetVersionConflictError
+
+T = TypeVar("T")
+
+MAX_ATTEMPTS = 3
+
+
+def retry_on_conflict(operation: Callable[[], T], attempts: int = MAX_ATTEMPTS) -> T:
+    """Runs a read-modify-write operation, re-reading and retrying on version conflicts."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except PetVersionConflictError:
+            PET_UPDATE_CONFLICTS.inc()
+            if attempt == attempts:
+                raise HTTPException(status_code=409, detail="Pet was modified concurrently, please retry")
+            PET_UPDATE_RETRIES.inc()
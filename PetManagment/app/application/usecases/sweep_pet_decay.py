@@ -0,0 +1,26 @@
+from app.domain.repositories.pet_repository import PetRepository
+from datetime import datetime, timedelta, timezone
+import time
+
+class SweepPetDecayUseCase:
+    def __init__(self, repository: PetRepository):
+        self.repository = repository
+
+    def execute(self, chunk_size: int, min_idle: timedelta) -> tuple[int, float]:
+        """Persists decay for every pet idle for at least `min_idle`.
+
+        Returns the number of pets swept and the elapsed time in seconds.
+        """
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        # Pets written recently are skipped: their decay is still small enough
+        # that rounding it away on every tick would stall it completely.
+        idle_before = now - min_idle
+
+        total, after_id = 0, None
+        while True:
+            swept, after_id = self.repository.sweep_decay(after_id, chunk_size, idle_before, now)
+            total += swept
+            if after_id is None:
+                break
+        return total, time.perf_counter() - started
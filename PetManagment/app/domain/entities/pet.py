@@ -1,4 +1,5 @@
 import uuid
+from math import isqrt
 from enum import Enum
 from dataclasses import dataclass
 from datetime import datetime
@@ -9,6 +10,19 @@ class PetType(str, Enum):
     DRAGON = "dragon"
     DUCK = "duck"
 
+XP_PER_LEVEL = 50
+
+
+def xp_to_reach(level: int) -> int:
+    """Cumulative XP needed to reach `level`: leaving level L costs L * XP_PER_LEVEL."""
+    return XP_PER_LEVEL * level * (level - 1) // 2
+
+
+def level_for_total_xp(total_xp: int) -> int:
+    # Largest L with XP_PER_LEVEL * L * (L - 1) / 2 <= total_xp, i.e.
+    # (2L - 1)^2 <= 4m + 1 with m = floor(2 * total_xp / XP_PER_LEVEL)
+    return (isqrt(4 * (2 * total_xp // XP_PER_LEVEL) + 1) + 1) // 2
+
 @dataclass
 class Pet:
     id: uuid.UUID
@@ -22,26 +36,46 @@ class Pet:
     health_level: int = 100
     happiness_level: int = 100
     created_at: datetime = datetime.now()
+    last_updated: datetime | None = None
+    version: int = 0
+    # Epoch seconds at which a decaying stat reaches the care reminder threshold
+    care_due: float | None = None
 
     def feed(self):
-        self.hunger_level = min(100, self.hunger_level + 10)
-        self.gain_xp(10)
+        self.apply_action("feed")
 
     def clean(self):
-        self.hygiene_level = min(100, self.hygiene_level + 10)
-        self.gain_xp(10)
+        self.apply_action("clean")
 
     def play(self):
-        self.happiness_level = min(100, self.happiness_level + 10)
-        self.health_level = min(100, self.health_level + 5)
-        self.gain_xp(10)
+        self.apply_action("play")
+
+    def apply_action(self, action: str):
+        from app.domain.entities.pet_policy import policy_for
+        policy = policy_for(self.type)
+        for stat, amount in policy.action_effects[action]:
+            setattr(self, stat, min(100, getattr(self, stat) + amount))
+        self.gain_xp(policy.action_xp)
 
     def update_name(self, new_name: str):
         self.name = new_name
 
+    def set_stats(self, hunger_level: int = None, hygiene_level: int = None,
+                  health_level: int = None, happiness_level: int = None):
+        if hunger_level is not None:
+            self.hunger_level = max(0, min(100, hunger_level))
+        if hygiene_level is not None:
+            self.hygiene_level = max(0, min(100, hygiene_level))
+        if health_level is not None:
+            self.health_level = max(0, min(100, health_level))
+        if happiness_level is not None:
+            self.happiness_level = max(0, min(100, happiness_level))
+
+    @property
+    def total_xp(self) -> int:
+        return xp_to_reach(self.level) + self.xp
+
     def gain_xp(self, amount: int):
-        self.xp += amount
-        # Simple level up logic
-        while self.xp >= self.level * 50:
-            self.xp -= self.level * 50
-            self.level += 1
\ No newline at end of file
+        total = self.total_xp + amount
+        self.level = level_for_total_xp(total)
+        self.xp = total - xp_to_reach(self.level)
\ No newline at end of file
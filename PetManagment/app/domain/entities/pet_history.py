@@ -0,0 +1,35 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict
+
+# Stats recorded in every snapshot and summarised in every rollup bucket
+HISTORY_STATS = ("hunger_level", "hygiene_level", "health_level", "happiness_level")
+
+# Tiers from finest to coarsest; "raw" holds one point per mutation
+RESOLUTIONS = ("raw", "hour", "day")
+BUCKET_WIDTHS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# How far back each tier is kept; daily buckets are kept forever
+RAW_RETENTION = timedelta(days=float(os.getenv("PET_HISTORY_RAW_RETENTION_DAYS", "7")))
+HOURLY_RETENTION = timedelta(days=float(os.getenv("PET_HISTORY_HOURLY_RETENTION_DAYS", "90")))
+
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    if resolution == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class StatSummary:
+    minimum: int
+    average: float
+    maximum: int
+
+
+@dataclass
+class PetStatBucket:
+    start: datetime
+    samples: int
+    stats: Dict[str, StatSummary]
@@ -0,0 +1,91 @@
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple
+from app.domain.entities.pet import PetType
+
+# Stats that go down over time, in the order used by `PetPolicy.decay_per_hour`
+DECAYING_STATS = ("hunger_level", "hygiene_level", "health_level")
+ACTIONS = ("feed", "clean", "play")
+
+@dataclass(frozen=True)
+class PetPolicy:
+    """Decay and reward tuning of one pet type, compiled once at startup."""
+    decay_per_hour: Tuple[float, float, float]
+    # action -> ((stat, increment), ...)
+    action_effects: Mapping[str, Tuple[Tuple[str, int], ...]]
+    action_xp: int
+
+    def to_dict(self) -> dict:
+        return {
+            "decay_per_hour": dict(zip(DECAYING_STATS, self.decay_per_hour)),
+            "actions": {action: dict(effects) for action, effects in self.action_effects.items()},
+            "action_xp": self.action_xp,
+        }
+
+
+# Every type shares the same tuning for now; override per type with PET_POLICY_FILE
+_DEFAULT_POLICY = {
+    "decay_per_hour": {"hunger_level": 8, "hygiene_level": 6, "health_level": 4},
+    "actions": {
+        "feed": {"hunger_level": 10},
+        "clean": {"hygiene_level": 10},
+        "play": {"happiness_level": 10, "health_level": 5},
+    },
+    "action_xp": 10,
+}
+
+
+def _compile(raw: dict) -> PetPolicy:
+    return PetPolicy(
+        decay_per_hour=tuple(float(raw["decay_per_hour"][stat]) for stat in DECAYING_STATS),
+        action_effects=MappingProxyType({
+            action: tuple((stat, int(amount)) for stat, amount in raw["actions"][action].items())
+            for action in ACTIONS
+        }),
+        action_xp=int(raw["action_xp"]),
+    )
+
+
+def _load_policies() -> Mapping[PetType, PetPolicy]:
+    # PET_POLICY_FILE may hold {"<type>": {...partial policy...}} to tune single types
+    overrides = {}
+    path = os.getenv("PET_POLICY_FILE")
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+
+    policies = {}
+    for pet_type in PetType:
+        raw = {key: (dict(value) if isinstance(value, dict) else value) for key, value in _DEFAULT_POLICY.items()}
+        for key, value in overrides.get(pet_type.value, {}).items():
+            raw[key] = {**raw[key], **value} if isinstance(value, dict) else value
+        policies[pet_type] = _compile(raw)
+    return MappingProxyType(policies)
+
+
+PET_POLICIES = _load_policies()
+
+
+def policy_for(pet_type) -> PetPolicy:
+    """Accepts the domain PetType, the ORM PetType or its plain string value."""
+    return PET_POLICIES[PetType(getattr(pet_type, "value", pet_type))]
+
+
+# Groups are reminded when a decaying stat is about to reach this level
+CARE_REMINDER_THRESHOLD = int(os.getenv("PET_CARE_REMINDER_THRESHOLD", "30"))
+
+
+def hours_until_care(pet_type, levels: Mapping[str, int]) -> float | None:
+    """Hours until the first decaying stat reaches CARE_REMINDER_THRESHOLD.
+
+    0 when one already has, None when no stat of this type decays at all.
+    """
+    policy = policy_for(pet_type)
+    hours = [
+        max(0.0, (levels[stat] - CARE_REMINDER_THRESHOLD) / rate)
+        for stat, rate in zip(DECAYING_STATS, policy.decay_per_hour)
+        if rate > 0
+    ]
+    return min(hours, default=None)
@@ -0,0 +1,8 @@
+import uuid
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class XpGrant:
+    idempotency_key: str
+    group_id: uuid.UUID
+    amount: int
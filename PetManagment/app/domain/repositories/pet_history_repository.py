@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from app.domain.entities.pet_history import PetStatBucket
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+
+class PetHistoryRepository(ABC):
+    @abstractmethod
+    def find_buckets(self, pet_id: uuid.UUID, resolution: str, start: datetime, end: datetime,
+                     limit: int) -> List[PetStatBucket]:
+        """Points of one pet in [start, end), oldest first, at the given resolution; at most `limit` of them."""
+        pass
+
+    @abstractmethod
+    def compact(self, now: datetime) -> Dict[str, int]:
+        """Rolls every finished hour and day up into its tier; returns the buckets written per tier."""
+        pass
+
+    @abstractmethod
+    def prune(self, raw_before: datetime, hourly_before: datetime) -> int:
+        """Deletes snapshots and hourly buckets older than the given bounds that were already rolled up."""
+        pass
@@ -1,6 +1,18 @@
 from abc import ABC, abstractmethod
 from app.domain.entities.pet import Pet
+from app.domain.entities.xp_grant import XpGrant
 import uuid
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+
+class PetVersionConflictError(Exception):
+    """Raised when a pet changed in the database since it was read."""
+
+    def __init__(self, pet_id: uuid.UUID):
+        super().__init__(f"Pet {pet_id} was modified concurrently")
+        self.pet_id = pet_id
+
 
 class PetRepository(ABC):
     @abstractmethod
@@ -9,12 +21,55 @@ class PetRepository(ABC):
 
     @abstractmethod
     def update(self, pet: Pet) -> Pet:
+        """Saves the pet if its version is still current, else raises PetVersionConflictError."""
+        pass
+
+    @abstractmethod
+    def apply_action(self, group_id: uuid.UUID, action: str) -> Pet | None:
+        """Applies decay plus a care action atomically and returns the stored pet."""
+        pass
+
+    @abstractmethod
+    def grant_xp(self, grants: List[XpGrant]) -> Tuple[Set[str], Dict[uuid.UUID, Pet]]:
+        """Applies grants whose key was never seen, in one transaction.
+
+        Returns the accepted keys and the current pets of every group in the batch.
+        Grants for groups without a pet are ignored and their keys are not recorded.
+        """
         pass
 
     @abstractmethod
     def find_by_group_id(self, group_id: uuid.UUID) -> Pet | None:
         pass
 
+    @abstractmethod
+    def find_version_by_group_id(self, group_id: uuid.UUID) -> Tuple[int, datetime | None] | None:
+        pass
+
+    @abstractmethod
+    def find_by_group_ids(self, group_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Pet]:
+        pass
+
+    @abstractmethod
+    def sweep_decay(self, after_id: uuid.UUID | None, limit: int, idle_before: datetime,
+                    now: datetime) -> Tuple[int, uuid.UUID | None]:
+        pass
+
+    @abstractmethod
+    def find_leaderboard(self, after: Tuple[int, int, uuid.UUID] | None, limit: int) -> List[Pet]:
+        """Pets ordered by level, xp and id, all descending, starting after the given key."""
+        pass
+
+    @abstractmethod
+    def find_rank(self, pet: Pet) -> int:
+        """1 + the number of pets with a strictly higher (level, xp)."""
+        pass
+
+    @abstractmethod
+    def find_care_due(self, after: float, until: float) -> List[Tuple[float, uuid.UUID, uuid.UUID]]:
+        """(care_due, pet_id, group_id) of pets whose care reminder falls in (after, until]."""
+        pass
+
     @abstractmethod
     def find_one(self) -> Pet | None:
         pass
@@ -1,40 +1,41 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, List
+import asyncio
+import os
 import uuid
-from app.adapter.db.database import get_db
-from app.adapter.db.pet_repository_sql import SQLPetRepository
-from app.application.dto.pet_dto import PetCreateDTO, PetResponseDTO, PetNameUpdateDTO, PetStatsUpdateDTO
+from datetime import datetime, timezone
+from app.adapter.db.database import SessionLocal
+from app.adapter.events.broker import PetEventBroker, format_sse
+from app.adapter.db.pet_repository_sql import SQLPetRepository, hours_since
+from app.adapter.db.cached_pet_repository import CachedSQLPetRepository
+from app.adapter.db.pet_history_repository_sql import SQLPetHistoryRepository
+from app.adapter.db.session_runner import SessionRunner
+from app.adapter.http.conditional import not_modified, set_validators, weak_etag
+from app.adapter.http.singleflight import AsyncSingleFlight
+from app.application.dto.pet_dto import (
+    PetCreateDTO, PetResponseDTO, PetNameUpdateDTO, PetStatsUpdateDTO, PetGroupsQueryDTO, PetPolicyDTO,
+    PetActionsDTO, PetActionsResponseDTO, PetHistoryDTO, PetHistoryPointDTO, StatSummaryDTO,
+    LeaderboardEntryDTO, LeaderboardPageDTO, XpGrantBatchDTO, XpGrantBatchResponseDTO, XpGrantResultDTO
+)
+from app.domain.entities.pet import Pet, PetType, XP_PER_LEVEL
+from app.domain.entities.pet_policy import PET_POLICIES
+from app.domain.entities.xp_grant import XpGrant
 from app.application.usecases.create_pet import CreatePetUseCase
 from app.application.usecases.get_group_pet import GetGroupPetUseCase
+from app.application.usecases.get_group_pets import GetGroupPetsUseCase
+from app.application.usecases.get_pet_history import GetPetHistoryUseCase
+from app.application.usecases.get_leaderboard import GetLeaderboardUseCase
+from app.application.usecases.get_pet_rank import GetPetRankUseCase
 from app.application.usecases.feed_pet import FeedPetUseCase
 from app.application.usecases.clean_pet import CleanPetUseCase
 from app.application.usecases.play_pet import PlayPetUseCase
 from app.application.usecases.name_pet import NamePetUseCase
 from app.application.usecases.update_pet_stats import UpdatePetStatsUseCase
+from app.application.usecases.apply_pet_actions import ApplyPetActionsUseCase
+from app.application.usecases.grant_xp import GrantXpUseCase
 
-router = APIRouter()
-
-@router.post(
-    "/", 
-    response_model=PetResponseDTO,
-    summary="Create a new pet",
-    description="Creates a new pet for a specific group."
-)
-def create_pet(pet_data: PetCreateDTO, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = CreatePetUseCase(repo)
-    return use_case.execute(pet_data)
-
-@router.get(
-    "/group/{group_id}", 
-    response_model=PetResponseDTO,
-    summary="Get group pet",
-    description="Obtains data from the pet belonging to the specified group."
-)
-def get_group_pet(group_id: uuid.UUID, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = GetGroupPetUseCase(repo)
-    pet = use_case.execute(group_id)
+def _to_response(pet: Pet) -> PetResponseDTO:
     return PetResponseDTO(
         id=pet.id,
         name=pet.name,
@@ -47,118 +48,307 @@ def get_group_pet(group_id: uuid.UUID, db: Session = Depends(get_db)):
         xp=pet.xp
     )
 
-@router.post(
-    "/{group_id}/feed", 
-    response_model=PetResponseDTO,
-    summary="Feed the pet",
-    description="Feeds the pet of the specified group."
-)
-def feed_pet(group_id: uuid.UUID, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = FeedPetUseCase(repo)
-    pet = use_case.execute(group_id)
-    return PetResponseDTO(
-        id=pet.id,
+def _to_leaderboard_entry(rank: int, pet: Pet) -> LeaderboardEntryDTO:
+    return LeaderboardEntryDTO(
+        rank=rank,
+        group_id=pet.group_id,
+        pet_id=pet.id,
         name=pet.name,
         type=pet.type,
-        health_level=pet.health_level,
-        happiness_level=pet.happiness_level,
-        hunger_level=pet.hunger_level,
-        hygiene_level=pet.hygiene_level,
         level=pet.level,
-        xp=pet.xp
+        xp=pet.xp,
     )
 
-@router.post(
-    "/{group_id}/clean", 
-    response_model=PetResponseDTO,
-    summary="Clean the pet",
-    description="Cleans the pet of the specified group."
-)
-def clean_pet(group_id: uuid.UUID, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = CleanPetUseCase(repo)
-    pet = use_case.execute(group_id)
-    return PetResponseDTO(
-        id=pet.id,
-        name=pet.name,
-        type=pet.type,
-        health_level=pet.health_level,
-        happiness_level=pet.happiness_level,
-        hunger_level=pet.hunger_level,
-        hygiene_level=pet.hygiene_level,
-        level=pet.level,
-        xp=pet.xp
+def _snapshot(repo: SQLPetRepository, group_id: uuid.UUID) -> dict | None:
+    pet = repo.find_by_group_id(group_id)
+    return _to_response(pet).model_dump(mode="json") if pet else None
+
+def _load_snapshot(group_id: uuid.UUID) -> dict | None:
+    db = SessionLocal()
+    try:
+        return _snapshot(CachedSQLPetRepository(db), group_id)
+    finally:
+        db.close()
+
+# Projected decay changes the body without a write, so the pet ETag also
+# changes every PET_ETAG_DECAY_WINDOW_SECONDS since the last write.
+PET_ETAG_DECAY_WINDOW_SECONDS = 60
+
+def _pet_etag(repo: SQLPetRepository, group_id: uuid.UUID) -> str | None:
+    stamp = repo.find_version_by_group_id(group_id)
+    if stamp is None:
+        return None
+    version, last_updated = stamp
+    elapsed = hours_since(last_updated, datetime.now(timezone.utc)) * 3600
+    return weak_etag(group_id, version, int(elapsed // PET_ETAG_DECAY_WINDOW_SECONDS))
+
+# Seconds between decay snapshots pushed to open event streams
+PET_EVENTS_TICK_SECONDS = float(os.getenv("PET_EVENTS_TICK_SECONDS", "60"))
+PET_EVENTS_KEEPALIVE_SECONDS = 15.0
+
+pet_events = PetEventBroker(_load_snapshot, tick_seconds=PET_EVENTS_TICK_SECONDS)
+
+# Members of an active group all poll the same pet at once
+pet_reads = AsyncSingleFlight("pet_by_group")
+
+def _publish(group_id: uuid.UUID, pet: Pet) -> PetResponseDTO:
+    response = _to_response(pet)
+    pet_events.publish(group_id, response.model_dump(mode="json"))
+    return response
+
+def get_pet_router(runner: SessionRunner) -> APIRouter:
+    """The /pet routes. Use cases and repositories are sync; `runner` runs them on
+    the sync engine's threadpool or on the asyncio engine (DATABASE_ASYNC)."""
+    router = APIRouter()
+
+    @router.post(
+        "/", 
+        response_model=PetResponseDTO,
+        summary="Create a new pet",
+        description="Creates a new pet for a specific group."
     )
+    async def create_pet(pet_data: PetCreateDTO):
+        return await runner.run(lambda db: CreatePetUseCase(CachedSQLPetRepository(db)).execute(pet_data))
 
-@router.post(
-    "/{group_id}/play",
-    response_model=PetResponseDTO,
-    summary="Play with the pet",
-    description="Increases happiness (and optionally health) for the pet of the specified group."
-)
-def play_pet(group_id: uuid.UUID, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = PlayPetUseCase(repo)
-    pet = use_case.execute(group_id)
-    return PetResponseDTO(
-        id=pet.id,
-        name=pet.name,
-        type=pet.type,
-        health_level=pet.health_level,
-        happiness_level=pet.happiness_level,
-        hunger_level=pet.hunger_level,
-        hygiene_level=pet.hygiene_level,
-        level=pet.level,
-        xp=pet.xp
+    @router.get(
+        "/group/{group_id}", 
+        response_model=PetResponseDTO,
+        summary="Get group pet",
+        description="Obtains data from the pet belonging to the specified group."
     )
+    async def get_group_pet(group_id: uuid.UUID, request: Request, response: Response):
+        etag = await runner.run(lambda db: _pet_etag(CachedSQLPetRepository(db), group_id))
+        if etag and (cached := not_modified(request, etag)):
+            return cached
 
-@router.put(
-    "/{group_id}/name", 
-    response_model=PetResponseDTO,
-    summary="Update pet name",
-    description="Updates the name of the pet for the specified group."
-)
-def name_pet(group_id: uuid.UUID, data: PetNameUpdateDTO, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = NamePetUseCase(repo)
-    pet = use_case.execute(group_id, data.name)
-    return PetResponseDTO(
-        id=pet.id,
-        name=pet.name,
-        type=pet.type,
-        health_level=pet.health_level,
-        happiness_level=pet.happiness_level,
-        hunger_level=pet.hunger_level,
-        hygiene_level=pet.hygiene_level,
-        level=pet.level,
-        xp=pet.xp
+        def load(db) -> PetResponseDTO:
+            return _to_response(GetGroupPetUseCase(CachedSQLPetRepository(db)).execute(group_id))
+
+        # Each run opens its own session, so the shared load does not depend on the
+        # request that started it staying connected. Only callers that saw the same
+        # version share it: one that read the ETag after a write must not get a body
+        # loaded before it under the new validator.
+        body = await pet_reads.do((group_id, etag), lambda: runner.run(load))
+        if etag:
+            set_validators(response, etag)
+        return body
+
+    @router.get(
+        "/group/{group_id}/history",
+        response_model=PetHistoryDTO,
+        summary="Get the stat history of a group's pet",
+        description="Min/avg/max of each stat over time. Without a resolution the finest tier that still covers the range is used: raw snapshots up to a day, hourly buckets up to a month, daily buckets beyond. A range holding more than 1000 points at that tier moves to the next coarser one; with an explicit resolution it is refused with 400."
     )
+    async def get_group_pet_history(
+        group_id: uuid.UUID,
+        start: datetime | None = Query(None, alias="from"),
+        end: datetime | None = Query(None, alias="to"),
+        resolution: str | None = Query(None, description="raw, hour or day"),
+    ):
+        def load(db):
+            use_case = GetPetHistoryUseCase(CachedSQLPetRepository(db), SQLPetHistoryRepository(db))
+            return use_case.execute(group_id, start, end, resolution)
 
-@router.patch(
-    "/{group_id}/stats",
-    response_model=PetResponseDTO,
-    summary="Update pet statistics",
-    description="Updates the statistics (hunger, hygiene, health, happiness) of the pet for the specified group."
-)
-def update_pet_stats(group_id: uuid.UUID, data: PetStatsUpdateDTO, db: Session = Depends(get_db)):
-    repo = SQLPetRepository(db)
-    use_case = UpdatePetStatsUseCase(repo)
-    pet = use_case.execute(
-        group_id,
-        hunger_level=data.hunger_level,
-        hygiene_level=data.hygiene_level,
-        health_level=data.health_level,
-        happiness_level=data.happiness_level
+        resolution, buckets = await runner.run(load)
+        return PetHistoryDTO(
+            resolution=resolution,
+            points=[
+                PetHistoryPointDTO(
+                    start=bucket.start,
+                    samples=bucket.samples,
+                    stats={
+                        stat: StatSummaryDTO(min=summary.minimum, avg=summary.average, max=summary.maximum)
+                        for stat, summary in bucket.stats.items()
+                    },
+                )
+                for bucket in buckets
+            ],
+        )
+
+    @router.get(
+        "/group/{group_id}/rank",
+        response_model=LeaderboardEntryDTO,
+        summary="Get the leaderboard rank of a group's pet",
+        description="Rank of the pet by level and XP across all groups; pets with the same level and XP share a rank."
     )
-    return PetResponseDTO(
-        id=pet.id,
-        name=pet.name,
-        type=pet.type,
-        health_level=pet.health_level,
-        happiness_level=pet.happiness_level,
-        hunger_level=pet.hunger_level,
-        hygiene_level=pet.hygiene_level,
-        level=pet.level,
-        xp=pet.xp
+    async def get_group_pet_rank(group_id: uuid.UUID):
+        rank, pet = await runner.run(lambda db: GetPetRankUseCase(CachedSQLPetRepository(db)).execute(group_id))
+        return _to_leaderboard_entry(rank, pet)
+
+    @router.get(
+        "/leaderboard",
+        response_model=LeaderboardPageDTO,
+        summary="Get the pet leaderboard",
+        description="Pets of every group ranked by level and XP. Pass next_cursor back as cursor to read the following page."
+    )
+    async def get_leaderboard(limit: int = Query(20), cursor: str | None = Query(None)):
+        entries, next_cursor = await runner.run(
+            lambda db: GetLeaderboardUseCase(CachedSQLPetRepository(db)).execute(limit, cursor)
+        )
+        return LeaderboardPageDTO(
+            entries=[_to_leaderboard_entry(rank, pet) for rank, pet in entries],
+            next_cursor=next_cursor,
+        )
+
+    @router.get(
+        "/policy",
+        response_model=Dict[PetType, PetPolicyDTO],
+        summary="Get the decay and reward policy",
+        description="Decay rates per hour, action increments and XP for every pet type. It only changes on deploy, so clients may cache it."
+    )
+    def get_pet_policy(response: Response):
+        response.headers["Cache-Control"] = "public, max-age=3600"
+        return {
+            pet_type: PetPolicyDTO(**policy.to_dict(), xp_per_level=XP_PER_LEVEL)
+            for pet_type, policy in PET_POLICIES.items()
+        }
+
+    @router.get(
+        "/groups",
+        response_model=Dict[uuid.UUID, PetResponseDTO],
+        summary="Get the pets of several groups",
+        description="Obtains the pets of all the given groups in one query, keyed by group id. Groups without a pet are omitted."
+    )
+    async def get_groups_pets(ids: List[uuid.UUID] = Query(...)):
+        pets = await runner.run(lambda db: GetGroupPetsUseCase(CachedSQLPetRepository(db)).execute(ids))
+        return {group_id: _to_response(pet) for group_id, pet in pets.items()}
+
+    @router.post(
+        "/groups",
+        response_model=Dict[uuid.UUID, PetResponseDTO],
+        summary="Get the pets of several groups (long lists)",
+        description="Same as GET /groups but takes the group ids in the body, for lists too long for a query string."
+    )
+    async def query_groups_pets(data: PetGroupsQueryDTO):
+        pets = await runner.run(lambda db: GetGroupPetsUseCase(CachedSQLPetRepository(db)).execute(data.group_ids))
+        return {group_id: _to_response(pet) for group_id, pet in pets.items()}
+
+    @router.get(
+        "/group/{group_id}/events",
+        summary="Stream group pet state",
+        description="Server-Sent Events stream of the group's pet. Sends the current state on connect, then a `pet` event after every change and periodically as it decays."
+    )
+    async def stream_group_pet(group_id: uuid.UUID, request: Request):
+        # The runner closes its session before streaming starts: one held for the life
+        # of the stream would keep a pooled connection checked out per subscriber
+        snapshot = await runner.run(lambda db: _snapshot(CachedSQLPetRepository(db), group_id))
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Pet not found for this group")
+
+        async def event_stream():
+            queue = pet_events.subscribe(group_id)
+            try:
+                yield format_sse("pet", snapshot)
+                while not await request.is_disconnected():
+                    try:
+                        yield await asyncio.wait_for(queue.get(), timeout=PET_EVENTS_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+            finally:
+                pet_events.unsubscribe(group_id, queue)
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @router.post(
+        "/{group_id}/feed", 
+        response_model=PetResponseDTO,
+        summary="Feed the pet",
+        description="Feeds the pet of the specified group."
+    )
+    async def feed_pet(group_id: uuid.UUID):
+        pet = await runner.run(lambda db: FeedPetUseCase(CachedSQLPetRepository(db)).execute(group_id))
+        return _publish(group_id, pet)
+
+    @router.post(
+        "/{group_id}/clean", 
+        response_model=PetResponseDTO,
+        summary="Clean the pet",
+        description="Cleans the pet of the specified group."
+    )
+    async def clean_pet(group_id: uuid.UUID):
+        pet = await runner.run(lambda db: CleanPetUseCase(CachedSQLPetRepository(db)).execute(group_id))
+        return _publish(group_id, pet)
+
+    @router.post(
+        "/{group_id}/play",
+        response_model=PetResponseDTO,
+        summary="Play with the pet",
+        description="Increases happiness (and optionally health) for the pet of the specified group."
+    )
+    async def play_pet(group_id: uuid.UUID):
+        pet = await runner.run(lambda db: PlayPetUseCase(CachedSQLPetRepository(db)).execute(group_id))
+        return _publish(group_id, pet)
+
+    @router.put(
+        "/{group_id}/name", 
+        response_model=PetResponseDTO,
+        summary="Update pet name",
+        description="Updates the name of the pet for the specified group."
+    )
+    async def name_pet(group_id: uuid.UUID, data: PetNameUpdateDTO):
+        pet = await runner.run(lambda db: NamePetUseCase(CachedSQLPetRepository(db)).execute(group_id, data.name))
+        return _publish(group_id, pet)
+
+    @router.patch(
+        "/{group_id}/stats",
+        response_model=PetResponseDTO,
+        summary="Update pet statistics",
+        description="Updates the statistics (hunger, hygiene, health, happiness) of the pet for the specified group."
+    )
+    async def update_pet_stats(group_id: uuid.UUID, data: PetStatsUpdateDTO):
+        def update(db) -> Pet:
+            use_case = UpdatePetStatsUseCase(CachedSQLPetRepository(db))
+            return use_case.execute(
+                group_id,
+                hunger_level=data.hunger_level,
+                hygiene_level=data.hygiene_level,
+                health_level=data.health_level,
+                happiness_level=data.happiness_level
+            )
+
+        pet = await runner.run(update)
+        return _publish(group_id, pet)
+
+    @router.post(
+        "/{group_id}/actions",
+        response_model=PetActionsResponseDTO,
+        summary="Apply several actions to the pet",
+        description="Applies an ordered list of actions (feed, clean, play, rename, stats) to the pet in a single update and returns the final state with the XP and levels each action granted."
+    )
+    async def apply_pet_actions(group_id: uuid.UUID, data: PetActionsDTO):
+        pet, results = await runner.run(
+            lambda db: ApplyPetActionsUseCase(CachedSQLPetRepository(db)).execute(group_id, data.actions)
+        )
+        return PetActionsResponseDTO(pet=_publish(group_id, pet), results=results)
+
+    @router.post(
+        "/xp-grants",
+        response_model=XpGrantBatchResponseDTO,
+        summary="Grant XP to many pets",
+        description="Applies a batch of XP grants in one transaction. Each grant carries an idempotency key; a key that was already applied is reported as duplicate and not applied again."
     )
+    async def grant_xp(data: XpGrantBatchDTO):
+        grants = [
+            XpGrant(idempotency_key=grant.idempotency_key, group_id=grant.group_id, amount=grant.amount)
+            for grant in data.grants
+        ]
+        outcomes, pets = await runner.run(lambda db: GrantXpUseCase(CachedSQLPetRepository(db)).execute(grants))
+
+        for group_id in {grant.group_id for grant, status in outcomes if status == "applied"}:
+            _publish(group_id, pets[group_id])
+        return XpGrantBatchResponseDTO(results=[
+            XpGrantResultDTO(
+                idempotency_key=grant.idempotency_key,
+                group_id=grant.group_id,
+                status=status,
+                level=pets[grant.group_id].level if grant.group_id in pets else None,
+                xp=pets[grant.group_id].xp if grant.group_id in pets else None,
+            )
+            for grant, status in outcomes
+        ])
+
+    return router
@@ -1,29 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
-from app.interface.http.routers import router
-from app.adapter.db.database import engine
+from app.interface.http.routers import get_pet_router, pet_events
+from app.adapter.db.database import DATABASE_ASYNC, engine
 from app.adapter.db import models
+from app.adapter.db.session_runner import AsyncSessionRunner, ThreadpoolSessionRunner
+from app.adapter.jobs.decay_sweep import SWEEP_INTERVAL_SECONDS, run_decay_sweep
+from app.adapter.jobs.history_compactor import COMPACT_INTERVAL_SECONDS, run_history_compactor
+from app.adapter.jobs.care_reminders import CARE_REMINDERS_ENABLED, run_care_reminders
 
 models.Base.metadata.create_all(bind=engine)
-app = FastAPI(docs_url=None, redoc_url="/docs")
-
-# Health check
-@app.get("/")
-def health_check():
-    return {"status": "ok"}
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
-
-Instrumentator().instrument(app).expose(app)
-app.include_router(router, prefix="/pet", tags=["Pets"])
\ No newline at end of file
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if SWEEP_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_decay_sweep()))
+    if COMPACT_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_history_compactor()))
+    if CARE_REMINDERS_ENABLED:
+        def notify(group_id, payload):
+            pet_events.publish(group_id, payload, event="care_reminder")
+        tasks.append(asyncio.create_task(run_care_reminders(notify)))
+    yield
+    for task in tasks:
+        task.cancel()
+
+def create_app(async_db: bool = DATABASE_ASYNC) -> FastAPI:
+    """Builds the API on the sync engine, or on the asyncio one when `async_db` is set."""
+    app = FastAPI(docs_url=None, redoc_url="/docs", lifespan=lifespan)
+
+    # Health check
+    @app.get("/")
+    def health_check():
+        return {"status": "ok"}
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
+
+    Instrumentator().instrument(app).expose(app)
+    runner = AsyncSessionRunner() if async_db else ThreadpoolSessionRunner()
+    app.include_router(get_pet_router(runner), prefix="/pet", tags=["Pets"])
+    return app
+
+app = create_app()
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""Pet population simulation and repository benchmark.
+
+Simulate a synthetic population under given action rates and report stat distributions:
+
+    python -m benchmarks.pet_simulation simulate --pets 1000000 --days 7 --feed-rate 0.3
+
+Measure the per-operation cost of SQLPetRepository against in-memory SQLite:
+
+    python -m benchmarks.pet_simulation bench --pets 20000 --ops 2000
+
+Both commands take --json to print machine-readable results for regression checks.
+"""
+import os
+
+# Importing the app builds the engine from DATABASE_URL; nothing here talks to it
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import argparse
+import json
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.adapter.cache.pet_cache import InMemoryPetCache
+from app.adapter.db.cached_pet_repository import CachedSQLPetRepository
+from app.adapter.db.database import Base
+from app.adapter.db.leaderboard_cache import LeaderboardCache
+from app.adapter.db.models import Pet as PetModel, PetType as PetTypeModel
+from app.adapter.db.pet_repository_sql import SQLPetRepository
+from app.adapter.events.care_schedule import CareSchedule
+from app.domain.entities.pet import XP_PER_LEVEL, PetType
+from app.domain.entities.pet_policy import ACTIONS, CARE_REMINDER_THRESHOLD, PET_POLICIES
+from app.domain.entities.xp_grant import XpGrant
+
+STATS = ("hunger_level", "hygiene_level", "health_level", "happiness_level")
+TYPES = list(PetType)
+
+
+@dataclass
+class ActionRates:
+    """Expected number of each action per pet per simulated hour."""
+    feed: float = 0.25
+    clean: float = 0.15
+    play: float = 0.2
+
+
+def levels_for_total_xp(total_xp: np.ndarray) -> np.ndarray:
+    """Vectorised `level_for_total_xp`; the float square root is corrected to the exact isqrt."""
+    radicand = 4 * (2 * total_xp // XP_PER_LEVEL) + 1
+    root = np.floor(np.sqrt(radicand)).astype(np.int64)
+    root -= root * root > radicand
+    root += (root + 1) * (root + 1) <= radicand
+    return (root + 1) // 2
+
+
+class PetPopulation:
+    """Stored pet rows as arrays, advanced with the repository's rules.
+
+    Like SQLPetRepository, decay is only persisted when a pet is written: it is
+    rounded and clamped from `last_updated`, then the action's increments apply.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.types = self.rng.integers(len(TYPES), size=size)
+        self.stats = np.full((size, len(STATS)), 100, dtype=np.int64)
+        self.last_updated = np.zeros(size)
+        self.total_xp = np.zeros(size, dtype=np.int64)
+        self.clock = 0.0
+
+        policies = [PET_POLICIES[pet_type] for pet_type in TYPES]
+        self.decay = np.array([policy.decay_per_hour for policy in policies], dtype=float)
+        self.effects = {
+            action: np.array([[dict(policy.action_effects[action]).get(stat, 0) for stat in STATS] for policy in policies])
+            for action in ACTIONS
+        }
+        self.action_xp = np.array([policy.action_xp for policy in policies], dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        return len(self.types)
+
+    def _decayed(self, index: np.ndarray) -> np.ndarray:
+        hours = self.clock - self.last_updated[index]
+        rates = self.decay[self.types[index]]
+        decayed = np.round(self.stats[index, :3] - rates * hours[:, None])
+        return np.clip(decayed, 0, 100).astype(np.int64)
+
+    def act(self, action: str, index: np.ndarray):
+        self.stats[index, :3] = self._decayed(index)
+        self.last_updated[index] = self.clock
+        self.stats[index] = np.minimum(100, self.stats[index] + self.effects[action][self.types[index]])
+        self.total_xp[index] += self.action_xp[self.types[index]]
+
+    def step(self, hours: float, rates: ActionRates):
+        """Advances the clock; each pet takes each action at most once per step."""
+        self.clock += hours
+        for action in ACTIONS:
+            chance = 1.0 - math.exp(-getattr(rates, action) * hours)
+            self.act(action, np.flatnonzero(self.rng.random(self.size) < chance))
+
+    def projected_stats(self) -> np.ndarray:
+        """What reads return now: decay projected without writing, as find_by_group_id does."""
+        projected = self.stats.copy()
+        projected[:, :3] = self._decayed(np.arange(self.size))
+        return projected
+
+    def report(self) -> dict:
+        stats = self.projected_stats()
+        levels = levels_for_total_xp(self.total_xp)
+        return {
+            "pets": self.size,
+            "hours": self.clock,
+            "stats": {
+                stat: {
+                    "mean": round(float(stats[:, column].mean()), 2),
+                    **{f"p{q}": int(np.percentile(stats[:, column], q)) for q in (5, 50, 95)},
+                    "below_care_threshold": round(float((stats[:, column] <= CARE_REMINDER_THRESHOLD).mean()), 4),
+                }
+                for column, stat in enumerate(STATS)
+            },
+            "level": {
+                "mean": round(float(levels.mean()), 2),
+                "p50": int(np.percentile(levels, 50)),
+                "p95": int(np.percentile(levels, 95)),
+                "max": int(levels.max()),
+            },
+        }
+
+
+def simulate(pets: int, days: float, step_hours: float, rates: ActionRates, seed: int = 0) -> dict:
+    population = PetPopulation(pets, seed)
+    started = time.perf_counter()
+    for _ in range(int(round(days * 24 / step_hours))):
+        population.step(step_hours, rates)
+    report = population.report()
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def _time(operation: Callable[[int], object], count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def benchmark_repository(pets: int, ops: int, seed: int = 0) -> Dict[str, float]:
+    """Mean microseconds per repository operation against an in-memory SQLite database."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = np.random.default_rng(seed)
+
+    now = datetime.now(timezone.utc)
+    group_ids = [uuid.uuid4() for _ in range(pets)]
+    db.execute(insert(PetModel), [
+        {
+            "id": uuid.uuid4(),
+            "group_id": group_id,
+            "name": f"pet-{i}",
+            "type": PetTypeModel(TYPES[rng.integers(len(TYPES))].value),
+            "last_updated": now - timedelta(hours=float(rng.uniform(0, 48))),
+            "version": 0,
+        }
+        for i, group_id in enumerate(group_ids)
+    ])
+    db.commit()
+
+    # Private caches, so the benchmark neither reads nor pollutes the process-wide ones
+    repo = SQLPetRepository(db, leaderboard=LeaderboardCache(), care_reminders=CareSchedule())
+    cached = CachedSQLPetRepository(db, cache=InMemoryPetCache(max_entries=pets, ttl_seconds=3600),
+                                    leaderboard=LeaderboardCache())
+    picks = rng.integers(pets, size=ops)
+
+    def pick(i: int) -> uuid.UUID:
+        return group_ids[picks[i]]
+
+    def rename(i: int):
+        pet = repo.find_by_group_id(pick(i))
+        pet.update_name(f"renamed-{i}")
+        repo.update(pet)
+
+    batch = max(1, ops // 20)
+    results = {
+        "find_by_group_id": _time(lambda i: repo.find_by_group_id(pick(i)), ops),
+        "find_by_group_id (cached, warm)": _time(lambda i: cached.find_by_group_id(group_ids[i % 100]), ops),
+        "find_by_group_ids (100 groups)": _time(
+            lambda i: repo.find_by_group_ids([pick((i * 100 + j) % ops) for j in range(100)]), batch
+        ),
+        "apply_action (feed)": _time(lambda i: repo.apply_action(pick(i), "feed"), ops),
+        "update (rename)": _time(rename, ops),
+        "grant_xp (1 grant)": _time(lambda i: repo.grant_xp([XpGrant(uuid.uuid4().hex, pick(i), 10)]), ops),
+    }
+    # Per pet, over whole chunks; every pet counts as idle
+    chunk = min(1000, pets)
+    sweeps = max(1, min(10, pets // chunk))
+    after = None
+    started = time.perf_counter()
+    for _ in range(sweeps):
+        _, after = repo.sweep_decay(after, chunk, now + timedelta(days=1), now + timedelta(hours=1))
+    results[f"sweep_decay (per pet, chunks of {chunk})"] = (time.perf_counter() - started) / (sweeps * chunk) * 1e6
+
+    db.close()
+    engine.dispose()
+    return {name: round(micros, 1) for name, micros in results.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sim = commands.add_parser("simulate", help="advance a synthetic population and report stat distributions")
+    sim.add_argument("--pets", type=int, default=100_000)
+    sim.add_argument("--days", type=float, default=7)
+    sim.add_argument("--step-hours", type=float, default=1)
+    sim.add_argument("--feed-rate", type=float, default=ActionRates.feed)
+    sim.add_argument("--clean-rate", type=float, default=ActionRates.clean)
+    sim.add_argument("--play-rate", type=float, default=ActionRates.play)
+    sim.add_argument("--seed", type=int, default=0)
+    sim.add_argument("--json", action="store_true")
+
+    bench = commands.add_parser("bench", help="time repository operations on in-memory SQLite")
+    bench.add_argument("--pets", type=int, default=10_000)
+    bench.add_argument("--ops", type=int, default=1000)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--json", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "simulate":
+        rates = ActionRates(feed=args.feed_rate, clean=args.clean_rate, play=args.play_rate)
+        result = simulate(args.pets, args.days, args.step_hours, rates, args.seed)
+        if args.json:
+            print(json.dumps(result))
+            return
+        print(f"{result['pets']} pets over {result['hours']:.0f}h in {result['elapsed_seconds']}s")
+        print(f"{'stat':<16}{'mean':>8}{'p5':>6}{'p50':>6}{'p95':>6}{'<=care':>9}")
+        for stat, summary in result["stats"].items():
+            print(f"{stat:<16}{summary['mean']:>8}{summary['p5']:>6}{summary['p50']:>6}{summary['p95']:>6}"
+                  f"{summary['below_care_threshold']:>9.1%}")
+        level = result["level"]
+        print(f"level mean {level['mean']}, p50 {level['p50']}, p95 {level['p95']}, max {level['max']}")
+    else:
+        result = benchmark_repository(args.pets, args.ops, args.seed)
+        if args.json:
+            print(json.dumps(result))
+            return
+        for name, micros in result.items():
+            print(f"{name:<44}{micros:>10.1f} us/op")
+
+
+if __name__ == "__main__":
+    main()
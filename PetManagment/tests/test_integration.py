@@ -1,45 +1,53 @@
+import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 import uuid
 
-from app.main import app
-from app.adapter.db.database import get_db, Base
+from app.main import app, create_app
+from app.adapter.db.database import AsyncSessionLocal, SessionLocal, async_database_url, Base
+from app.adapter.db.leaderboard_cache import leaderboard_cache
+from app.adapter.cache.pet_cache import pet_cache
 
-# Setup in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# SQLite database file shared by the sync and the async (aiosqlite) engine, so both
+# route stacks run the same tests and direct writes below are seen by either
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pets.db')}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Each TestClient request runs on its own event loop, so async connections are not pooled
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
 
-# Dependency override
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Routes and jobs open their own sessions, so point the app's session factories at the test database
+SessionLocal.configure(bind=engine)
+AsyncSessionLocal.configure(bind=async_engine)
 
 @pytest.fixture(autouse=True)
 def setup_db():
     Base.metadata.create_all(bind=engine)
+    leaderboard_cache.clear()
+    pet_cache.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
-app.dependency_overrides[get_db] = override_get_db
-
-# Reset root_path for testing to avoid 404s if it's set in main.py
-app.root_path = ""
+apps = {"sync": app, "async": create_app(async_db=True)}
+for api in apps.values():
+    # Reset root_path for testing to avoid 404s if it's set in main.py
+    api.root_path = ""
 
-client = TestClient(app)
+@pytest.fixture(params=list(apps))
+def client(request):
+    """Every test runs against the sync routes and the async (DATABASE_ASYNC) ones."""
+    return TestClient(apps[request.param])
 
-def test_create_pet():
+def test_create_pet(client):
     group_id = str(uuid.uuid4())
     payload = {
         "group_id": group_id,
@@ -60,7 +68,7 @@ def test_create_pet():
     assert data["type"] == "dog"
     assert "id" in data
 
-def test_get_group_pet():
+def test_get_group_pet(client):
     # First create a pet
     group_id = str(uuid.uuid4())
     payload = {
@@ -79,3 +87,417 @@ def test_get_group_pet():
     assert data["name"] == "Mittens"
     assert data["type"] == "cat"
 
+
+def test_get_group_pet_projects_decay_without_writing(client):
+    from datetime import datetime, timedelta, timezone
+    from app.adapter.db.models import Pet as PetModel
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+
+    two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
+    db = TestingSessionLocal()
+    model = db.query(PetModel).filter(PetModel.group_id == uuid.UUID(group_id)).first()
+    model.last_updated = two_hours_ago
+    db.commit()
+    db.close()
+    # Direct writes bypass the pet cache
+    pet_cache.clear()
+
+    response = client.get(f"/pet/group/{group_id}")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hunger_level"] == 84
+    assert data["hygiene_level"] == 88
+    assert data["health_level"] == 92
+
+    db = TestingSessionLocal()
+    model = db.query(PetModel).filter(PetModel.group_id == uuid.UUID(group_id)).first()
+    assert model.hunger_level == 100
+    assert model.last_updated.replace(tzinfo=timezone.utc) == two_hours_ago
+    db.close()
+
+def test_feed_applies_decay_and_levels_up_in_one_statement(client):
+    from datetime import datetime, timedelta, timezone
+    from app.adapter.db.models import Pet as PetModel
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+
+    db = TestingSessionLocal()
+    model = db.query(PetModel).filter(PetModel.group_id == uuid.UUID(group_id)).first()
+    model.last_updated = datetime.now(timezone.utc) - timedelta(hours=2)
+    model.xp = 45
+    db.commit()
+    db.close()
+
+    response = client.post(f"/pet/{group_id}/feed")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["type"] == "dog"
+    assert data["hunger_level"] == 94
+    assert data["hygiene_level"] == 88
+    assert data["level"] == 2
+    assert data["xp"] == 5
+
+    # The decay is now persisted, so a follow-up read does not decay again
+    assert client.get(f"/pet/group/{group_id}").json()["hunger_level"] == 94
+
+
+def test_play_missing_pet_returns_404(client):
+    response = client.post(f"/pet/{uuid.uuid4()}/play")
+    assert response.status_code == 404
+
+def test_apply_actions_in_one_update(client):
+    from app.adapter.db.pet_repository_sql import SQLPetRepository
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+
+    actions = [
+        {"type": "stats", "stats": {"hunger_level": 50}},
+        {"type": "feed"},
+        {"type": "feed"},
+        {"type": "clean"},
+        {"type": "play"},
+        {"type": "play"},
+        {"type": "rename", "name": "Max"},
+    ]
+    response = client.post(f"/pet/{group_id}/actions", json={"actions": actions})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pet"]["name"] == "Max"
+    assert data["pet"]["hunger_level"] == 70
+    assert data["pet"]["level"] == 2
+    assert data["pet"]["xp"] == 0
+    assert [(r["type"], r["xp_gained"], r["levels_gained"]) for r in data["results"]] == [
+        ("stats", 0, 0), ("feed", 10, 0), ("feed", 10, 0), ("clean", 10, 0),
+        ("play", 10, 0), ("play", 10, 1), ("rename", 0, 0),
+    ]
+
+    db = TestingSessionLocal()
+    try:
+        assert SQLPetRepository(db).find_by_group_id(uuid.UUID(group_id)).version == 1
+    finally:
+        db.close()
+
+    response = client.post(f"/pet/{group_id}/actions", json={"actions": [{"type": "rename"}]})
+    assert response.status_code == 400
+
+def test_update_with_stale_version_is_rejected(client):
+    from app.adapter.db.pet_repository_sql import SQLPetRepository
+    from app.domain.repositories.pet_repository import PetVersionConflictError
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+
+    first, second = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        stale = SQLPetRepository(second).find_by_group_id(uuid.UUID(group_id))
+        fresh = SQLPetRepository(first).find_by_group_id(uuid.UUID(group_id))
+        fresh.update_name("Max")
+        assert SQLPetRepository(first).update(fresh).version == stale.version + 1
+
+        stale.update_name("Bolt")
+        with pytest.raises(PetVersionConflictError):
+            SQLPetRepository(second).update(stale)
+    finally:
+        first.close()
+        second.close()
+
+    pet_cache.clear()
+    assert client.get(f"/pet/group/{group_id}").json()["name"] == "Max"
+
+def test_get_pets_for_many_groups(client):
+    group_ids = [str(uuid.uuid4()) for _ in range(3)]
+    for index, group_id in enumerate(group_ids[:2]):
+        client.post("/pet/", json={"group_id": group_id, "name": f"Pet{index}", "type": "duck"})
+
+    response = client.get("/pet/groups", params={"ids": group_ids})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == set(group_ids[:2])
+    assert data[group_ids[1]]["name"] == "Pet1"
+
+    response = client.post("/pet/groups", json={"group_ids": group_ids})
+    assert response.status_code == 200
+    assert response.json() == data
+
+def test_decay_sweep_persists_decay_for_idle_pets(client):
+    from datetime import datetime, timedelta, timezone
+    from app.adapter.db.models import Pet as PetModel
+    from app.adapter.db.pet_repository_sql import SQLPetRepository
+    from app.application.usecases.sweep_pet_decay import SweepPetDecayUseCase
+
+    idle, busy = str(uuid.uuid4()), str(uuid.uuid4())
+    for group_id in (idle, busy):
+        client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "cat"})
+
+    db = TestingSessionLocal()
+    model = db.query(PetModel).filter(PetModel.group_id == uuid.UUID(idle)).first()
+    model.last_updated = datetime.now(timezone.utc) - timedelta(hours=3)
+    db.commit()
+
+    swept, _ = SweepPetDecayUseCase(SQLPetRepository(db)).execute(chunk_size=1, min_idle=timedelta(hours=1))
+    assert swept == 1
+
+    db.expire_all()
+    rows = {row.group_id: row for row in db.query(PetModel).all()}
+    assert rows[uuid.UUID(idle)].hunger_level == 76
+    assert rows[uuid.UUID(idle)].version == 1
+    assert rows[uuid.UUID(busy)].hunger_level == 100
+    db.close()
+
+def test_history_reads_rollups_and_unrolled_snapshots(client):
+    from datetime import datetime, timedelta, timezone
+    from app.adapter.db.models import PetStatSnapshot
+    from app.adapter.db.pet_history_repository_sql import SQLPetHistoryRepository
+    from app.application.usecases.compact_pet_history import CompactPetHistoryUseCase
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+    client.patch(f"/pet/{group_id}/stats", json={"hunger_level": 50})
+
+    raw = client.get(f"/pet/group/{group_id}/history").json()
+    assert raw["resolution"] == "raw"
+    assert [point["stats"]["hunger_level"]["max"] for point in raw["points"]] == [100, 50]
+
+    # Move both snapshots into a finished hour and roll them up
+    db = TestingSessionLocal()
+    three_hours_ago = datetime.now(timezone.utc) - timedelta(hours=3)
+    db.query(PetStatSnapshot).update({PetStatSnapshot.recorded_at: three_hours_ago})
+    db.commit()
+    written = CompactPetHistoryUseCase(SQLPetHistoryRepository(db)).execute()
+    db.close()
+    assert written["hour"] == 1
+
+    client.post(f"/pet/{group_id}/feed")
+
+    since = (datetime.now(timezone.utc) - timedelta(hours=5)).isoformat()
+    response = client.get(f"/pet/group/{group_id}/history", params={"from": since, "resolution": "hour"})
+    assert response.status_code == 200
+    points = response.json()["points"]
+    assert [point["samples"] for point in points] == [2, 1]
+    assert points[0]["stats"]["hunger_level"] == {"min": 50, "avg": 75.0, "max": 100}
+    assert points[1]["stats"]["hunger_level"]["max"] == 60
+
+def test_history_moves_to_a_coarser_tier_past_the_point_limit(client):
+    from datetime import datetime, timedelta, timezone
+    from app.adapter.db.models import Pet as PetModel, PetStatSnapshot
+    from app.application.usecases.get_pet_history import MAX_HISTORY_POINTS
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+    db = TestingSessionLocal()
+    pet_id = db.query(PetModel.id).filter(PetModel.group_id == uuid.UUID(group_id)).scalar()
+    # More writes in the last two hours than one raw page holds
+    now = datetime.now(timezone.utc)
+    db.bulk_insert_mappings(PetStatSnapshot, [
+        {"pet_id": pet_id, "recorded_at": now - timedelta(seconds=6 * i), "hunger_level": 50,
+         "hygiene_level": 50, "health_level": 50, "happiness_level": 50, "level": 1, "xp": 0}
+        for i in range(1, MAX_HISTORY_POINTS + 101)
+    ])
+    db.commit()
+    db.close()
+
+    response = client.get(f"/pet/group/{group_id}/history")
+    assert response.status_code == 200
+    assert response.json()["resolution"] == "hour"
+    points = response.json()["points"]
+    assert sum(point["samples"] for point in points) == MAX_HISTORY_POINTS + 101
+    assert points[-1]["stats"]["hunger_level"]["max"] == 100
+
+    refused = client.get(f"/pet/group/{group_id}/history", params={"resolution": "raw"})
+    assert refused.status_code == 400
+
+def test_leaderboard_pages_ranks_and_cache_updates(client):
+    from app.adapter.db.models import Pet as PetModel
+
+    standings = {"A": (3, 10), "B": (2, 40), "C": (2, 40), "D": (2, 35)}
+    groups = {}
+    for name in standings:
+        groups[name] = str(uuid.uuid4())
+        client.post("/pet/", json={"group_id": groups[name], "name": name, "type": "dog"})
+    db = TestingSessionLocal()
+    for name, (level, xp) in standings.items():
+        db.query(PetModel).filter(PetModel.name == name).update({PetModel.level: level, PetModel.xp: xp})
+    db.commit()
+    db.close()
+    leaderboard_cache.clear()
+    pet_cache.clear()
+
+    first = client.get("/pet/leaderboard", params={"limit": 2}).json()
+    assert [(e["name"], e["rank"]) for e in first["entries"]][0] == ("A", 1)
+    assert first["entries"][1]["rank"] == 2
+    second = client.get("/pet/leaderboard", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [e["rank"] for e in second["entries"]] == [2, 4]
+    assert second["entries"][1]["name"] == "D"
+    assert second["next_cursor"] is None
+
+    # Feeding D to 45 XP overtakes B and C; the cached top is patched, not reloaded
+    client.post(f"/pet/{groups['D']}/feed")
+    top = client.get("/pet/leaderboard", params={"limit": 4}).json()["entries"]
+    assert [(e["name"], e["rank"]) for e in top][:2] == [("A", 1), ("D", 2)]
+    assert [e["rank"] for e in top[2:]] == [3, 3]
+
+    assert client.get(f"/pet/group/{groups['B']}/rank").json()["rank"] == 3
+    leaderboard_cache.clear()
+    assert client.get(f"/pet/group/{groups['D']}/rank").json()["rank"] == 2
+    assert client.get("/pet/leaderboard", params={"cursor": "nope"}).status_code == 400
+
+def test_xp_grants_are_applied_once_per_key(client):
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+    missing = str(uuid.uuid4())
+
+    grants = [
+        {"group_id": group_id, "amount": 200, "idempotency_key": "activity-1"},
+        {"group_id": group_id, "amount": 200, "idempotency_key": "activity-1"},
+        {"group_id": missing, "amount": 10, "idempotency_key": "activity-2"},
+    ]
+    response = client.post("/pet/xp-grants", json={"grants": grants})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["applied", "duplicate", "not_found"]
+    # 200 XP from level 1: levels 1 and 2 cost 50 + 100, 50 XP into level 3
+    assert (results[0]["level"], results[0]["xp"]) == (3, 50)
+
+    retried = client.post("/pet/xp-grants", json={"grants": grants[:1]}).json()["results"]
+    assert retried[0]["status"] == "duplicate"
+    assert client.get(f"/pet/group/{group_id}").json()["level"] == 3
+
+    bad = {"group_id": group_id, "amount": 0, "idempotency_key": "activity-3"}
+    assert client.post("/pet/xp-grants", json={"grants": [bad]}).status_code == 400
+
+def test_care_due_is_kept_on_writes_and_scheduled(client):
+    import time
+    from app.adapter.db.pet_repository_sql import SQLPetRepository
+    from app.adapter.events.care_schedule import CareSchedule
+
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+    # Hunger decays fastest: 8/h, so 38 reaches the threshold of 30 in an hour
+    client.patch(f"/pet/{group_id}/stats", json={"hunger_level": 38})
+
+    db = TestingSessionLocal()
+    try:
+        now = time.time()
+        reminders = SQLPetRepository(db).find_care_due(now, now + 7200)
+        assert [reminder[2] for reminder in reminders] == [uuid.UUID(group_id)]
+        assert abs(reminders[0][0] - (now + 3600)) < 5
+
+        schedule = CareSchedule()
+        schedule.load(reminders, now + 7200)
+        assert schedule.pop_due(now) == []
+        assert len(schedule.pop_due(now + 3601)) == 1
+        assert schedule.pop_due(now + 3601) == []
+    finally:
+        db.close()
+
+    # The SQL write path computes the same due time: 48 reaches 30 in 2.25h
+    client.post(f"/pet/{group_id}/feed")
+    db = TestingSessionLocal()
+    try:
+        pet = SQLPetRepository(db).find_by_group_id(uuid.UUID(group_id))
+        assert abs(pet.care_due - (time.time() + 2.25 * 3600)) < 5
+    finally:
+        db.close()
+
+def test_get_pet_policy(client):
+    response = client.get("/pet/policy")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"dog", "cat", "dragon", "duck"}
+    assert data["dog"]["decay_per_hour"]["hunger_level"] == 8
+    assert data["dog"]["actions"]["play"] == {"happiness_level": 10, "health_level": 5}
+    assert "max-age" in response.headers["cache-control"]
+
+def test_stream_group_pet_missing_pet_returns_404(client):
+    response = client.get(f"/pet/group/{uuid.uuid4()}/events")
+    assert response.status_code == 404
+
+@pytest.mark.parametrize("mode", list(apps))
+def test_stream_group_pet_holds_no_connection_while_open(mode):
+    import asyncio
+    import json
+    from sqlalchemy import event
+    from starlette.requests import Request
+    from app.adapter.db.session_runner import AsyncSessionRunner, ThreadpoolSessionRunner
+    from app.interface.http.routers import get_pet_router
+
+    runner = {"sync": ThreadpoolSessionRunner, "async": AsyncSessionRunner}[mode]()
+    routes = get_pet_router(runner).routes
+    stream_group_pet = next(route.endpoint for route in routes if route.path == "/group/{group_id}/events")
+    group_id = str(uuid.uuid4())
+    TestClient(apps[mode]).post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+
+    checked_out = []
+    pools = [engine.pool, async_engine.sync_engine.pool]
+    def on_checkout(*args):
+        checked_out.append(True)
+    def on_checkin(*args):
+        checked_out.pop()
+    for pool in pools:
+        event.listen(pool, "checkout", on_checkout)
+        event.listen(pool, "checkin", on_checkin)
+
+    async def receive():
+        await asyncio.sleep(3600)  # The client never disconnects
+
+    async def first_event():
+        request = Request({"type": "http", "method": "GET", "path": "/", "headers": []}, receive)
+        response = await stream_group_pet(uuid.UUID(group_id), request)
+        stream = response.body_iterator
+        try:
+            return await stream.__anext__(), len(checked_out)
+        finally:
+            await stream.aclose()
+
+    try:
+        first, open_connections = asyncio.run(first_event())
+    finally:
+        for pool in pools:
+            event.remove(pool, "checkout", on_checkout)
+            event.remove(pool, "checkin", on_checkin)
+
+    assert first.startswith("event: pet\n")
+    assert json.loads(first.split("data: ", 1)[1])["name"] == "Rex"
+    assert open_connections == 0
+
+def test_get_group_pet_never_serves_a_stale_shared_body_under_a_new_etag(client, monkeypatch):
+    from app.interface.http.routers import pet_reads
+
+    # Keep every shared result alive, as if the next read joined a load still in flight
+    monkeypatch.setattr(pet_reads, "window_seconds", 60)
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+    client.patch(f"/pet/{group_id}/stats", json={"hunger_level": 10})
+    before = client.get(f"/pet/group/{group_id}")
+
+    client.post(f"/pet/{group_id}/feed")
+    after = client.get(f"/pet/group/{group_id}")
+
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()["hunger_level"] > before.json()["hunger_level"]
+
+def test_get_group_pet_honours_if_none_match(client):
+    group_id = str(uuid.uuid4())
+    client.post("/pet/", json={"group_id": group_id, "name": "Rex", "type": "dog"})
+
+    first = client.get(f"/pet/group/{group_id}")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get(f"/pet/group/{group_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    client.post(f"/pet/{group_id}/feed")
+    changed = client.get(f"/pet/group/{group_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
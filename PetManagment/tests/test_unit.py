@@ -39,4 +39,158 @@ def test_pet_level_up():
     assert pet.level == 2
     assert pet.xp == 0
 
+def test_pet_gains_several_levels_at_once():
+    pet = Pet(id=uuid.uuid4(), group_id=uuid.uuid4(), name="Rex", type=PetType.DOG, level=2, xp=10)
 
+    # Levels 2 and 3 cost 100 and 150 XP; 10 + 300 leaves 60 into level 4
+    pet.gain_xp(300)
+
+    assert pet.level == 4
+    assert pet.xp == 60
+    assert pet.total_xp == 50 + 310
+
+
+def test_name_pet_retries_after_version_conflict():
+    from app.application.usecases.name_pet import NamePetUseCase
+    from app.domain.repositories.pet_repository import PetVersionConflictError
+
+    class FlakyRepository:
+        def __init__(self):
+            self.pet = Pet(id=uuid.uuid4(), group_id=uuid.uuid4(), name="Rex", type=PetType.DOG)
+            self.conflicts_left = 1
+
+        def find_by_group_id(self, group_id):
+            return Pet(**vars(self.pet))
+
+        def update(self, pet):
+            if self.conflicts_left:
+                self.conflicts_left -= 1
+                raise PetVersionConflictError(pet.id)
+            self.pet = pet
+            return pet
+
+    repo = FlakyRepository()
+    pet = NamePetUseCase(repo).execute(repo.pet.group_id, "Max")
+
+    assert pet.name == "Max"
+    assert repo.conflicts_left == 0
+
+def test_event_broker_fans_out_to_every_subscriber():
+    import asyncio
+    import threading
+    from app.adapter.events.broker import PetEventBroker
+
+    group_id = uuid.uuid4()
+    broker = PetEventBroker(lambda _: None, tick_seconds=0)
+
+    async def scenario():
+        first, second = broker.subscribe(group_id), broker.subscribe(group_id)
+        # Sync route handlers publish from the threadpool
+        publisher = threading.Thread(target=broker.publish, args=(group_id, {"hunger_level": 90}))
+        publisher.start()
+        publisher.join()
+        messages = [await asyncio.wait_for(queue.get(), timeout=1) for queue in (first, second)]
+        broker.unsubscribe(group_id, first)
+        broker.unsubscribe(group_id, second)
+        return messages
+
+    messages = asyncio.run(scenario())
+
+    assert messages[0] == messages[1] == 'event: pet\ndata: {"hunger_level": 90}\n\n'
+    assert broker.subscriber_count(group_id) == 0
+
+def test_pet_cache_evicts_least_recently_used_and_expired():
+    from app.adapter.cache.pet_cache import InMemoryPetCache
+
+    pets = [Pet(id=uuid.uuid4(), group_id=uuid.uuid4(), name=f"P{i}", type=PetType.DOG) for i in range(3)]
+    cache = InMemoryPetCache(max_entries=2, ttl_seconds=60)
+    cache.set(pets[0])
+    cache.set(pets[1])
+    assert cache.get(pets[0].group_id).name == "P0"
+    cache.set(pets[2])
+
+    assert cache.get(pets[1].group_id) is None
+    assert cache.get(pets[0].group_id) is not None
+    # Entries are copies, mutating one does not touch the cache
+    cache.get(pets[2].group_id).name = "changed"
+    assert cache.get(pets[2].group_id).name == "P2"
+
+    expired = InMemoryPetCache(max_entries=2, ttl_seconds=1e-9)
+    expired.set(pets[0])
+    assert expired.get(pets[0].group_id) is None
+
+def test_single_flight_shares_one_load_between_concurrent_callers():
+    import threading
+    from app.adapter.http.singleflight import SingleFlight
+
+    flight = SingleFlight("test", window_seconds=60)
+    started, release = threading.Event(), threading.Event()
+    loads = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return {"hunger_level": 90}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("pet", load)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("pet", load))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(loads) == 1
+    assert results == [{"hunger_level": 90}] * 4
+    # Other keys load on their own
+    flight.do("other", load)
+    assert len(loads) == 2
+
+def test_pet_simulation_follows_the_repository_rules():
+    import numpy as np
+    from app.adapter.db.pet_repository_sql import _decayed
+    from app.domain.entities.pet import level_for_total_xp
+    from app.domain.entities.pet_policy import PET_POLICIES
+    from benchmarks.pet_simulation import ActionRates, PetPopulation, benchmark_repository, levels_for_total_xp
+
+    totals = np.arange(0, 20_000, 7)
+    assert levels_for_total_xp(totals).tolist() == [level_for_total_xp(int(total)) for total in totals]
+
+    # Without actions, reads project the same decay as the repository does
+    idle = PetPopulation(50, seed=1)
+    idle.step(5, ActionRates(feed=0, clean=0, play=0))
+    rate = PET_POLICIES[PetType.DOG].decay_per_hour[0]
+    assert (idle.projected_stats()[:, 0] == _decayed(100, rate, 5)).all()
+
+    busy = PetPopulation(500, seed=2)
+    for _ in range(48):
+        busy.step(1, ActionRates(feed=2, clean=2, play=2))
+    stats = busy.projected_stats()
+    assert stats.min() >= 0 and stats.max() <= 100
+    assert busy.report()["level"]["max"] > 1
+
+    assert set(benchmark_repository(pets=50, ops=5)) >= {"find_by_group_id", "apply_action (feed)"}
+
+def test_async_single_flight_shares_one_load_between_concurrent_callers():
+    import asyncio
+    from app.adapter.http.singleflight import AsyncSingleFlight
+
+    flight = AsyncSingleFlight("test", window_seconds=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"hunger_level": 90}
+
+    async def run():
+        results = await asyncio.gather(*[flight.do("pet", load) for _ in range(4)])
+        await flight.do("other", load)
+        return results
+
+    assert asyncio.run(run()) == [{"hunger_level": 90}] * 4
+    assert len(loads) == 2
@@ -1,5 +1,7 @@
-from fastapi import Header, HTTPException
+from fastapi import Depends, Header, HTTPException
 import jwt
+import uuid
+from app.adapter.http.group_service import GroupMembershipClient, GroupServiceUnavailable, get_group_membership
 
 def get_current_user_id(authorization: str = Header(...)) -> str:
     try:
@@ -10,4 +12,24 @@ def get_current_user_id(authorization: str = Header(...)) -> str:
              raise HTTPException(status_code=401, detail="Token inválido")
         return user_id
     except Exception:
-        raise HTTPException(status_code=401, detail="Token inválido")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+
+def get_group_member(
+    group_id: str,
+    authorization: str = Header(...),
+    user_id: str = Depends(get_current_user_id),
+    membership: GroupMembershipClient = Depends(get_group_membership)
+) -> str:
+    """Usuario autenticado, si es miembro del grupo de la ruta; 403 si no lo es."""
+    try:
+        group_uuid = uuid.UUID(group_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="group_id inválido")
+    try:
+        is_member = membership.is_member(group_uuid, authorization)
+    except GroupServiceUnavailable:
+        raise HTTPException(status_code=503, detail="No se pudo comprobar la membresía del grupo")
+    if not is_member:
+        raise HTTPException(status_code=403, detail="No eres miembro de este grupo")
+    return user_id
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
 import uuid
 
 from app.domain.repositories.emotional_repository import EmotionalRepository
@@ -62,6 +63,15 @@ class SQLEmotionalRepository(EmotionalRepository):
         results = query.all()
         return [self._map_to_entity(r) for r in results]
 
+    def get_mood_stamp(self, group_id: uuid.UUID) -> Tuple[int, Optional[datetime]]:
+        # Conteo y fecha del último reporte: cambia siempre que el moodboard cambia
+        count, latest = (
+            self.db.query(func.count(EmotionalReportModel.id), func.max(EmotionalReportModel.created_at))
+            .filter(EmotionalReportModel.group_id == group_id)
+            .one()
+        )
+        return count, latest
+
     def _map_to_entity(self, model: EmotionalReportModel) -> EmotionalReport:
         return EmotionalReport(
             id=model.id,
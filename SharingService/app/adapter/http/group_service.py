@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import httpx
+
+# Called on the compose network, bypassing Traefik; GroupManagment serves under its root_path
+GROUP_SERVICE_URL = os.getenv("GROUP_SERVICE_URL", "http://group-managment/groups")
+GROUP_SERVICE_TIMEOUT_SECONDS = float(os.getenv("GROUP_SERVICE_TIMEOUT_SECONDS", "0.5"))
+# Removals made in GroupManagment are seen here after at most this long
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "30"))
+MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.getenv("MEMBERSHIP_CACHE_MAX_ENTRIES", "10000"))
+
+
+class GroupServiceUnavailable(Exception):
+    """GroupManagment did not answer in time, or answered with an error."""
+
+
+class GroupMembershipClient:
+    """Asks GroupManagment whether the caller of a request belongs to a group.
+
+    GroupManagment owns the memberships: its GET /{group_id} answers 200 to members
+    and 403 to everyone else, so the caller's own token is forwarded. Positive
+    answers are kept per token for a short while, since the whole group opens the
+    moodboard together.
+    """
+
+    def __init__(self, base_url: str = GROUP_SERVICE_URL, timeout: float = GROUP_SERVICE_TIMEOUT_SECONDS,
+                 ttl_seconds: float = MEMBERSHIP_CACHE_TTL_SECONDS,
+                 max_entries: int = MEMBERSHIP_CACHE_MAX_ENTRIES):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._members: "OrderedDict[tuple[str, uuid.UUID], float]" = OrderedDict()
+
+    @property
+    def client(self) -> httpx.Client:
+        # Created on first use so importing the app opens no sockets
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+                )
+            return self._client
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _cached(self, key: tuple[str, uuid.UUID]) -> bool:
+        with self._lock:
+            expires_at = self._members.get(key)
+            if expires_at is None or time.monotonic() >= expires_at:
+                self._members.pop(key, None)
+                return False
+            self._members.move_to_end(key)
+            return True
+
+    def _remember(self, key: tuple[str, uuid.UUID]):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._members[key] = time.monotonic() + self.ttl_seconds
+            self._members.move_to_end(key)
+            while len(self._members) > self.max_entries:
+                self._members.popitem(last=False)
+
+    def is_member(self, group_id: uuid.UUID, authorization: str) -> bool:
+        """Raises GroupServiceUnavailable when GroupManagment cannot answer."""
+        key = (authorization, group_id)
+        if self._cached(key):
+            return True
+        try:
+            response = self.client.get(f"/{group_id}", headers={"Authorization": authorization})
+        except httpx.HTTPError as exc:
+            raise GroupServiceUnavailable(repr(exc)) from exc
+        if response.status_code in (401, 403, 404, 422):
+            return False
+        if response.status_code != 200:
+            raise GroupServiceUnavailable(f"GET /{group_id} answered {response.status_code}")
+        self._remember(key)
+        return True
+
+
+group_membership = GroupMembershipClient()
+
+
+def get_group_membership() -> GroupMembershipClient:
+    return group_membership
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
 import uuid
 from app.domain.entities.emotional_report import EmotionalReport
 
@@ -10,4 +11,8 @@ class EmotionalRepository(ABC):
 
     @abstractmethod
     def get_latest_moods_by_group(self, group_id: uuid.UUID) -> List[EmotionalReport]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_mood_stamp(self, group_id: uuid.UUID) -> Tuple[int, Optional[datetime]]:
+        pass
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
 from app.adapter.db.database import get_db
 from app.adapter.db.emotional_repository_sql import SQLEmotionalRepository
+from app.adapter.http.conditional import not_modified, set_validators, weak_etag
+from app.adapter.http.singleflight import SingleFlight
 from app.application.dto.emotion_dto import CreateEmotionDTO, EmotionResponseDTO
 from app.application.usecases.manage_emotions import ManageEmotionsUseCase
-from app.adapter.auth.dependencies import get_current_user_id
+from app.adapter.auth.dependencies import get_current_user_id, get_group_member
 
 router = APIRouter()
 
+# The whole group opens the moodboard together
+mood_reads = SingleFlight("group_moodboard")
+
 # Endpoint para REPORTAR (POST)
 @router.post("/mood", response_model=List[EmotionResponseDTO])
 def register_mood(
@@ -25,8 +30,20 @@ def register_mood(
 @router.get("/mood/group/{group_id}", response_model=List[EmotionResponseDTO])
 def get_group_moods(
     group_id: str,
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_group_member),
     db: Session = Depends(get_db)
 ):
     repo = SQLEmotionalRepository(db)
+    group_uuid = uuid.UUID(group_id)
+    count, latest = repo.get_mood_stamp(group_uuid)
+    etag = weak_etag(group_uuid, count, latest)
+    if cached := not_modified(request, etag, latest):
+        return cached
     use_case = ManageEmotionsUseCase(repo)
-    return use_case.get_group_moodboard(uuid.UUID(group_id))
\ No newline at end of file
+    # Keyed on the ETag too, so a load that started before a write is never served
+    # under the validator computed after it
+    moods = mood_reads.do((group_uuid, etag), lambda: use_case.get_group_moodboard(group_uuid))
+    set_validators(response, etag, latest)
+    return moods
@@ -1,9 +1,11 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 from app.interface.http.routers import router
 from app.adapter.db.database import engine, SessionLocal
 from app.adapter.db import models
+from app.adapter.http.group_service import group_membership
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -30,7 +32,13 @@ def seed_emotions():
         db.close()
         
 seed_emotions()
-app = FastAPI(root_path="/sharing", docs_url=None, redoc_url="/docs")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    group_membership.close()
+
+app = FastAPI(root_path="/sharing", docs_url=None, redoc_url="/docs", lifespan=lifespan)
 
 # CORS middleware MUST be added first (will be evaluated last in the chain)
 app.add_middleware(
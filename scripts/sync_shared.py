@@ -0,0 +1,64 @@
+"""Copies the modules under shared/ into every service that vendors them.
+
+Each service is built from its own directory (see docker-compose.yml), so it
+cannot import code from outside it. The modules in shared/ are the single
+source of truth and the copies must not be edited by hand:
+
+    python scripts/sync_shared.py          # rewrite the copies
+    python scripts/sync_shared.py --check  # fail if a copy drifted (CI)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# shared module -> directories that hold a copy of it
+VENDORED = {
+    "shared/http/conditional.py": [
+        "PetManagment/app/adapter/http",
+        "GroupManagment/app/adapter/http",
+        "SharingService/app/adapter/http",
+    ],
+    "shared/http/singleflight.py": [
+        "PetManagment/app/adapter/http",
+        "GroupManagment/app/adapter/http",
+        "SharingService/app/adapter/http",
+    ],
+}
+
+
+def vendored_copy(source: str) -> str:
+    header = f"# Copied from {source} by scripts/sync_shared.py. Edit it there, not here.\n"
+    return header + (ROOT / source).read_text(encoding="utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report copies that differ from shared/")
+    args = parser.parse_args()
+
+    drifted = []
+    for source, targets in VENDORED.items():
+        expected = vendored_copy(source)
+        for target in targets:
+            path = ROOT / target / Path(source).name
+            current = path.read_text(encoding="utf-8") if path.exists() else None
+            if current == expected:
+                continue
+            if args.check:
+                drifted.append(path.relative_to(ROOT))
+            else:
+                path.write_text(expected, encoding="utf-8", newline="\n")
+                print(f"updated {path.relative_to(ROOT)}")
+
+    if drifted:
+        for path in drifted:
+            print(f"{path} differs from shared/", file=sys.stderr)
+        print("Run python scripts/sync_shared.py and commit the result.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
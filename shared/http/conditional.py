@@ -0,0 +1,65 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+# Conditional GET helpers. Routes compute a validator from a cheap query
+# (row version, last_updated, latest created_at...) and short-circuit with a
+# 304 before loading and serialising the full body.
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): the W/ prefix is ignored
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> Response | None:
+    """Returns a 304 response if the client's cached copy is still current, else None.
+
+    If-None-Match takes precedence over If-Modified-Since, as the RFC requires.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+    if fresh:
+        return Response(status_code=304, headers=validator_headers(etag, last_modified))
+    return None
+
+
+def set_validators(response: Response, etag: str, last_modified: datetime | None = None):
+    response.headers.update(validator_headers(etag, last_modified))
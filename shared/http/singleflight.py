@@ -0,0 +1,141 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from prometheus_client import Counter
+
+# Request coalescing for hot reads. Sync routes run in the threadpool, so callers
+# asking for the same key while a load is in flight block on it and share its
+# result; a result also stays shareable for a short window after it lands.
+# AsyncSingleFlight does the same for async routes, awaiting instead of blocking.
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_WINDOW_SECONDS = float(os.getenv("SINGLE_FLIGHT_WINDOW_SECONDS", "0.2"))
+# Finished calls are only purged once this many keys are tracked
+_PURGE_THRESHOLD = 1024
+
+SINGLE_FLIGHT_LOADS = Counter(
+    "single_flight_loads_total",
+    "Reads that actually ran their load",
+    ["flight"],
+)
+SINGLE_FLIGHT_COLLAPSED = Counter(
+    "single_flight_collapsed_total",
+    "Reads answered with the result of an identical concurrent or just finished load",
+    ["flight"],
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "expires_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.expires_at = float("inf")
+
+
+class SingleFlight:
+    def __init__(self, name: str, window_seconds: float = SINGLE_FLIGHT_WINDOW_SECONDS):
+        self.name = name
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def _purge(self, now: float):
+        expired = [key for key, call in self._calls.items() if call.done.is_set() and call.expires_at <= now]
+        for key in expired:
+            del self._calls[key]
+
+    def do(self, key: Hashable, load: Callable[[], T]) -> T:
+        """Returns `load()`, sharing it with identical calls made while it runs or just after.
+
+        Shared results must not be mutated by callers. Errors are passed to the
+        callers already waiting but are never kept for later ones.
+        """
+        with self._lock:
+            now = time.monotonic()
+            call = self._calls.get(key)
+            leader = call is None or call.expires_at <= now
+            if leader:
+                if len(self._calls) >= _PURGE_THRESHOLD:
+                    self._purge(now)
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            SINGLE_FLIGHT_COLLAPSED.labels(flight=self.name).inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLE_FLIGHT_LOADS.labels(flight=self.name).inc()
+        try:
+            call.result = load()
+            call.expires_at = time.monotonic() + self.window_seconds
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            call.expires_at = 0.0
+            raise
+        finally:
+            call.done.set()
+            if call.expires_at <= time.monotonic():
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+
+
+class _AsyncCall:
+    __slots__ = ("task", "expires_at")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.expires_at = float("inf")
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines of one event loop.
+
+    The load runs as its own task, so a caller that is cancelled (a client going
+    away) does not cancel it for the others waiting on the same key.
+    For the same reason `load` must not use anything owned by the caller that
+    started it, such as its request's database session: that caller may be gone
+    (and its session closed) while the others still wait.
+    """
+
+    def __init__(self, name: str, window_seconds: float = SINGLE_FLIGHT_WINDOW_SECONDS):
+        self.name = name
+        self.window_seconds = window_seconds
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+
+    def _purge(self, now: float):
+        expired = [key for key, call in self._calls.items() if call.task.done() and call.expires_at <= now]
+        for key in expired:
+            del self._calls[key]
+
+    def _finished(self, key: Hashable, call: _AsyncCall):
+        if self._calls.get(key) is not call:
+            return
+        if call.task.cancelled() or call.task.exception() is not None or self.window_seconds <= 0:
+            del self._calls[key]
+        else:
+            call.expires_at = time.monotonic() + self.window_seconds
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Awaits `load()`, sharing it like SingleFlight.do."""
+        now = time.monotonic()
+        call = self._calls.get(key)
+        if call is not None and call.expires_at > now:
+            SINGLE_FLIGHT_COLLAPSED.labels(flight=self.name).inc()
+            return await asyncio.shield(call.task)
+
+        if len(self._calls) >= _PURGE_THRESHOLD:
+            self._purge(now)
+        SINGLE_FLIGHT_LOADS.labels(flight=self.name).inc()
+        call = self._calls[key] = _AsyncCall(asyncio.ensure_future(load()))
+        call.task.add_done_callback(lambda _: self._finished(key, call))
+        return await asyncio.shield(call.task)